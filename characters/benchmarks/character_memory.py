@@ -0,0 +1,70 @@
+"""Measures memory taken by loaded Character objects.
+
+Compares the current compact Character with the previous representation, where every
+character had an instance dictionary and its stats in a separate dictionary.
+
+Usage: python characters/benchmarks/character_memory.py [characters]
+"""
+
+import gc
+import sys
+import tracemalloc
+from common import temp_connection, fill_characters, report
+# pylint: disable=wrong-import-order
+from entities.character import Character
+from repositories.db_characters import CHARACTER_COLUMNS
+
+
+class DictCharacter:
+    """Previous representation of a character, kept here for comparison."""
+
+    def __init__(self, char_id: int, story_id: int, stats: dict) -> None:
+        self.char_id = char_id
+        self.story_id = story_id
+        self.stats = stats
+
+
+def load_dicts(rows) -> list:
+    return [DictCharacter(r[0], r[1], {
+        "name": r[2], "gender": r[3], "birthday": r[4], "age": r[5],
+        "height": r[6], "weight": r[7], "appearance": r[8],
+        "personality": r[9], "history": r[10], "picture": r[11], "trivia": r[12]
+    }) for r in rows]
+
+
+def load_compact(rows) -> list:
+    return [Character.from_row(r) for r in rows]
+
+
+def retained(con, load) -> int:
+    """Memory still allocated after loading all characters and dropping the rows."""
+
+    rows = con.execute(
+        f"SELECT char_id, story_id, {', '.join(CHARACTER_COLUMNS)} FROM Characters").fetchall()
+    gc.collect()
+    tracemalloc.start()
+    characters = load(rows)
+    del rows
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del characters
+    return size
+
+
+def main(characters: int = 100000):
+    con, tmp = temp_connection()
+    fill_characters(con, characters, 10)
+
+    rows = [("representation", "total (MB)", "per character (B)")]
+    for name, load in (("dict stats", load_dicts), ("slots + namedtuple", load_compact)):
+        size = retained(con, load)
+        rows.append((name, f"{size / 1024 / 1024:.1f}", f"{size / characters:.0f}"))
+    report(f"{characters} loaded characters, memory excluding shared field values", rows)
+
+    con.close()
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
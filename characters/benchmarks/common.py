@@ -0,0 +1,133 @@
+"""Helpers shared by the benchmark scripts.
+
+Benchmarks never touch the user's database, they build a throwaway database in a
+temporary directory instead.
+"""
+
+import os
+import sys
+import random
+import sqlite3
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from db_connection import connect
+from migrations import migrate
+from repositories import executor as e
+from repositories.db_characters import name_key
+
+
+def temp_connection(version: int = None) -> tuple[sqlite3.Connection, tempfile.TemporaryDirectory]:
+    """Opens a connection to an empty database with all tables and relations.
+
+    Args:
+        version (int, optional): Schema version to migrate to. Defaults to the latest one.
+
+    Returns:
+        tuple: (connection, temporary directory). Keep the directory alive while benchmarking.
+    """
+
+    tmp = tempfile.TemporaryDirectory()
+    con = connect(os.path.join(tmp.name, "benchmark.sqlite"))
+    migrate(con, version)
+    return (con, tmp)
+
+
+def fill_characters(con: sqlite3.Connection, total: int, stories: int, seed: int = 1) -> None:
+    """Inserts stories and randomly generated characters.
+
+    Args:
+        con (sqlite3.Connection): Connection to the benchmark database.
+        total (int): Number of characters.
+        stories (int): Number of stories the characters are spread across.
+        seed (int, optional): Random seed. Defaults to 1.
+    """
+
+    rnd = random.Random(seed)
+    # Databases migrated to an older version don't have name keys yet
+    keyed = any(column[1] == "name_key"
+                for column in con.execute("PRAGMA table_info(Characters)"))
+    key_column, key_value = (", name_key", ", ?") if keyed else ("", "")
+
+    def rows():
+        for i in range(total):
+            row = (
+                i % stories + 1,
+                f"Character {i}",
+                rnd.randint(0, 2),
+                None if rnd.random() < 0.3 else f"{rnd.randint(1, 28)}/{rnd.randint(1, 12)}/????",
+                rnd.randint(0, 90),
+                None if rnd.random() < 0.2 else rnd.randint(140, 200),
+                None if rnd.random() < 0.2 else rnd.randint(40, 120),
+                "Tall and gloomy. " * rnd.randint(0, 20) or None,
+                "Cheerful. " * rnd.randint(0, 20) or None,
+                "Born somewhere far away. " * rnd.randint(0, 40) or None,
+                None,
+                None
+            )
+            yield row + (name_key(row[1]),) if keyed else row
+
+    with e.bulk(con):
+        e.execute_many(con, "INSERT INTO Stories(name) VALUES (?)",
+                       ((f"Story {i + 1}",) for i in range(stories)))
+        e.execute_many(con, f"""
+            INSERT INTO Characters(
+                story_id, name, gender, birthday, age, height, weight,
+                appearance, personality, history, picture, trivia{key_column}
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?{key_value})
+        """, rows())
+
+
+def fill_relations(con: sqlite3.Connection, total: int, characters: int, seed: int = 1) -> None:
+    """Inserts random one-directional relationships between characters.
+
+    Args:
+        con (sqlite3.Connection): Connection to the benchmark database.
+        total (int): Number of relationship rows.
+        characters (int): Number of existing characters.
+        seed (int, optional): Random seed. Defaults to 1.
+    """
+
+    rnd = random.Random(seed)
+    rows = ((rnd.randint(1, characters), rnd.randint(1, characters), rnd.randint(1, 22))
+            for _ in range(total))
+    with e.bulk(con):
+        e.execute_many(con, """
+            INSERT OR IGNORE INTO CharacterRelations(char1_id, char2_id, relation_id)
+            VALUES (?, ?, ?)
+        """, rows)
+
+
+def measure(func, repeat: int = 20) -> float:
+    """Runs func several times.
+
+    Args:
+        func (function): Function without arguments.
+        repeat (int, optional): How many times to run it. Defaults to 20.
+
+    Returns:
+        float: Average duration of a single call in milliseconds.
+    """
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def report(title: str, rows: list[tuple]) -> None:
+    """Prints benchmark results as a table.
+
+    Args:
+        title (str): Heading of the table.
+        rows (list[tuple]): (label, value, value...) tuples, the first row is the header.
+    """
+
+    print(title)
+    widths = [max(len(str(row[i])) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print("  ".join(str(cell).ljust(widths[i]) for i, cell in enumerate(row)))
+    print()
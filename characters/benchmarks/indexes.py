@@ -0,0 +1,58 @@
+"""Compares lookup times with and without secondary indexes.
+
+Usage: python characters/benchmarks/indexes.py [characters]
+"""
+
+import sys
+import random
+from common import temp_connection, fill_characters, fill_relations, measure, report
+# pylint: disable=wrong-import-order
+from migrations import migrate
+from repositories.db_characters import CharactersDatabase
+from repositories.db_stories import StoriesDatabase
+
+
+def run_queries(char_db: CharactersDatabase, story_db: StoriesDatabase,
+                characters: int, stories: int, seed: int) -> dict:
+    rnd = random.Random(seed)
+    story = rnd.randint(1, stories)
+    return {
+        "get_characters_by_story_id": measure(
+            lambda: char_db.get_characters_by_story_id(story)),
+        "get_all_avatars_of_a_story": measure(
+            lambda: story_db.get_all_avatars_of_a_story(story)),
+        "mean_age": measure(lambda: story_db.mean_age(story)),
+        "get_completion_percent": measure(
+            lambda: story_db.get_completion_percent(story)),
+        "get_character_relations": measure(
+            lambda: char_db.get_character_relations(rnd.randint(1, characters))),
+        "delete_character_relations": measure(
+            lambda: char_db.delete_character_relations(rnd.randint(1, characters))),
+    }
+
+
+def main(characters: int = 100000):
+    stories = 100
+    con, tmp = temp_connection(version=1)
+    fill_characters(con, characters, stories)
+    fill_relations(con, characters * 2, characters)
+    char_db = CharactersDatabase(con)
+    story_db = StoriesDatabase(con)
+
+    scan = run_queries(char_db, story_db, characters, stories, seed=1)
+    migrate(con, version=2)
+    indexed = run_queries(char_db, story_db, characters, stories, seed=2)
+
+    rows = [("query", "scan (ms)", "index (ms)", "speedup")]
+    for query, duration in scan.items():
+        rows.append((query, f"{duration:.2f}", f"{indexed[query]:.2f}",
+                     f"{duration / indexed[query]:.0f}x"))
+    report(f"{characters} characters in {stories} stories, "
+           f"{characters * 2} relationships", rows)
+
+    con.close()
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,66 @@
+"""Compares relation graph queries on the in-memory graph with recursive SQL queries.
+
+Usage: python characters/benchmarks/relation_graph.py [edges]
+"""
+
+import sys
+import time
+import random
+import tracemalloc
+from common import temp_connection, fill_characters, fill_relations, measure, report
+# pylint: disable=wrong-import-order
+from repositories.db_characters import CharactersDatabase
+from services.relation_graph import RelationGraph
+
+
+def main(edges: int = 100000):
+    characters = edges // 5
+    con, tmp = temp_connection()
+    fill_characters(con, characters, 1)
+    fill_relations(con, edges, characters)
+    char_db = CharactersDatabase(con)
+    rnd = random.Random(1)
+    pairs = [(rnd.randint(1, characters), rnd.randint(1, characters)) for _ in range(20)]
+
+    def build_graph():
+        return RelationGraph((r[0] for r in char_db.get_character_ids(1)),
+                             char_db.iter_story_edges(1))
+
+    start = time.perf_counter()
+    graph = build_graph()
+    build = (time.perf_counter() - start) * 1000
+
+    # Tracing slows allocations down, so memory is measured with a separate build
+    tracemalloc.start()
+    kept = build_graph()
+    memory = tracemalloc.get_traced_memory()[0] / 1024 / 1024
+    tracemalloc.stop()
+    del kept
+
+    def sql_path(char1_id, char2_id, hops=6):
+        distance = char_db.get_neighborhood(char1_id, hops)
+        return char2_id in distance
+
+    rows = [("query", "graph (ms)", "sql (ms)")]
+    rows.append(("build graph", f"{build:.0f}", "-"))
+    for hops in (1, 2, 3):
+        rows.append((f"{hops}-hop neighborhood",
+                     f"{measure(lambda: graph.neighborhood(pairs[0][0], hops), 5):.2f}",
+                     f"{measure(lambda: char_db.get_neighborhood(pairs[0][0], hops), 5):.2f}"))
+    rows.append(("shortest path (20 pairs)",
+                 f"{measure(lambda: [graph.shortest_path(*p, hops=6) for p in pairs], 1):.2f}",
+                 f"{measure(lambda: [sql_path(*p) for p in pairs], 1):.2f}"))
+    rows.append(("components",
+                 f"{measure(graph.components, 1):.2f}", "-"))
+    rows.append(("derived relations",
+                 f"{measure(lambda: graph.derived_relations(pairs[0][0], {(1, 1): 3}), 20):.3f}",
+                 f"{measure(lambda: char_db.get_two_step_relations(pairs[0][0]), 20):.3f}"))
+    report(f"{characters} characters, {edges} relationship rows, "
+           f"graph takes {memory:.1f} MB", rows)
+
+    con.close()
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
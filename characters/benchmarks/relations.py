@@ -0,0 +1,61 @@
+"""Compares setting relationships one by one with the bulk API, and fetching them
+character by character with fetching the whole story at once.
+
+Usage: python characters/benchmarks/relations.py [edges]
+"""
+
+import sys
+import time
+import random
+from common import temp_connection, fill_characters, report
+# pylint: disable=wrong-import-order
+from repositories.db_characters import CharactersDatabase
+
+
+def random_edges(total: int, characters: int, seed: int) -> list[tuple]:
+    rnd = random.Random(seed)
+    return [(rnd.randint(1, characters), rnd.randint(1, characters), rnd.randint(1, 22), 0)
+            for _ in range(total)]
+
+
+def main(edges: int = 100000):
+    characters = 10000
+    single_edges = min(edges, 2000)
+    con, tmp = temp_connection()
+    fill_characters(con, characters, 1)
+    char_db = CharactersDatabase(con)
+
+    start = time.perf_counter()
+    for edge in random_edges(single_edges, characters, seed=1):
+        char_db.set_relation(*edge)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    char_db.set_relations_bulk(random_edges(edges, characters, seed=2))
+    bulk = time.perf_counter() - start
+
+    rows = [("method", "edges", "seconds", "edges/s"),
+            ("set_relation", single_edges, f"{single:.2f}", f"{single_edges / single:.0f}"),
+            ("set_relations_bulk", edges, f"{bulk:.2f}", f"{edges / bulk:.0f}")]
+    report(f"Relationships between {characters} characters", rows)
+
+    start = time.perf_counter()
+    for (char_id,) in char_db.get_character_ids(1).fetchall():
+        char_db.get_character_relations(char_id)
+    per_character = time.perf_counter() - start
+
+    start = time.perf_counter()
+    char_db.get_story_relations(1)
+    story = time.perf_counter() - start
+
+    rows = [("method", "queries", "seconds"),
+            ("get_character_relations", characters, f"{per_character:.2f}"),
+            ("get_story_relations", 2, f"{story:.2f}")]
+    report(f"Fetching all relationships of a story with {characters} characters", rows)
+
+    con.close()
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
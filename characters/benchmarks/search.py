@@ -0,0 +1,65 @@
+"""Measures full-text search latency and compares it with scanning descriptions with LIKE.
+
+Usage: python characters/benchmarks/search.py [characters]
+"""
+
+import sys
+import time
+from common import temp_connection, fill_characters, measure, report
+# pylint: disable=wrong-import-order
+from repositories.db_characters import CharactersDatabase
+from services.formatter import formatter
+
+# Searches with at most this many milliseconds feel instant while typing
+TARGET_MS = 50
+
+QUERIES = [
+    ("rare word", "4242", None),
+    ("name", "character 4242", None),
+    ("prefix", "424", None),
+    ("common word", "gloomy", None),
+    ("two words in a story", "far away", 7)
+]
+
+
+def like_scan(con, text: str, story_id: int = None):
+    """What searching looks like without a full-text index.
+    """
+
+    pattern = f"%{text}%"
+    story_filter = "AND story_id = ?" if story_id is not None else ""
+    data = (pattern,) * 5 + ((story_id,) if story_id is not None else ())
+    sql = f"""
+        SELECT char_id, story_id, name, picture FROM Characters
+        WHERE (name LIKE ? OR appearance LIKE ? OR personality LIKE ?
+            OR history LIKE ? OR trivia LIKE ?) {story_filter}
+        LIMIT 20
+    """
+    return con.execute(sql, data).fetchall()
+
+
+def main(characters: int = 100000):
+    stories = 100
+    con, tmp = temp_connection()
+    start = time.perf_counter()
+    fill_characters(con, characters, stories)
+    indexing = time.perf_counter() - start
+    char_db = CharactersDatabase(con)
+
+    rows = [("query", "matches", "fts (ms)", "like (ms)", f"< {TARGET_MS} ms")]
+    for label, text, story_id in QUERIES:
+        query = formatter.search_query(text)
+        matches = len(char_db.search(query, story_id=story_id, limit=characters))
+        fts = measure(lambda: char_db.search(query, story_id=story_id), repeat=5)
+        like = measure(lambda: like_scan(con, text.split()[-1], story_id), repeat=5)
+        rows.append((f"{label}: {text}", matches, f"{fts:.2f}", f"{like:.2f}",
+                     "yes" if fts < TARGET_MS else "no"))
+    report(f"{characters} characters in {stories} stories, "
+           f"inserted and indexed in {indexing:.1f} s", rows)
+
+    con.close()
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
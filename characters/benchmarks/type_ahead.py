@@ -0,0 +1,38 @@
+"""Measures type-ahead character lookups while a name is typed one key at a time.
+
+Usage: python characters/benchmarks/type_ahead.py [characters]
+"""
+
+import sys
+from common import temp_connection, fill_characters, measure, report
+# pylint: disable=wrong-import-order
+from repositories.db_characters import CharactersDatabase
+
+# Lookups faster than this keep up with typing
+TARGET_MS = 10
+
+
+def main(characters: int = 100000):
+    con, tmp = temp_connection()
+    fill_characters(con, characters, 1)
+    char_db = CharactersDatabase(con)
+    name = "character 4242"
+
+    full_list = measure(lambda: list(char_db.iter_characters(
+        1, columns=["name", "picture"])), repeat=1)
+    rows = [("typed", "matches", "ms", f"< {TARGET_MS} ms")]
+    for end in range(1, len(name) + 1):
+        prefix = name[:end]
+        matches = len(char_db.find_characters(1, prefix, limit=15))
+        duration = measure(lambda: char_db.find_characters(1, prefix, limit=15), repeat=50)
+        rows.append((repr(prefix), matches, f"{duration:.3f}",
+                     "yes" if duration < TARGET_MS else "no"))
+    report(f"{characters} characters in one story, loading all names takes "
+           f"{full_list:.0f} ms", rows)
+
+    con.close()
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -1,8 +1,11 @@
 from tkinter import Tk
 from ui.ui import UI
+from initialize_db import upgrade_database
 
 
 def main():
+    upgrade_database()
+
     window = Tk()
     window.title("OT-characters")
 
@@ -10,3 +10,36 @@ except FileNotFoundError:
 
 DB_NAME = os.getenv("DB_FILENAME") or "db.sqlite"
 DB_PATH = os.path.join((os.path.dirname(dirname)), "data", DB_NAME)
+
+# Connection presets, selected with DB_PROFILE in .env.
+#   safe: write-ahead log, every commit is synced to disk. Nothing is lost on power failure.
+#   fast: write-ahead log synced only at checkpoints, larger page cache, memory-mapped
+#         reads and temporary tables in memory. A power failure may lose the last
+#         commits, but the database itself never gets corrupted.
+# Single values can be overridden with DB_JOURNAL_MODE, DB_SYNCHRONOUS, DB_CACHE_SIZE,
+# DB_MMAP_SIZE, DB_TEMP_STORE and DB_BUSY_TIMEOUT.
+DB_PROFILES = {
+    "safe": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000
+    },
+    "fast": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,
+        "mmap_size": 268435456,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000
+    }
+}
+
+DB_PROFILE_NAME = (os.getenv("DB_PROFILE") or "safe").lower()
+DB_PROFILE = dict(DB_PROFILES.get(DB_PROFILE_NAME, DB_PROFILES["safe"]))
+for setting in DB_PROFILE:
+    value = os.getenv(f"DB_{setting.upper()}")
+    if value:
+        DB_PROFILE[setting] = value
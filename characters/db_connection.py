@@ -1,8 +1,64 @@
 import sqlite3
-from config import DB_PATH
+from pathlib import Path
+from config import DB_PATH, DB_PROFILE
 
-con = sqlite3.connect(DB_PATH)
-con.row_factory = sqlite3.Row
+JOURNAL_MODES = ["DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"]
+SYNCHRONOUS_LEVELS = ["OFF", "NORMAL", "FULL", "EXTRA"]
+TEMP_STORES = ["DEFAULT", "FILE", "MEMORY"]
+
+
+def _choice(value, choices: list[str], setting: str) -> str:
+    value = str(value).upper()
+    if value not in choices:
+        raise ValueError(f"Invalid value {value} for {setting}")
+    return value
+
+
+def apply_profile(con: sqlite3.Connection, profile: dict) -> None:
+    """Applies connection settings, such as journal mode and cache size, to a connection.
+
+    Args:
+        con (sqlite3.Connection): Connection to be configured.
+        profile (dict): Settings, see DB_PROFILES in config.py.
+    """
+
+    journal_mode = _choice(profile["journal_mode"], JOURNAL_MODES, "journal_mode")
+    synchronous = _choice(profile["synchronous"], SYNCHRONOUS_LEVELS, "synchronous")
+    temp_store = _choice(profile["temp_store"], TEMP_STORES, "temp_store")
+
+    con.execute(f"PRAGMA busy_timeout={int(profile['busy_timeout'])}")
+    con.execute(f"PRAGMA journal_mode={journal_mode}")
+    con.execute(f"PRAGMA synchronous={synchronous}")
+    con.execute(f"PRAGMA cache_size={int(profile['cache_size'])}")
+    con.execute(f"PRAGMA mmap_size={int(profile['mmap_size'])}")
+    con.execute(f"PRAGMA temp_store={temp_store}")
+
+
+def connect(path: str = DB_PATH, profile: dict = None,
+            read_only: bool = False) -> sqlite3.Connection:
+    """Opens a new connection to the database and configures it.
+
+    Args:
+        path (str, optional): Path to the database file. Defaults to DB_PATH.
+        profile (dict, optional): Connection settings. Defaults to the profile chosen in .env.
+        read_only (bool, optional): Open the file read-only, any write raises an error.
+            Defaults to False.
+
+    Returns:
+        sqlite3.Connection: Configured connection.
+    """
+
+    if read_only:
+        connection = sqlite3.connect(
+            Path(path).resolve().as_uri() + "?mode=ro", uri=True)
+    else:
+        connection = sqlite3.connect(path)
+    connection.row_factory = sqlite3.Row
+    apply_profile(connection, profile or DB_PROFILE)
+    return connection
+
+
+con = connect()
 
 
 def get_db_connection():
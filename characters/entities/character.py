@@ -1,7 +1,7 @@
 """The class to represent a character.
     char_id: id as in the database
     story_id: id of the story
-    stats: dictionary that includes the keys:
+    stats: dictionary or CharacterStats that includes the keys:
         name: character's name
         gender: 0=female, 1=male, 2=unknown
         birthday: text dd/mm/YY
@@ -14,18 +14,78 @@
         picture: name of the picture, pictures are stored in characters/lib/avatars
         trivia: additional information on the character
 
+    Stats are stored in a named tuple and the class has no instance dictionary,
+    so loading large stories takes as little memory as possible.
+
     Returns:
         Character: returns a character object.
 """
 
+from collections import namedtuple
 from services.story_service import story_service
 
+STAT_FIELDS = ("name", "gender", "birthday", "age", "height", "weight",
+               "appearance", "personality", "history", "picture", "trivia")
+
+CharacterStats = namedtuple("CharacterStats", STAT_FIELDS,
+                            defaults=(None,) * len(STAT_FIELDS))
+
 
 class Character:
-    def __init__(self, char_id: int, story_id: int, stats: dict) -> None:
+    __slots__ = ("char_id", "story_id", "_stats")
+
+    def __init__(self, char_id: int, story_id: int, stats: dict | CharacterStats) -> None:
         self.char_id = char_id
         self.story_id = story_id
-        self.stats = stats
+        if not isinstance(stats, CharacterStats):
+            stats = CharacterStats(**stats)
+        self._stats = stats
+
+    @classmethod
+    def from_row(cls, row) -> "Character":
+        """Creates a character from a row of the Characters table.
+
+        Args:
+            row (sqlite3.Row): Row with char_id and story_id first, then all or some stats.
+
+        Returns:
+            Character: Character object, stats that weren't selected are None.
+        """
+
+        if len(row) == len(STAT_FIELDS) + 2:
+            return cls(row[0], row[1], CharacterStats._make(row[2:]))
+        return cls(row[0], row[1], CharacterStats(**dict(zip(row.keys()[2:], row[2:]))))
+
+    @property
+    def stats(self) -> dict:
+        """All stats as a new dictionary.
+
+        Returns:
+            dict: Stats by their names.
+        """
+
+        return self._stats._asdict()
+
+    def stat(self, name: str):
+        """Raw value of a single stat.
+
+        Args:
+            name (str): Stat name, see STAT_FIELDS.
+
+        Returns:
+            Any: Value as in the database.
+        """
+
+        return getattr(self._stats, name)
+
+    def update(self, **stats) -> None:
+        """Replaces values of given stats.
+
+        Args:
+            **stats: New values by stat names.
+        """
+
+        self._stats = self._stats._replace(**stats)
 
     def name(self) -> str:
         """Character's name.
@@ -34,7 +94,16 @@ class Character:
             str: Name of the character.
         """
 
-        return self.stats["name"]
+        return self._stats.name
+
+    def picture(self) -> str:
+        """Name of character's avatar.
+
+        Returns:
+            str: Picture name, "default" if the character doesn't have an avatar.
+        """
+
+        return self._stats.picture or "default"
 
     def image(self) -> str:
         """Path to character's avatar.
@@ -45,8 +114,7 @@ class Character:
             str: Path to character's avatar.
         """
 
-        pic = self.stats["picture"] or "default"
-        return f"../library/avatars/{pic}.png"
+        return f"../library/avatars/{self.picture()}.png"
 
     def gender(self) -> str:
         """String representantion of character's gender.
@@ -59,7 +127,7 @@ class Character:
             "0": "Female",
             "1": "Male",
             "2": "Unknown"
-        }[str(self.stats["gender"])]
+        }[str(self._stats.gender)]
 
     def age(self) -> str:
         """String representation of character's age.
@@ -70,7 +138,7 @@ class Character:
             str: Character's age.
         """
 
-        age = self.stats["age"]
+        age = self._stats.age
         if age == 0:
             return "0"
         if age:
@@ -87,7 +155,7 @@ class Character:
             str: Character's birthday.
         """
 
-        birthday = self.stats["birthday"]
+        birthday = self._stats.birthday
         if not birthday:
             return "Unknown"
         if birthday[-4:] == "????":
@@ -102,7 +170,7 @@ class Character:
         Returns:
             str: Character's height in centimeters.
         """
-        h = self.stats["height"]
+        h = self._stats.height
         if h:
             return f"{h} cm"
         return "??? cm"
@@ -114,17 +182,17 @@ class Character:
             str: Character's weight in kilograms.
         """
 
-        w = self.stats["weight"]
+        w = self._stats.weight
         if w:
             return f"{w} kg"
         return "?? kg"
 
     def __str__(self) -> str:
-        return f"{self.stats['name']} from {story_service.get_name_by_id(self.story_id)}"
+        return f"{self._stats.name} from {story_service.get_name_by_id(self.story_id)}"
 
     def __eq__(self, __value: "Character") -> bool:
         return (
             self.char_id == __value.char_id
             and self.story_id == __value.story_id
-            and self.stats == __value.stats
+            and self._stats == __value._stats
         )
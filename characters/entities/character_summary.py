@@ -0,0 +1,56 @@
+"""Lightweight representation of a character for lists and pickers.
+
+    char_id: id as in the database
+    story_id: id of the story
+    name: character's name
+    picture: name of the picture, None if the character has no avatar
+
+    Returns:
+        CharacterSummary: Character without descriptions and other stats.
+"""
+
+
+class CharacterSummary:
+    def __init__(self, char_id: int, story_id: int, name: str, picture: str = None) -> None:
+        self.char_id = char_id
+        self.story_id = story_id
+        self._name = name
+        self._picture = picture
+
+    def name(self) -> str:
+        """Character's name.
+
+        Returns:
+            str: Name of the character.
+        """
+
+        return self._name
+
+    def picture(self) -> str:
+        """Name of character's avatar.
+
+        Returns:
+            str: Picture name, "default" if the character doesn't have an avatar.
+        """
+
+        return self._picture or "default"
+
+    def image(self) -> str:
+        """Path to character's avatar.
+
+        Returns:
+            str: Path to character's avatar.
+        """
+
+        return f"../library/avatars/{self.picture()}.png"
+
+    def __str__(self) -> str:
+        return f"{self.char_id}. {self._name}"
+
+    def __eq__(self, __value: "CharacterSummary") -> bool:
+        return (
+            self.char_id == __value.char_id
+            and self.story_id == __value.story_id
+            and self._name == __value._name
+            and self._picture == __value._picture
+        )
@@ -0,0 +1,25 @@
+"""A character found by full-text search.
+
+    character: CharacterSummary of the found character
+    snippet: part of the matching text, matches are surrounded by [ and ]
+
+    Returns:
+        SearchResult: SearchResult object.
+"""
+
+from entities.character_summary import CharacterSummary
+
+
+class SearchResult:
+    def __init__(self, character: CharacterSummary, snippet: str) -> None:
+        self.character = character
+        self.snippet = snippet
+
+    def __str__(self) -> str:
+        return f"{self.character.name()}: {self.snippet}"
+
+    def __eq__(self, __value: "SearchResult") -> bool:
+        return (
+            self.character == __value.character
+            and self.snippet == __value.snippet
+        )
@@ -0,0 +1,45 @@
+"""This class represents statistics of characters in a story.
+
+    mean_age:       Mean age of characters whose age is known
+    mean_height:    Mean height of characters whose height and weight are known
+    mean_weight:    Mean weight of characters whose height and weight are known
+    genders:        Percentages of genders {"female": x, "male": y, "unknown": z}
+    completion:     Percentage of filled character stats
+
+    Returns:
+        StoryStatistics: StoryStatistics object.
+"""
+
+
+class StoryStatistics:
+    def __init__(self, mean_age: float, mean_height: float, mean_weight: float,
+                 genders: dict, completion: float) -> None:
+        self.mean_age = mean_age
+        self.mean_height = mean_height
+        self.mean_weight = mean_weight
+        self.genders = genders
+        self.completion = completion
+
+    def physique(self) -> str:
+        """String representation of mean height and weight.
+
+        Returns:
+            str: 'X.x cm, Y.y kg'
+        """
+
+        return f"{self.mean_height} cm, {self.mean_weight} kg"
+
+    def __str__(self) -> str:
+        g = self.genders
+        return (f"{self.mean_age} years, {self.physique()}, "
+                f"{g['female']}% F / {g['male']}% M / {g['unknown']}% U, "
+                f"{self.completion}% complete")
+
+    def __eq__(self, __value: "StoryStatistics") -> bool:
+        return (
+            self.mean_age == __value.mean_age
+            and self.mean_height == __value.mean_height
+            and self.mean_weight == __value.mean_weight
+            and self.genders == __value.genders
+            and self.completion == __value.completion
+        )
@@ -0,0 +1,36 @@
+import argparse
+from initialize_db import upgrade_database
+from services.story_service import story_service
+
+
+def export_story(story_id: int, path: str, sqlite: bool = False):
+    upgrade_database()
+    if sqlite:
+        story_service.export_story_database(story_id, path)
+        print(f"Succesfully exported story {story_id}.")
+        return
+    with open(path, "w", encoding="utf-8") as fp:
+        total = story_service.export_story(story_id, fp)
+    print(f"Succesfully exported {total} characters.")
+
+
+def import_story(path: str):
+    upgrade_database()
+    with open(path, encoding="utf-8") as fp:
+        story = story_service.import_story(fp)
+    print(f"Succesfully imported story {story.name} with id {story.story_id}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Exports a story to a JSON Lines file or imports it back.")
+    parser.add_argument("path", help="JSON Lines or SQLite file")
+    parser.add_argument("story", type=int, nargs="?",
+                        help="id of the story to export, omit to import the file")
+    parser.add_argument("--sqlite", action="store_true",
+                        help="export as a standalone SQLite database")
+    args = parser.parse_args()
+    if args.story is None:
+        import_story(args.path)
+    else:
+        export_story(args.story, args.path, args.sqlite)
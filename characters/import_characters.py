@@ -0,0 +1,32 @@
+import argparse
+import os
+from initialize_db import upgrade_database
+from services.character_service import char_service
+
+
+def import_characters(path: str, story_id: int, file_format: str = None, batch_size: int = 1000):
+    file_format = file_format or os.path.splitext(path)[1].lstrip(".").lower()
+    if file_format == "json":
+        file_format = "jsonl"
+
+    def progress(total: int):
+        print(f"\r{total} characters imported", end="", flush=True)
+
+    upgrade_database()
+    with open(path, encoding="utf-8", newline="") as fp:
+        total = char_service.import_characters(
+            fp, story_id, file_format=file_format, batch_size=batch_size, progress=progress)
+    print(f"\rSuccesfully imported {total} characters.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Imports characters into a story from a CSV or JSON Lines file.")
+    parser.add_argument("path", help="CSV or JSON Lines file")
+    parser.add_argument("story", type=int, help="id of the story")
+    parser.add_argument("--format", choices=["csv", "jsonl"],
+                        help="file format, guessed from the file extension by default")
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="characters per transaction")
+    args = parser.parse_args()
+    import_characters(args.path, args.story, args.format, args.batch_size)
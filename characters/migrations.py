@@ -0,0 +1,282 @@
+"""Versioned schema migrations.
+
+The schema version of a database is stored in PRAGMA user_version. Migration number n
+brings the database from version n - 1 to version n. Every migration runs in its own
+transaction together with the version bump, so a failed migration leaves the database
+as it was. Never edit a migration that has been released, add a new one instead.
+"""
+
+import sqlite3
+import json
+import os
+from repositories import executor as e
+
+REL_FILE = "relations.json"
+
+
+def get_relations() -> list[tuple]:
+    fpath = os.path.abspath(__file__)
+    rpath = os.path.join(os.path.dirname(fpath), "data", REL_FILE)
+    with open(rpath, encoding="utf-8") as f:
+        raw_relations = f.read()
+        relations = json.loads(raw_relations)
+    relations_list = relations['relations']
+    sql_inputs = []
+    for r in relations_list:
+        if r['two_sided'] == 1:
+            i = (
+                r['id'],
+                r['name'],
+                r['female_name'],
+                r['male_name'],
+                r['two_sided'],
+                r['counterpart']
+            )
+        else:
+            i = (r['id'], r['name'], r['female_name'],
+                 r['male_name'], r['two_sided'], None)
+        sql_inputs.append(i)
+    return sql_inputs
+
+
+def create_tables(con: sqlite3.Connection):
+    """Version 1: base schema and relations from relations.json.
+
+    Tables are created only if missing, so databases made before versioning adopt this
+    version without losing anything.
+    """
+
+    cur = con.cursor()
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS Stories (
+            story_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            desc TEXT
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS Characters (
+            char_id INTEGER PRIMARY KEY,
+            story_id INTEGER,
+            name TEXT NOT NULL,
+            gender INTEGER,
+            birthday TEXT,
+            age INTEGER,
+            height INTEGER,
+            weight INTEGER,
+            appearance TEXT,
+            personality TEXT,
+            history TEXT,
+            picture TEXT,
+            trivia TEXT,
+            FOREIGN KEY (story_id)
+                REFERENCES Stories(story_id)
+                    ON DELETE CASCADE
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS Relations (
+            relation_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            female_name TEXT,
+            male_name TEXT,
+            two_sided INTEGER NOT NULL,
+            counterpart INTEGER DEFAULT NULL
+        )
+    """)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS CharacterRelations (
+            char1_id INTEGER NOT NULL,
+            char2_id INTEGER NOT NULL,
+            relation_id INTEGER NOT NULL,
+            former INTEGER DEFAULT 0,
+            FOREIGN KEY (char1_id)
+                REFERENCES Characters(char_id)
+                    ON DELETE CASCADE,
+            FOREIGN KEY (char2_id)
+                REFERENCES Characters(char_id)
+                    ON DELETE CASCADE,
+            FOREIGN KEY (relation_id)
+                REFERENCES Relations(relation_id)
+                    ON DELETE CASCADE
+        )
+    """)
+    cur.executemany("""
+        INSERT OR REPLACE INTO Relations (
+            relation_id, name, female_name, male_name, two_sided, counterpart
+        ) VALUES (?, ?, ?, ?, ?, ?)
+    """, get_relations())
+
+
+def create_indexes(con: sqlite3.Connection):
+    """Version 2: secondary indexes for the most common lookups.
+
+    Duplicate relationship rows are removed before the unique index on relationship
+    edges is created.
+    """
+
+    cur = con.cursor()
+    cur.execute("""
+        DELETE FROM CharacterRelations
+        WHERE rowid NOT IN (
+            SELECT MIN(rowid)
+            FROM CharacterRelations
+            GROUP BY char1_id, char2_id, relation_id
+        )
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_characters_story_id
+        ON Characters(story_id)
+    """)
+    cur.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_charrel_edge
+        ON CharacterRelations(char1_id, char2_id, relation_id)
+    """)
+    cur.execute("""
+        CREATE INDEX IF NOT EXISTS idx_charrel_char2_id
+        ON CharacterRelations(char2_id)
+    """)
+    cur.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_relations_name
+        ON Relations(name)
+    """)
+
+
+def create_search_index(con: sqlite3.Connection):
+    """Version 3: full-text index over character names and descriptions.
+
+    CharacterSearch is an FTS5 table that stores only the index, the text itself stays
+    in Characters. Triggers keep the index in sync and existing characters are indexed
+    with a rebuild.
+    """
+
+    cur = con.cursor()
+    cur.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS CharacterSearch USING fts5(
+            name,
+            appearance,
+            personality,
+            history,
+            trivia,
+            content='Characters',
+            content_rowid='char_id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS characters_search_insert
+        AFTER INSERT ON Characters BEGIN
+            INSERT INTO CharacterSearch(
+                rowid, name, appearance, personality, history, trivia
+            ) VALUES (
+                new.char_id, new.name, new.appearance, new.personality,
+                new.history, new.trivia
+            );
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS characters_search_delete
+        AFTER DELETE ON Characters BEGIN
+            INSERT INTO CharacterSearch(
+                CharacterSearch, rowid, name, appearance, personality, history, trivia
+            ) VALUES (
+                'delete', old.char_id, old.name, old.appearance, old.personality,
+                old.history, old.trivia
+            );
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS characters_search_update
+        AFTER UPDATE OF name, appearance, personality, history, trivia
+        ON Characters BEGIN
+            INSERT INTO CharacterSearch(
+                CharacterSearch, rowid, name, appearance, personality, history, trivia
+            ) VALUES (
+                'delete', old.char_id, old.name, old.appearance, old.personality,
+                old.history, old.trivia
+            );
+            INSERT INTO CharacterSearch(
+                rowid, name, appearance, personality, history, trivia
+            ) VALUES (
+                new.char_id, new.name, new.appearance, new.personality,
+                new.history, new.trivia
+            );
+        END
+    """)
+    cur.execute("INSERT INTO CharacterSearch(CharacterSearch) VALUES ('rebuild')")
+
+
+def create_name_index(con: sqlite3.Connection):
+    """Version 4: case-insensitive index on character names within a story.
+
+    Used by type-ahead pickers to find characters whose name starts with given text.
+    """
+
+    con.execute("""
+        CREATE INDEX IF NOT EXISTS idx_characters_story_name
+        ON Characters(story_id, name COLLATE NOCASE)
+    """)
+
+
+def create_name_key(con: sqlite3.Connection):
+    """Version 5: case-folded names for searching by name prefix.
+
+    COLLATE NOCASE folds only ASCII letters, so "é" didn't find "Élise". Names are
+    case-folded in Python instead and stored in name_key, which replaces the name index.
+    """
+
+    con.execute("ALTER TABLE Characters ADD COLUMN name_key TEXT")
+    rows = con.execute(
+        "SELECT name, char_id FROM Characters WHERE name IS NOT NULL").fetchall()
+    con.executemany("UPDATE Characters SET name_key = ? WHERE char_id = ?",
+                    [(name.casefold(), char_id) for name, char_id in rows])
+    con.execute("DROP INDEX IF EXISTS idx_characters_story_name")
+    con.execute("""
+        CREATE INDEX IF NOT EXISTS idx_characters_story_name_key
+        ON Characters(story_id, name_key)
+    """)
+
+
+MIGRATIONS = [
+    create_tables,
+    create_indexes,
+    create_search_index,
+    create_name_index,
+    create_name_key
+]
+
+
+def get_version(con: sqlite3.Connection) -> int:
+    """Schema version of the database.
+
+    Args:
+        con (sqlite3.Connection): Connection to the database.
+
+    Returns:
+        int: Number of migrations applied, 0 for an empty or unversioned database.
+    """
+
+    return con.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(con: sqlite3.Connection, version: int = None, migrations: list = None) -> int:
+    """Applies all migrations the database doesn't have yet.
+
+    Args:
+        con (sqlite3.Connection): Connection to the database.
+        version (int, optional): Stop at this version. Defaults to the latest one.
+        migrations (list, optional): Migration functions. Defaults to MIGRATIONS.
+
+    Returns:
+        int: Schema version after migrating.
+    """
+
+    migrations = migrations if migrations is not None else MIGRATIONS
+    target = len(migrations) if version is None else version
+    current = get_version(con)
+    while current < target:
+        with e.transaction(con):
+            migrations[current](con)
+            con.execute(f"PRAGMA user_version={current + 1}")
+        current += 1
+    return current
@@ -6,13 +6,50 @@
 
 import sqlite3
 from db_connection import get_db_connection
-from services.formatter import formatter
 from . import executor as e
+from .relation_catalog import RelationCatalog
+
+
+# Character stats in the order of Characters table columns
+CHARACTER_COLUMNS = ["name", "gender", "birthday", "age", "height", "weight",
+                     "appearance", "personality", "history", "picture", "trivia"]
+
+
+def name_key(name: str | None) -> str | None:
+    """Case-folded name that find_characters compares, NOCASE would fold only ASCII.
+
+    Args:
+        name (str | None): Name of a character.
+
+    Returns:
+        str | None: Name in a form where "Élise" and "élise" are the same.
+    """
+
+    return name.casefold() if name is not None else None
 
 
 class CharactersDatabase:
     def __init__(self, con: sqlite3.Connection) -> None:
         self._con = con
+        self.relations = RelationCatalog(con)
+
+    def transaction(self):
+        """Transaction scope that commits all statements of a logical operation at once.
+
+        Returns:
+            ContextManager: Use as `with char_db.transaction():`.
+        """
+
+        return e.transaction(self._con)
+
+    def bulk(self):
+        """Transaction scope for importing large amounts of data.
+
+        Returns:
+            ContextManager: Use as `with char_db.bulk():`.
+        """
+
+        return e.bulk(self._con)
 
     def create_character(self, stats: tuple) -> int:
         """Creates a character and adds it to the database.
@@ -23,7 +60,7 @@ class CharactersDatabase:
             int: New character's id as in the database.
         """
 
-        data = stats
+        data = tuple(stats) + (name_key(stats[1]),)
         sql = """
             INSERT INTO Characters(
                 story_id,
@@ -37,14 +74,67 @@ class CharactersDatabase:
                 personality,
                 history,
                 picture,
-                trivia
-            ) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                trivia,
+                name_key
+            ) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
 
         cur = e.execute_sql(self._con, sql, data)
         char_id = cur.lastrowid
         return char_id
 
+    def create_characters(self, rows) -> None:
+        """Adds many characters to the database with one statement.
+
+        Args:
+            rows (Iterable[tuple]): Tuples in the same form as in create_character.
+        """
+
+        sql = """
+            INSERT INTO Characters(
+                story_id,
+                name,
+                gender,
+                birthday,
+                age,
+                height,
+                weight,
+                appearance,
+                personality,
+                history,
+                picture,
+                trivia,
+                name_key
+            ) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """
+
+        e.execute_many(self._con, sql, (tuple(row) + (name_key(row[1]),) for row in rows))
+
+    def insert_characters(self, rows) -> None:
+        """Adds many characters with given ids, for example when importing a story.
+
+        Args:
+            rows (Iterable[tuple]): (char_id, story_id, name, gender, birthday, age, height,
+                weight, appearance, personality, history, picture, trivia) tuples.
+        """
+
+        columns = ["char_id", "story_id"] + CHARACTER_COLUMNS + ["name_key"]
+        sql = f"""
+            INSERT INTO Characters({", ".join(columns)})
+            VALUES({", ".join("?" * len(columns))})
+        """
+        e.execute_many(self._con, sql, (tuple(row) + (name_key(row[2]),) for row in rows))
+
+    def max_character_id(self) -> int:
+        """Largest character id in use.
+
+        Returns:
+            int: Character id, 0 if there are no characters.
+        """
+
+        sql = "SELECT COALESCE(MAX(char_id), 0) FROM Characters"
+        return self._con.execute(sql).fetchone()[0]
+
     def update_character(self, stats: tuple) -> None:
         """Updates character's information in the database.
 
@@ -64,10 +154,12 @@ class CharactersDatabase:
                 personality=?,
                 history=?,
                 trivia=?,
-                name=?
+                name=?,
+                name_key=?
             WHERE char_id=?
         """
-        e.execute_sql(self._con, sql, stats)
+        data = tuple(stats[:-1]) + (name_key(stats[-2]), stats[-1])
+        e.execute_sql(self._con, sql, data)
 
     def update_image(self, picture: str, char_id: int) -> None:
         """Updated character's avatar.
@@ -80,40 +172,177 @@ class CharactersDatabase:
         sql = "UPDATE Characters SET picture=? WHERE char_id=?"
         e.execute_sql(self._con, sql, (picture, char_id))
 
-    def get_characters_by_story_id(self, story_id: int) -> list[dict]:
+    def get_characters_by_story_id(self, story_id: int) -> list[sqlite3.Row]:
         """Searches all characters from a certain story.
 
         Args:
             story_id (int): Story id as in the database.
 
         Returns:
-            list[dict]: Contains characters represented by a dictionary.
+            list[sqlite3.Row]: Rows of the Characters table, None if there are no characters.
         """
 
-        sql = "SELECT * FROM Characters WHERE story_id=?"
+        sql = f"SELECT {self._select_columns()} FROM Characters WHERE story_id=? ORDER BY char_id"
 
         cur = self._con.cursor()
         res = cur.execute(sql, (story_id, )).fetchall()
         if not res:
             return None
-        characters = formatter.characters_to_dict(res)
-        return characters
+        return res
 
-    def get_relations(self) -> list[str]:
-        """Names of all relations from the database.
+    def get_characters_page(self, story_id: int, after_id: int = 0, limit: int = 50,
+                            columns: list[str] = None) -> list[sqlite3.Row]:
+        """Searches the next page of characters from a certain story, ordered by id.
+
+        Uses keyset pagination: pass the id of the last character of the previous page
+        as after_id, so every page is an index range scan regardless of its position.
+
+        Args:
+            story_id (int): Story id as in the database.
+            after_id (int, optional): Id of the last character already loaded. Defaults to 0.
+            limit (int, optional): Maximum number of characters. Defaults to 50.
+            columns (list[str], optional): Stats to select, see CHARACTER_COLUMNS.
+                Defaults to all of them.
 
         Returns:
-            list[str]: List that contains all relation names.
+            list[sqlite3.Row]: Rows with char_id, story_id and selected stats, empty after the last page.
         """
 
-        sql = "SELECT name FROM Relations"
+        selected = self._select_columns(columns)
+        sql = f"""
+            SELECT {selected} FROM Characters
+            WHERE story_id=? AND char_id>?
+            ORDER BY char_id
+            LIMIT ?
+        """
 
         cur = self._con.cursor()
-        res = cur.execute(sql).fetchall()
-        relations = []
-        for r in res:
-            relations.append(r[0])
-        return relations
+        return cur.execute(sql, (story_id, after_id, limit)).fetchall()
+
+    def iter_characters(self, story_id: int, batch_size: int = 500, columns: list[str] = None):
+        """Streams all characters of a story, ordered by id.
+
+        Characters are fetched in batches, so only one batch is in memory at a time.
+
+        Args:
+            story_id (int): Story id as in the database.
+            batch_size (int, optional): Characters fetched per query. Defaults to 500.
+            columns (list[str], optional): Stats to select, see CHARACTER_COLUMNS.
+                Defaults to all of them.
+
+        Yields:
+            sqlite3.Row: Row with char_id, story_id and selected stats.
+        """
+
+        after_id = 0
+        while True:
+            page = self.get_characters_page(
+                story_id, after_id=after_id, limit=batch_size, columns=columns)
+            yield from page
+            if len(page) < batch_size:
+                return
+            after_id = page[-1][0]
+
+    def _select_columns(self, columns: list[str] = None) -> str:
+        """Builds column list of a SELECT statement, ids always come first.
+
+        Args:
+            columns (list[str], optional): Stats to select. Defaults to all of them.
+
+        Returns:
+            str: Comma-separated column names.
+        """
+
+        if columns is None:
+            columns = CHARACTER_COLUMNS
+        for column in columns:
+            if column not in CHARACTER_COLUMNS:
+                raise ValueError(f"Unknown character column {column}")
+        return ", ".join(["char_id", "story_id"] + list(columns))
+
+    def get_character(self, char_id: int) -> sqlite3.Row:
+        """Searches a single character by their id.
+
+        Args:
+            char_id (int): Character id
+
+        Returns:
+            sqlite3.Row: Row of the Characters table, None if not found.
+        """
+
+        sql = f"SELECT {self._select_columns()} FROM Characters WHERE char_id=?"
+
+        cur = self._con.cursor()
+        return cur.execute(sql, (char_id, )).fetchone()
+
+    def find_characters(self, story_id: int, prefix: str = "", limit: int = 10) -> list[sqlite3.Row]:
+        """Searches characters of a story whose name starts with prefix, ignoring case.
+
+        Names are compared by their name_key, which is case-folded for all of Unicode.
+        The prefix is turned into a range of keys, so the query reads only the matching
+        part of the name index and stops after limit rows.
+
+        Args:
+            story_id (int): Story id as in the database.
+            prefix (str, optional): Beginning of the name. Defaults to "", all characters.
+            limit (int, optional): Maximum number of characters. Defaults to 10.
+
+        Returns:
+            list[sqlite3.Row]: Rows with char_id, story_id, name and picture, ordered by name.
+        """
+
+        sql = """
+            SELECT char_id, story_id, name, picture FROM Characters
+            WHERE story_id = :story_id
+                AND name_key >= :low
+                AND name_key < :high
+            ORDER BY name_key, char_id
+            LIMIT :limit
+        """
+
+        # U+10FFFF sorts after every character that may follow the prefix
+        low = name_key(prefix)
+        data = {"story_id": story_id, "low": low,
+                "high": low + "\U0010ffff", "limit": limit}
+        return self._con.execute(sql, data).fetchall()
+
+    def search(self, query: str, story_id: int = None, limit: int = 20) -> list[sqlite3.Row]:
+        """Full-text search over names and descriptions of characters.
+
+        Name matches weigh more than matches in descriptions.
+
+        Args:
+            query (str): FTS5 query, see Formatter.search_query.
+            story_id (int, optional): Search only this story. Defaults to all stories.
+            limit (int, optional): Maximum number of results. Defaults to 20.
+
+        Returns:
+            list[sqlite3.Row]: Rows with char_id, story_id, name, picture and snippet,
+                best matches first.
+        """
+
+        story_filter = "AND c.story_id = :story_id" if story_id is not None else ""
+        sql = f"""
+            SELECT c.char_id, c.story_id, c.name, c.picture,
+                snippet(CharacterSearch, -1, '[', ']', '...', 12) AS snippet
+            FROM CharacterSearch s
+            JOIN Characters c ON c.char_id = s.rowid
+            WHERE CharacterSearch MATCH :query {story_filter}
+            ORDER BY bm25(CharacterSearch, 10.0, 1.0, 1.0, 1.0, 1.0)
+            LIMIT :limit
+        """
+
+        data = {"query": query, "story_id": story_id, "limit": limit}
+        return self._con.execute(sql, data).fetchall()
+
+    def get_relations(self) -> list[str]:
+        """Names of all relations.
+
+        Returns:
+            list[str]: List that contains all relation names.
+        """
+
+        return self.relations.names()
 
     def get_character_relations(self, char_id: int) -> list[tuple]:
         """All relationships of a certain character.
@@ -152,6 +381,196 @@ class CharactersDatabase:
             relations.append((r[0], r[1], r[2], r[3], r[4], r[5], r[6]))
         return relations
 
+    def get_story_relations(self, story_id: int) -> list[tuple]:
+        """All relationships between characters of a story at once.
+
+        Names and genders of the story's characters are read with one query and the
+        relationships with another, then joined in memory together with relation names
+        from the catalog. This is cheaper than looking up the related character's row,
+        with all its descriptions, for every relationship.
+
+        Args:
+            story_id (int): Story id as in the database.
+
+        Returns:
+            list[tuple]: (char1_id, name, former, relation, char2_id, relation id, two-sided,
+                counterpart) ordered by char1_id. The rest of the tuple after char1_id is
+                the same as in get_character_relations.
+        """
+
+        characters_sql = "SELECT char_id, name, gender FROM Characters WHERE story_id = ?"
+        relations_sql = """
+            SELECT charrel.char1_id, charrel.char2_id, charrel.relation_id, charrel.former
+            FROM Characters owner
+            JOIN CharacterRelations charrel ON charrel.char1_id = owner.char_id
+            WHERE owner.story_id = ?
+            ORDER BY owner.char_id
+        """
+
+        cur = self._con.cursor()
+        cur.row_factory = None
+        characters = {r[0]: (r[1], r[2]) for r in cur.execute(characters_sql, (story_id,))}
+        relations = []
+        for char1_id, char2_id, relation_id, former in cur.execute(relations_sql, (story_id,)):
+            character = characters.get(char2_id)
+            if character is None:
+                continue
+            two_sided, counterpart = self.relations.two_sided(relation_id)
+            relations.append((
+                char1_id, character[0], former,
+                self.relations.gendered_name(relation_id, character[1]),
+                char2_id, relation_id, two_sided, counterpart))
+        return relations
+
+    def iter_story_relations(self, story_id: int) -> sqlite3.Cursor:
+        """Streams all relationships between characters of a story.
+
+        Args:
+            story_id (int): Story id as in the database.
+
+        Returns:
+            sqlite3.Cursor: Yields (char1_id, char2_id, relation name, former) rows.
+        """
+
+        sql = """
+            SELECT cr.char1_id, cr.char2_id, r.name, cr.former
+            FROM CharacterRelations cr
+            JOIN Characters c1 ON c1.char_id = cr.char1_id
+            JOIN Characters c2 ON c2.char_id = cr.char2_id
+            JOIN Relations r ON r.relation_id = cr.relation_id
+            WHERE c1.story_id = ? AND c2.story_id = ?
+            ORDER BY cr.char1_id
+        """
+        return self._con.execute(sql, (story_id, story_id))
+
+    def get_character_ids(self, story_id: int) -> sqlite3.Cursor:
+        """Streams ids of all characters of a story.
+
+        Args:
+            story_id (int): Story id as in the database.
+
+        Returns:
+            sqlite3.Cursor: Yields (char_id,) rows ordered by id.
+        """
+
+        sql = "SELECT char_id FROM Characters WHERE story_id=? ORDER BY char_id"
+        return self._con.execute(sql, (story_id,))
+
+    def iter_story_edges(self, story_id: int) -> sqlite3.Cursor:
+        """Streams relationships of a story as plain ids, for building relation graphs.
+
+        Args:
+            story_id (int): Story id as in the database.
+
+        Returns:
+            sqlite3.Cursor: Yields (char1_id, char2_id, relation_id) rows.
+        """
+
+        sql = """
+            SELECT cr.char1_id, cr.char2_id, cr.relation_id
+            FROM CharacterRelations cr
+            JOIN Characters c ON c.char_id = cr.char1_id
+            WHERE c.story_id = ?
+        """
+        return self._con.execute(sql, (story_id,))
+
+    def count_story_edges(self, story_id: int) -> int:
+        """Counts relationship rows of a story.
+
+        Args:
+            story_id (int): Story id as in the database.
+
+        Returns:
+            int: Number of rows, both directions of two-sided relations included.
+        """
+
+        sql = """
+            SELECT COUNT(*)
+            FROM CharacterRelations cr
+            JOIN Characters c ON c.char_id = cr.char1_id
+            WHERE c.story_id = ?
+        """
+        return self._con.execute(sql, (story_id,)).fetchone()[0]
+
+    def get_character_edges(self, char_id: int) -> list[tuple]:
+        """Relationship rows in which a character takes part on either side.
+
+        Args:
+            char_id (int): Character id
+
+        Returns:
+            list[tuple]: (char1_id, char2_id, relation_id) tuples.
+        """
+
+        sql = """
+            SELECT char1_id, char2_id, relation_id FROM CharacterRelations
+            WHERE char1_id = :char_id
+            UNION
+            SELECT char1_id, char2_id, relation_id FROM CharacterRelations
+            WHERE char2_id = :char_id
+        """
+        rows = self._con.execute(sql, {"char_id": char_id}).fetchall()
+        return [tuple(r) for r in rows]
+
+    def get_neighborhood(self, char_id: int, hops: int = None) -> dict[int, int]:
+        """Characters reachable from a character through relationships in either direction.
+
+        Walks the relationships with a recursive query, without loading a graph.
+
+        Args:
+            char_id (int): Character id
+            hops (int, optional): Maximum number of relationships between the character and
+                the found ones. Defaults to None, no limit.
+
+        Returns:
+            dict[int, int]: Number of hops by character id, the character itself included
+                with 0.
+        """
+
+        sql = """
+            WITH RECURSIVE reached(char_id, hops) AS (
+                SELECT :char_id, 0
+                UNION
+                SELECT cr.char2_id, r.hops + 1 FROM reached r
+                JOIN CharacterRelations cr ON cr.char1_id = r.char_id
+                WHERE r.hops < :hops
+                UNION
+                SELECT cr.char1_id, r.hops + 1 FROM reached r
+                JOIN CharacterRelations cr ON cr.char2_id = r.char_id
+                WHERE r.hops < :hops
+            )
+            SELECT char_id, MIN(hops) FROM reached GROUP BY char_id
+        """
+        if hops is None:
+            # No path is longer than the number of characters in the story
+            hops = self._con.execute("""
+                SELECT COUNT(*) FROM Characters
+                WHERE story_id IS (SELECT story_id FROM Characters WHERE char_id = ?)
+            """, (char_id,)).fetchone()[0]
+
+        rows = self._con.execute(sql, {"char_id": char_id, "hops": hops}).fetchall()
+        return {r[0]: r[1] for r in rows}
+
+    def get_two_step_relations(self, char_id: int) -> list[tuple]:
+        """Pairs of relationships that lead from a character to a relative's relative.
+
+        Args:
+            char_id (int): Character id
+
+        Returns:
+            list[tuple]: (char3_id, first relation_id, second relation_id) tuples, where
+                char2 is first relation to char1 and char3 is second relation to char2.
+        """
+
+        sql = """
+            SELECT second.char2_id, first.relation_id, second.relation_id
+            FROM CharacterRelations first
+            JOIN CharacterRelations second ON second.char1_id = first.char2_id
+            WHERE first.char1_id = :char_id AND second.char2_id != :char_id
+        """
+        rows = self._con.execute(sql, {"char_id": char_id}).fetchall()
+        return [tuple(r) for r in rows]
+
     def get_relation_id_from_name(self, name: str) -> int:
         """Id of a relation based on its name.
 
@@ -162,17 +581,14 @@ class CharactersDatabase:
             int: Relation id.
         """
 
-        sql = "SELECT relation_id FROM Relations WHERE name=?"
-
-        cur = self._con.cursor()
-        res = cur.execute(sql, (name,)).fetchone()[0]
-        return res
+        return self.relations.id_from_name(name)
 
     def set_relation(self, char1_id: int, char2_id: int, relation_id: int, former: int) -> None:
         """Sets a relationship between two characters.
 
         Char2 is a ___ to char1.
         If the relation is two-sided, also updates char2.
+        Setting the same relationship twice has no effect.
 
         Args:
             char1_id (int): Id of the first character.
@@ -187,7 +603,7 @@ class CharactersDatabase:
             data = (char1_id, char2_id, relation_id, former,
                     char2_id, char1_id, ts[1], former)
             sql = """
-                INSERT INTO CharacterRelations(
+                INSERT OR IGNORE INTO CharacterRelations(
                     char1_id,
                     char2_id,
                     relation_id,
@@ -198,7 +614,7 @@ class CharactersDatabase:
         else:
             data = (char1_id, char2_id, relation_id, former)
             sql = """
-                INSERT INTO CharacterRelations(
+                INSERT OR IGNORE INTO CharacterRelations(
                     char1_id,
                     char2_id,
                     relation_id,
@@ -208,6 +624,40 @@ class CharactersDatabase:
 
         e.execute_sql(self._con, sql, data)
 
+    def set_relations_bulk(self, relations) -> int:
+        """Sets many relationships at once with a single transaction.
+
+        Counterparts of two-sided relations are added in memory and duplicates are
+        dropped before inserting. Relationships that already exist are kept as they are.
+
+        Args:
+            relations (Iterable[tuple]): (char1_id, char2_id, relation_id, former) tuples,
+                char2 is a ___ to char1.
+
+        Returns:
+            int: Number of distinct relationship rows, counterparts included.
+        """
+
+        rows = {}
+        for char1_id, char2_id, relation_id, former in relations:
+            rows.setdefault((char1_id, char2_id, relation_id), former)
+            ts = self._is_relation_twosided(relation_id=relation_id)
+            if ts[0] == 1:
+                rows.setdefault((char2_id, char1_id, ts[1]), former)
+
+        sql = """
+            INSERT OR IGNORE INTO CharacterRelations(
+                char1_id,
+                char2_id,
+                relation_id,
+                former
+            ) VALUES (?, ?, ?, ?)
+        """
+        with self.transaction():
+            e.execute_many(self._con, sql,
+                           (edge + (former,) for edge, former in rows.items()))
+        return len(rows)
+
     def _is_relation_twosided(self, relation_id: int) -> tuple:
         """Checks if a relation is two-sided or not. If it is, returns also the counterpart.
 
@@ -218,19 +668,7 @@ class CharactersDatabase:
             tuple: (True, counterpart_id) if two-sided, (False, None) if not.
         """
 
-        sql = """
-            SELECT two_sided,
-                CASE
-                    WHEN two_sided = 1 THEN counterpart
-                    ELSE NULL
-                END AS counterpart
-            FROM Relations
-            WHERE relation_id=?
-        """
-
-        cur = self._con.cursor()
-        res = cur.execute(sql, (relation_id, )).fetchone()
-        return res
+        return self.relations.two_sided(relation_id)
 
     def delete_character(self, char_id: int) -> None:
         """Deletes a character by their id.
@@ -269,11 +707,12 @@ class CharactersDatabase:
             DELETE FROM CharacterRelations
             WHERE char1_id=? AND char2_id=? AND relation_id=?
         """
-        e.execute_sql(self._con, sql, data)
+        with self.transaction():
+            e.execute_sql(self._con, sql, data)
 
-        if two_sided:
-            data2 = (char2_id, char1_id, counterpart)
-            e.execute_sql(self._con, sql, data2)
+            if two_sided:
+                data2 = (char2_id, char1_id, counterpart)
+                e.execute_sql(self._con, sql, data2)
 
     def clear_characters(self) -> None:
         """Deletes all characters.
@@ -13,6 +13,15 @@ class StoriesDatabase:
     def __init__(self, con: sqlite3.Connection) -> None:
         self._con = con
 
+    def transaction(self):
+        """Transaction scope that commits all statements of a logical operation at once.
+
+        Returns:
+            ContextManager: Use as `with story_db.transaction():`.
+        """
+
+        return e.transaction(self._con)
+
     def create_story(self, name: str, desc: str = None) -> int:
         """Creates a story and adds it to the database.
 
@@ -120,6 +129,19 @@ class StoriesDatabase:
             stories.append(story)
         return stories
 
+    def story_exists(self, story_id: int) -> bool:
+        """Checks whether a story with the id exists.
+
+        Args:
+            story_id (int): Story id.
+
+        Returns:
+            bool: True if the story exists.
+        """
+
+        sql = "SELECT 1 FROM Stories WHERE story_id=?"
+        return self._con.execute(sql, (story_id,)).fetchone() is not None
+
     def get_story_by_id(self, story_id: int) -> dict:
         """Obtains all information about a story by its id.
 
@@ -296,6 +318,95 @@ class StoriesDatabase:
             return 0
         return round(res, 1)
 
+    def get_story_statistics(self, story_id: int) -> dict:
+        """Calculates totals for all story statistics with a single pass over characters.
+
+        {
+            "characters": number of characters,
+            "ages": characters with known age, "age_sum": sum of their ages,
+            "physiques": characters with known height and weight,
+            "height_sum": sum of their heights, "weight_sum": sum of their weights,
+            "female": x, "male": y, "unknown": z,
+            "filled": number of filled stats counted in completion percent
+        }
+
+        Args:
+            story_id (int): Story id
+
+        Returns:
+            dict: Sums and counts from which means and percentages are calculated.
+        """
+
+        sql = """
+            SELECT
+                COUNT(*),
+                COUNT(age),
+                COALESCE(SUM(age), 0),
+                COALESCE(SUM(height IS NOT NULL AND weight IS NOT NULL), 0),
+                COALESCE(SUM(CASE WHEN weight IS NOT NULL THEN height END), 0),
+                COALESCE(SUM(CASE WHEN height IS NOT NULL THEN weight END), 0),
+                COALESCE(SUM(gender=0), 0),
+                COALESCE(SUM(gender=1), 0),
+                COALESCE(SUM(gender=2), 0),
+                COUNT(birthday) + COUNT(age) + COUNT(height) + COUNT(weight)
+                    + COUNT(appearance) + COUNT(personality) + COUNT(history)
+                    + COUNT(picture)
+            FROM Characters
+            WHERE story_id=?
+        """
+
+        cur = self._con.cursor()
+        res = cur.execute(sql, (story_id,)).fetchone()
+        return {
+            "characters": res[0],
+            "ages": res[1],
+            "age_sum": res[2],
+            "physiques": res[3],
+            "height_sum": res[4],
+            "weight_sum": res[5],
+            "female": res[6],
+            "male": res[7],
+            "unknown": res[8],
+            "filled": res[9]
+        }
+
+    def export_story_database(self, story_id: int, path: str) -> None:
+        """Copies a single story into a standalone SQLite file.
+
+        The whole database is copied with the online backup API, which reads a
+        consistent snapshot, and everything that doesn't belong to the story is then
+        deleted from the copy. The search index is rebuilt from the remaining characters,
+        because deleting from it only adds delete markers and leaves the indexed text of
+        other stories in the file.
+
+        Args:
+            story_id (int): Story id
+            path (str): Path of the new database file.
+        """
+
+        dest = sqlite3.connect(path)
+        try:
+            self._con.backup(dest)
+            with e.transaction(dest):
+                dest.execute("""
+                    DELETE FROM CharacterRelations
+                    WHERE char1_id NOT IN (
+                        SELECT char_id FROM Characters WHERE story_id = ?
+                    ) OR char2_id NOT IN (
+                        SELECT char_id FROM Characters WHERE story_id = ?
+                    )
+                """, (story_id, story_id))
+                dest.execute(
+                    "DELETE FROM Characters WHERE story_id IS NOT ?", (story_id,))
+                dest.execute(
+                    "DELETE FROM Stories WHERE story_id != ?", (story_id,))
+                dest.execute(
+                    "INSERT INTO CharacterSearch(CharacterSearch) VALUES ('rebuild')")
+            dest.execute("PRAGMA journal_mode=DELETE")
+            dest.execute("VACUUM")
+        finally:
+            dest.close()
+
     def clear_stories(self) -> None:
         """Deletes all stories.
         """
@@ -1,9 +1,83 @@
 import sqlite3
+from contextlib import contextmanager
+
+# Nesting depth of open transaction scopes per connection.
+# While a connection has an open scope, statements are not committed one by one.
+_depth: dict[sqlite3.Connection, int] = {}
+
+
+def in_transaction(con: sqlite3.Connection) -> bool:
+    """Checks whether a transaction scope is open on the connection.
+
+    Args:
+        con (sqlite3.Connection): Connection to SQLite database.
+
+    Returns:
+        bool: True if statements are currently batched into a transaction.
+    """
+
+    return _depth.get(con, 0) > 0
+
+
+@contextmanager
+def transaction(con: sqlite3.Connection):
+    """Groups all statements executed inside the block into a single transaction.
+
+    Commits once when the outermost block exits and rolls everything back if an
+    exception is raised. Scopes can be nested, inner scopes simply join the outer one.
+
+    Args:
+        con (sqlite3.Connection): Connection to SQLite database.
+
+    Yields:
+        sqlite3.Connection: The same connection.
+    """
+
+    depth = _depth.get(con, 0)
+    if depth == 0 and not con.in_transaction:
+        con.execute("BEGIN")
+    _depth[con] = depth + 1
+    try:
+        yield con
+    except BaseException:
+        _depth[con] = depth
+        if depth == 0:
+            con.rollback()
+        raise
+    _depth[con] = depth
+    if depth == 0:
+        con.commit()
+
+
+@contextmanager
+def bulk(con: sqlite3.Connection):
+    """Transaction scope for large imports.
+
+    Works like transaction(), but also turns off syncing to disk until the block is
+    finished. The commit at the end is still atomic, but a power loss in the middle of
+    a bulk load may lose the whole batch.
+
+    Args:
+        con (sqlite3.Connection): Connection to SQLite database.
+
+    Yields:
+        sqlite3.Connection: The same connection.
+    """
+
+    synchronous = con.execute("PRAGMA synchronous").fetchone()[0]
+    con.execute("PRAGMA synchronous=OFF")
+    try:
+        with transaction(con):
+            yield con
+    finally:
+        con.execute(f"PRAGMA synchronous={int(synchronous)}")
 
 
 def execute_sql(con: sqlite3.Connection, sql: str, data: tuple = None) -> sqlite3.Cursor:
     """Executes SQL query and returns Cursor object.
 
+    Commits right away unless called inside a transaction scope.
+
     Args:
         con (sqlite3.Connection): Connection to SQLite database.
         sql (str): SQL string to be executed.
@@ -18,5 +92,27 @@ def execute_sql(con: sqlite3.Connection, sql: str, data: tuple = None) -> sqlite
         cur.execute(sql)
     else:
         cur.execute(sql, data)
-    con.commit()
+    if not in_transaction(con):
+        con.commit()
+    return cur
+
+
+def execute_many(con: sqlite3.Connection, sql: str, data) -> sqlite3.Cursor:
+    """Executes SQL query once for every parameter tuple in data.
+
+    Commits right away unless called inside a transaction scope.
+
+    Args:
+        con (sqlite3.Connection): Connection to SQLite database.
+        sql (str): SQL string to be executed.
+        data (Iterable[tuple]): Parameter tuples, can be a generator.
+
+    Returns:
+        sqlite3.Cursor: Cursor object to retrieve further information.
+    """
+
+    cur = con.cursor()
+    cur.executemany(sql, data)
+    if not in_transaction(con):
+        con.commit()
     return cur
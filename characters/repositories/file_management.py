@@ -5,6 +5,7 @@
 """
 
 import os
+import shutil
 import string
 import random
 from PIL import Image
@@ -69,6 +70,34 @@ class Repository:
         img_path = self._path + f"{name}.png"
         os.remove(path=img_path)
 
+    def avatar_exists(self, name: str) -> bool:
+        """Checks if an avatar file exists.
+
+        Args:
+            name (str): Picture name.
+
+        Returns:
+            bool: True if the image is in the avatars folder.
+        """
+
+        return os.path.isfile(self._path + f"{name}.png")
+
+    def copy_avatar(self, name: str) -> str:
+        """Copies an avatar under a new name, so that two characters don't share a file.
+
+        Args:
+            name (str): Name of the picture to be copied.
+
+        Returns:
+            str: Name of the copy, None if the picture doesn't exist.
+        """
+
+        if not self.avatar_exists(name):
+            return None
+        new_name = self._generate_name()
+        shutil.copyfile(self._path + f"{name}.png", self._path + f"{new_name}.png")
+        return new_name
+
     def get_file_path(self, name: str) -> str:
         """Responsible for giving full path to a certain file.
 
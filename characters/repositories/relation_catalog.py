@@ -0,0 +1,99 @@
+"""In-memory copy of the Relations table.
+
+Relations are static reference data loaded from relations.json, so they are read from
+the database once and looked up from memory after that.
+
+    Returns:
+        RelationCatalog: Relation names, counterparts and gendered names.
+"""
+
+import sqlite3
+
+
+class RelationCatalog:
+    def __init__(self, con: sqlite3.Connection) -> None:
+        self._con = con
+        self._by_id = None
+        self._by_name = None
+
+    def _relations(self) -> dict:
+        """Relations by id, loaded from the database on first use.
+
+        Returns:
+            dict: {relation_id: (name, female_name, male_name, two_sided, counterpart)}
+        """
+
+        if self._by_id is None:
+            sql = """
+                SELECT relation_id, name, female_name, male_name, two_sided,
+                    CASE
+                        WHEN two_sided = 1 THEN counterpart
+                        ELSE NULL
+                    END AS counterpart
+                FROM Relations
+                ORDER BY relation_id
+            """
+            res = self._con.execute(sql).fetchall()
+            self._by_id = {r[0]: (r[1], r[2], r[3], r[4], r[5]) for r in res}
+            self._by_name = {r[1]: r[0] for r in res}
+        return self._by_id
+
+    def reload(self) -> None:
+        """Forgets loaded relations, they are read again on next use.
+        """
+
+        self._by_id = None
+        self._by_name = None
+
+    def names(self) -> list[str]:
+        """Names of all relations.
+
+        Returns:
+            list[str]: Relation names ordered by id.
+        """
+
+        return [r[0] for r in self._relations().values()]
+
+    def id_from_name(self, name: str) -> int:
+        """Id of a relation based on its name.
+
+        Args:
+            name (str): Unique name of a relation.
+
+        Returns:
+            int: Relation id, None if there is no such relation.
+        """
+
+        self._relations()
+        return self._by_name.get(name)
+
+    def two_sided(self, relation_id: int) -> tuple:
+        """Checks if a relation is two-sided or not.
+
+        Args:
+            relation_id (int): Relation id.
+
+        Returns:
+            tuple: (1, counterpart_id) if two-sided, (0, None) if not.
+        """
+
+        r = self._relations()[relation_id]
+        return (r[3], r[4])
+
+    def gendered_name(self, relation_id: int, gender: int) -> str:
+        """Relation name that matches the gender of the related character.
+
+        Args:
+            relation_id (int): Relation id.
+            gender (int): 0=female, 1=male, 2=unknown
+
+        Returns:
+            str: For example "mother", "father" or "parent".
+        """
+
+        r = self._relations()[relation_id]
+        if gender == 0:
+            return r[1]
+        if gender == 1:
+            return r[2]
+        return r[0]
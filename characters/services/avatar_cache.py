@@ -0,0 +1,83 @@
+"""Least recently used cache for decoded avatar images, keyed by picture name.
+
+The cache doesn't know how images are decoded, views put images in it together with
+their size in bytes. When the total size grows over the limit, the least recently used
+images are dropped.
+
+    Returns:
+        AvatarCache: Shared cache of decoded avatars.
+"""
+
+from collections import OrderedDict
+
+
+class AvatarCache:
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024) -> None:
+        self._max_bytes = max_bytes
+        self._images = OrderedDict()
+        self._bytes = 0
+
+    def get(self, name: str):
+        """Decoded image of an avatar.
+
+        Args:
+            name (str): Picture name.
+
+        Returns:
+            Any: Image object, None if the avatar is not cached.
+        """
+
+        entry = self._images.get(name)
+        if entry is None:
+            return None
+        self._images.move_to_end(name)
+        return entry[0]
+
+    def put(self, name: str, image, size: int) -> None:
+        """Stores a decoded avatar and drops least recently used ones if needed.
+
+        Args:
+            name (str): Picture name.
+            image (Any): Decoded image.
+            size (int): Size of the decoded image in bytes.
+        """
+
+        self.invalidate(name)
+        self._images[name] = (image, size)
+        self._bytes += size
+        while self._bytes > self._max_bytes and len(self._images) > 1:
+            _, (_, dropped) = self._images.popitem(last=False)
+            self._bytes -= dropped
+
+    def invalidate(self, name: str) -> None:
+        """Drops an avatar, for example when it is replaced or deleted.
+
+        Args:
+            name (str): Picture name.
+        """
+
+        entry = self._images.pop(name, None)
+        if entry:
+            self._bytes -= entry[1]
+
+    def clear(self) -> None:
+        """Drops all avatars.
+        """
+
+        self._images.clear()
+        self._bytes = 0
+
+    def size(self) -> int:
+        """Total size of cached images.
+
+        Returns:
+            int: Size in bytes.
+        """
+
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._images)
+
+
+avatar_cache = AvatarCache()
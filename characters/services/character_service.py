@@ -4,11 +4,23 @@
         CharacterService: App logic for everything to do with characters.
 """
 
+import csv
+import json
+from itertools import groupby, islice
+from operator import itemgetter
 from PIL import Image
 from repositories.db_characters import char_db
+from repositories.db_stories import story_db
 from repositories.file_management import rep
-from entities.character import Character
+from entities.character import Character, CharacterStats
+from entities.character_summary import CharacterSummary
+from entities.search_result import SearchResult
 from services.formatter import formatter
+from services.statistics_cache import stats_cache
+from services.avatar_cache import avatar_cache
+from services.relation_graph import graph_cache, kinship_ids
+from services.events import (events, CharacterCreated, CharacterUpdated, CharacterDeleted,
+                             RelationAdded, RelationRemoved)
 
 
 class CharacterService():
@@ -29,6 +41,31 @@ class CharacterService():
         if not inf:
             return None
 
+        data = self._parse_info(inf, story_id)
+        char_id = char_db.create_character(data)
+
+        if not char_id:
+            return None
+
+        new_char = Character(char_id=char_id, story_id=story_id,
+                             stats=CharacterStats._make(data[1:]))
+        stats_cache.add_character(story_id, new_char.stats)
+        events.publish(CharacterCreated(char_id, story_id))
+
+        return new_char
+
+    def _parse_info(self, inf: tuple, story_id: int) -> tuple:
+        """Converts user input into a row of the Characters table.
+
+        Args:
+            inf (tuple): Tuple that contains all the character's info.
+            story_id (int): Story id.
+
+        Returns:
+            tuple: (story_id, name, gender, birthday, age, height, weight,
+                appearance, personality, history, picture, trivia)
+        """
+
         name = inf[0] or "Unknown"
         gender = formatter.convert_gender(inf[1])
         bday = formatter.parse_birthday(inf[2])
@@ -40,31 +77,66 @@ class CharacterService():
         hist = inf[8] if inf[8] != "" else None
         triv = inf[10] if inf[10] != "" else None
 
-        char_id = char_db.create_character((story_id, name, gender, bday, age,
-                                            ht, wt, appr, prsn, hist, inf[9], triv))
+        return (story_id, name, gender, bday, age, ht, wt, appr, prsn, hist, inf[9], triv)
 
-        if not char_id:
-            return None
+    def import_characters(self, fp, story_id: int, file_format: str = "csv",
+                          batch_size: int = 1000, progress=None) -> int:
+        """Creates characters from a CSV or JSON Lines file.
 
-        new_char = Character(
-            char_id=char_id,
-            story_id=story_id,
-            stats={
-                "name": name,
-                "gender": gender,
-                "birthday": bday,
-                "age": age,
-                "height": ht,
-                "weight": wt,
-                "appearance": appr,
-                "personality": prsn,
-                "history": hist,
-                "picture": inf[9],
-                "trivia": triv
-            }
-        )
+        The file is read one record at a time and characters are inserted in batches,
+        each batch in its own transaction, so memory use doesn't depend on file size.
+        Records use the same fields as the database, birthday can be given either as
+        "dd/mm/yyyy" or as separate day, month and year fields. Pictures are kept only
+        if the avatar already exists in the library.
 
-        return new_char
+        Args:
+            fp (TextIO): Open file.
+            story_id (int): Story the characters are added to.
+            file_format (str, optional): "csv" or "jsonl". Defaults to "csv".
+            batch_size (int, optional): Characters per transaction. Defaults to 1000.
+            progress (function, optional): Called with the number of imported characters
+                after every batch. Defaults to None.
+
+        Raises:
+            ValueError: If the file format is not supported or the story doesn't exist.
+
+        Returns:
+            int: Number of imported characters.
+        """
+
+        if not story_db.story_exists(story_id):
+            raise ValueError(f"Unknown story {story_id}")
+
+        if file_format == "csv":
+            records = csv.DictReader(fp)
+        elif file_format == "jsonl":
+            records = (json.loads(line) for line in fp if line.strip())
+        else:
+            raise ValueError(f"Unsupported file format {file_format}")
+
+        def parse(record: dict) -> tuple:
+            inf = formatter.record_to_info(record)
+            if inf[9] and not rep.avatar_exists(inf[9]):
+                inf = inf[:9] + (None,) + inf[10:]
+            return self._parse_info(inf, story_id)
+
+        rows = (parse(r) for r in records)
+        total = 0
+        try:
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                with char_db.bulk():
+                    char_db.create_characters(batch)
+                total += len(batch)
+                if progress:
+                    progress(total)
+        finally:
+            # Batches committed before a failure stay in the database
+            if total:
+                events.publish(CharacterCreated(None, story_id))
+        return total
 
     def update_character(self, stats: tuple[str | Character]) -> None:
         """Updates character information in the database.
@@ -84,9 +156,18 @@ class CharacterService():
         trivia = stats[8] if stats[8] != "" else None
         name = stats[9] if stats[9] != "" else None
         char_id = stats[10].char_id
+        row = char_db.get_character(char_id)
         char_db.update_character(
             (gender, birthday, age, height, weight, appearance,
              personality, history, trivia, name, char_id))
+        if row:
+            old = Character.from_row(row)
+            new = Character.from_row(row)
+            new.update(gender=gender, birthday=birthday, age=age, height=height,
+                       weight=weight, appearance=appearance, personality=personality,
+                       history=history, trivia=trivia, name=name)
+            stats_cache.update_character(old.story_id, old.stats, new.stats)
+            events.publish(CharacterUpdated(char_id, old.story_id))
 
     def update_image(self, character: Character, img: Image) -> None:
         """Updates character's avatar.
@@ -96,11 +177,16 @@ class CharacterService():
             img (Image): New image
         """
 
-        old_image = character.stats["picture"]
+        old_image = character.stat("picture")
         new_image = rep.save_image(img)
         char_db.update_image(new_image, character.char_id)
+        stats_cache.update_character(
+            character.story_id, {"picture": old_image}, {"picture": new_image})
+        character.update(picture=new_image)
         if old_image:
+            avatar_cache.invalidate(old_image)
             rep.delete_avatar(old_image)
+        events.publish(CharacterUpdated(character.char_id, character.story_id))
 
     def get_characters_by_story_id(self, story_id: int) -> list[Character]:
         """Searches all characters of a certain story in the database.
@@ -115,21 +201,129 @@ class CharacterService():
         db_characters = char_db.get_characters_by_story_id(story_id=story_id)
         if not db_characters:
             return None
-        characters = []
-        for c in db_characters:
-            character = Character(
-                char_id=c["char_id"],
-                story_id=c["story_id"],
-                stats=c["stats"]
-            )
-            characters.append(character)
-        return characters
-
-    def get_image_path(self, character: Character) -> str:
+        return [Character.from_row(row) for row in db_characters]
+
+    def get_characters_page(self, story_id: int, after_id: int = 0, limit: int = 50) -> list[Character]:
+        """Searches the next page of characters of a story, ordered by id.
+
+        Args:
+            story_id (int): Story id.
+            after_id (int, optional): Id of the last character of the previous page. Defaults to 0.
+            limit (int, optional): Page size. Defaults to 50.
+
+        Returns:
+            list[Character]: Contains Character-objects, empty after the last page.
+        """
+
+        db_characters = char_db.get_characters_page(
+            story_id=story_id, after_id=after_id, limit=limit)
+        return [Character.from_row(row) for row in db_characters]
+
+    def iter_characters(self, story_id: int, batch_size: int = 500, columns: list[str] = None):
+        """Streams all characters of a story without loading the whole story at once.
+
+        Args:
+            story_id (int): Story id.
+            batch_size (int, optional): Characters fetched per query. Defaults to 500.
+            columns (list[str], optional): Stats to load. Defaults to all of them.
+                Character methods that need other stats can't be used.
+
+        Yields:
+            Character: Character object.
+        """
+
+        for row in char_db.iter_characters(story_id, batch_size=batch_size, columns=columns):
+            yield Character.from_row(row)
+
+    def get_character(self, char_id: int) -> Character:
+        """Loads all stats of a single character.
+
+        Args:
+            char_id (int): Character id.
+
+        Returns:
+            Character: Character object, None if the character doesn't exist.
+        """
+
+        row = char_db.get_character(char_id)
+        if not row:
+            return None
+        return Character.from_row(row)
+
+    def get_character_summaries_page(self, story_id: int, after_id: int = 0,
+                                     limit: int = 50) -> list[CharacterSummary]:
+        """Searches the next page of characters of a story without their descriptions.
+
+        Args:
+            story_id (int): Story id.
+            after_id (int, optional): Id of the last character of the previous page. Defaults to 0.
+            limit (int, optional): Page size. Defaults to 50.
+
+        Returns:
+            list[CharacterSummary]: Names and avatars of characters, empty after the last page.
+        """
+
+        db_characters = char_db.get_characters_page(
+            story_id=story_id, after_id=after_id, limit=limit, columns=["name", "picture"])
+        return [self._to_summary(c) for c in db_characters]
+
+    def get_character_summaries(self, story_id: int) -> list[CharacterSummary]:
+        """Names and avatars of all characters of a story.
+
+        Args:
+            story_id (int): Story id.
+
+        Returns:
+            list[CharacterSummary]: Contains CharacterSummary-objects.
+        """
+
+        return [self._to_summary(c) for c in
+                char_db.iter_characters(story_id, columns=["name", "picture"])]
+
+    def _to_summary(self, row) -> CharacterSummary:
+        return CharacterSummary(char_id=row["char_id"], story_id=row["story_id"],
+                                name=row["name"], picture=row["picture"])
+
+    def find_characters(self, story_id: int, prefix: str = "", limit: int = 10) -> list[CharacterSummary]:
+        """Characters of a story whose name starts with prefix, for type-ahead pickers.
+
+        Args:
+            story_id (int): Story id.
+            prefix (str, optional): Beginning of the name, case doesn't matter.
+                Defaults to "", all characters.
+            limit (int, optional): Maximum number of characters. Defaults to 10.
+
+        Returns:
+            list[CharacterSummary]: Matching characters in alphabetical order.
+        """
+
+        rows = char_db.find_characters(story_id, prefix=prefix.strip(), limit=limit)
+        return [self._to_summary(row) for row in rows]
+
+    def search(self, query: str, story_id: int = None, limit: int = 20) -> list[SearchResult]:
+        """Searches characters by words in their name, appearance, personality,
+        history or trivia.
+
+        Args:
+            query (str): Words to search for, the last one may be unfinished.
+            story_id (int, optional): Search only this story. Defaults to all stories.
+            limit (int, optional): Maximum number of results. Defaults to 20.
+
+        Returns:
+            list[SearchResult]: Found characters with matching text, best matches first.
+        """
+
+        fts_query = formatter.search_query(query or "")
+        if not fts_query:
+            return []
+        rows = char_db.search(fts_query, story_id=story_id, limit=limit)
+        return [SearchResult(self._to_summary(row), row["snippet"]) for row in rows]
+
+    def get_image_path(self, character: Character | CharacterSummary) -> str:
         """Creates file path for character's avatar.
 
         Args:
-            character (Character): Character whose avatar we're getting.
+            character (Character | CharacterSummary): Character whose avatar we're getting.
 
         Returns:
             str: Complete path to the image.
@@ -160,6 +354,20 @@ class CharacterService():
         relations = char_db.get_character_relations(character.char_id)
         return relations
 
+    def get_story_relations(self, story_id: int) -> dict[int, list[tuple]]:
+        """Searches relationships of all characters of a story at once.
+
+        Args:
+            story_id (int): Story id.
+
+        Returns:
+            dict[int, list[tuple]]: Relationships by character id, in the same form as
+                get_character_relations. Characters without relationships are left out.
+        """
+
+        return {char_id: [r[1:] for r in rows] for char_id, rows in
+                groupby(char_db.get_story_relations(story_id), key=itemgetter(0))}
+
     def set_relations(self, char1: Character, char2: Character, relation: str, former: int) -> None:
         """Set a relationship between two characters.
 
@@ -177,6 +385,139 @@ class CharacterService():
         rel_id = char_db.get_relation_id_from_name(relation)
         char_db.set_relation(char1_id=char1_id, char2_id=char2_id,
                              relation_id=rel_id, former=former)
+        events.publish(RelationAdded(char1_id, char2_id, rel_id, char1.story_id))
+
+    def set_relations_bulk(self, edges) -> int:
+        """Sets many relationships at once, for example when importing a family tree.
+
+        Args:
+            edges (Iterable[tuple]): (char1_id, char2_id, relation, former) tuples, where
+                char2 is ___ to char1, relation is a relation name and former is 1 or 0.
+
+        Raises:
+            ValueError: If a relation name doesn't exist.
+
+        Returns:
+            int: Number of distinct relationship rows, two-sided counterparts included.
+        """
+
+        def resolve(edges):
+            for char1_id, char2_id, relation, former in edges:
+                rel_id = char_db.get_relation_id_from_name(relation)
+                if rel_id is None:
+                    raise ValueError(f"Unknown relation {relation}")
+                yield (char1_id, char2_id, rel_id, former)
+
+        count = char_db.set_relations_bulk(resolve(edges))
+        events.publish(RelationAdded(None, None, None, None))
+        return count
+
+    def get_neighborhood(self, character: Character | CharacterSummary,
+                         hops: int = 2) -> dict[int, int]:
+        """Characters connected to a character through at most hops relationships.
+
+        Args:
+            character (Character | CharacterSummary): Character in the middle.
+            hops (int, optional): Maximum distance. Defaults to 2.
+
+        Returns:
+            dict[int, int]: Distance by character id, the character itself included with 0.
+        """
+
+        graph = graph_cache.get(character.story_id)
+        if graph is None:
+            return char_db.get_neighborhood(character.char_id, hops)
+        return graph.neighborhood(character.char_id, hops)
+
+    def get_relation_path(self, char1: Character | CharacterSummary,
+                          char2: Character | CharacterSummary, hops: int = 6) -> list[tuple]:
+        """Shortest chain of relationships between two characters of the same story.
+
+        Args:
+            char1 (Character | CharacterSummary): First character.
+            char2 (Character | CharacterSummary): Second character.
+            hops (int, optional): Maximum length of the chain. Defaults to 6.
+
+        Returns:
+            list[tuple]: (char1_id, char2_id, relation_id) relationship rows leading from
+                char1 to char2, empty for the same character, None if not connected.
+        """
+
+        graph = graph_cache.get(char1.story_id)
+        if graph is not None:
+            return graph.shortest_path(char1.char_id, char2.char_id, hops)
+
+        distance = char_db.get_neighborhood(char1.char_id, hops)
+        if char2.char_id not in distance:
+            return None
+        path = []
+        char_id = char2.char_id
+        while distance[char_id] > 0:
+            # Prefer relationships stored in the direction of the path
+            edges = sorted(char_db.get_character_edges(char_id),
+                           key=lambda edge: edge[0] == char_id)
+            for edge in edges:
+                other = edge[1] if edge[0] == char_id else edge[0]
+                if distance.get(other) == distance[char_id] - 1:
+                    path.append(edge)
+                    char_id = other
+                    break
+            else:
+                # A relationship was removed after the distances were queried
+                return None
+        path.reverse()
+        return path
+
+    def get_story_components(self, story_id: int) -> list[list[int]]:
+        """Groups of characters of a story that are connected by relationships.
+
+        Args:
+            story_id (int): Story id.
+
+        Returns:
+            list[list[int]]: Character ids of every group, largest groups first.
+        """
+
+        graph = graph_cache.get(story_id)
+        if graph is not None:
+            return graph.components()
+
+        groups = []
+        grouped = set()
+        for (char_id,) in char_db.get_character_ids(story_id).fetchall():
+            if char_id not in grouped:
+                group = sorted(char_db.get_neighborhood(char_id))
+                grouped.update(group)
+                groups.append(group)
+        groups.sort(key=len, reverse=True)
+        return groups
+
+    def get_derived_relations(self, character: Character | CharacterSummary) -> list[tuple]:
+        """Relations that follow from existing ones, for example parent's parent is a grandparent.
+
+        Args:
+            character (Character | CharacterSummary): Character whose relatives are searched.
+
+        Returns:
+            list[tuple]: (char1_id, char2_id, relation_id) rows that are not set yet,
+                char2 is ___ to char1.
+        """
+
+        kinship = kinship_ids()
+        graph = graph_cache.get(character.story_id)
+        if graph is not None:
+            return graph.derived_relations(character.char_id, kinship)
+
+        char_id = character.char_id
+        existing = {(edge[1], edge[2]) for edge in char_db.get_character_edges(char_id)
+                    if edge[0] == char_id}
+        derived = []
+        for char3_id, first, second in char_db.get_two_step_relations(char_id):
+            relation_id = kinship.get((first, second))
+            if relation_id is not None and (char3_id, relation_id) not in existing:
+                existing.add((char3_id, relation_id))
+                derived.append((char_id, char3_id, relation_id))
+        return derived
 
     def delete_character(self, character: Character) -> None:
         """Deletes character from the database.
@@ -185,32 +526,48 @@ class CharacterService():
             character (Character): Character object
         """
 
-        char_db.delete_character(character.char_id)
-        char_db.delete_character_relations(character.char_id)
-        if character.stats["picture"]:
-            rep.delete_avatar(character.stats["picture"])
+        with char_db.transaction():
+            row = char_db.get_character(character.char_id)
+            char_db.delete_character(character.char_id)
+            char_db.delete_character_relations(character.char_id)
+        if row:
+            old = Character.from_row(row)
+            stats_cache.remove_character(old.story_id, old.stats)
+        picture = character.stat("picture")
+        if picture:
+            avatar_cache.invalidate(picture)
+            rep.delete_avatar(picture)
+        events.publish(CharacterDeleted(character.char_id, character.story_id))
 
     def delete_relation(self, char1_id: int, char2_id: int, rel_id: int,
-                        two_sided: int, counterpart: int) -> None:
+                        two_sided: int = None, counterpart: int = None) -> None:
         """Deletes a relationship between two characters.
 
         Args:
             char1_id (int): Id of the first character
             char2_id (int): Id of the second character
             rel_id (int): Relation id
-            two_sided (int): True if two-sided, False otherwise
-            counterpart (int): If two-sided, id of a corresponding relation
+            two_sided (int, optional): True if two-sided, False otherwise.
+                Looked up from the relation catalog if not given.
+            counterpart (int, optional): If two-sided, id of a corresponding relation.
+                Looked up from the relation catalog if not given.
         """
+
+        if two_sided is None:
+            two_sided, counterpart = char_db.relations.two_sided(rel_id)
         _two_sided = two_sided == 1
         char_db.delete_relation(
             char1_id, char2_id, rel_id, _two_sided, counterpart)
+        events.publish(RelationRemoved(char1_id, char2_id, rel_id, None))
 
     def clear_characters(self) -> None:
         """Deletes all characters and their avatars.
         """
 
         char_db.clear_characters()
+        avatar_cache.clear()
         rep.delete_all_avatars()
+        events.publish(CharacterDeleted(None, None))
 
 
 char_service = CharacterService()
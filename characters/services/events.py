@@ -0,0 +1,70 @@
+"""In-process bus for change events published by services.
+
+StoryService and CharacterService publish an event after every change they make.
+Caches and views subscribe to the event types they depend on, so they can update or
+forget only what a change touches instead of reloading everything. Handlers are called
+right away, in the order they subscribed.
+
+Ids that a change doesn't narrow down are None: StoryDeleted(None) means all stories
+were deleted, CharacterCreated(None, story_id) that many characters were imported into
+a story and relation events with story_id None that the story is not known.
+
+    Returns:
+        EventBus: Shared event bus.
+"""
+
+from collections import namedtuple
+
+StoryCreated = namedtuple("StoryCreated", ["story_id", "name", "desc"])
+StoryRenamed = namedtuple("StoryRenamed", ["story_id", "name"])
+StoryDescChanged = namedtuple("StoryDescChanged", ["story_id", "desc"])
+StoryDeleted = namedtuple("StoryDeleted", ["story_id"])
+CharacterCreated = namedtuple("CharacterCreated", ["char_id", "story_id"])
+CharacterUpdated = namedtuple("CharacterUpdated", ["char_id", "story_id"])
+CharacterDeleted = namedtuple("CharacterDeleted", ["char_id", "story_id"])
+RelationAdded = namedtuple(
+    "RelationAdded", ["char1_id", "char2_id", "relation_id", "story_id"])
+RelationRemoved = namedtuple(
+    "RelationRemoved", ["char1_id", "char2_id", "relation_id", "story_id"])
+
+
+class EventBus:
+    def __init__(self) -> None:
+        # Event type -> handlers in subscription order
+        self._handlers = {}
+
+    def subscribe(self, event_type: type, handler) -> None:
+        """Calls handler with every published event of the given type.
+
+        Args:
+            event_type (type): Event class, for example StoryCreated.
+            handler (function): Receives the event.
+        """
+
+        self._handlers.setdefault(event_type, []).append(handler)
+
+    def unsubscribe(self, event_type: type, handler) -> None:
+        """Stops calling handler, for example when a view is destroyed.
+
+        Args:
+            event_type (type): Event class the handler subscribed to.
+            handler (function): Subscribed handler.
+        """
+
+        handlers = self._handlers.get(event_type)
+        if handlers and handler in handlers:
+            handlers.remove(handler)
+
+    def publish(self, event) -> None:
+        """Calls all handlers subscribed to the type of the event.
+
+        Args:
+            event (Any): One of the event classes of this module.
+        """
+
+        # A handler may unsubscribe while the event is being delivered
+        for handler in list(self._handlers.get(type(event), ())):
+            handler(event)
+
+
+events = EventBus()
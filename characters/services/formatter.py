@@ -32,37 +32,61 @@ class Formatter:
             return f"{relationship[0]}: {relationship_name}."
         return f"{relationship[0]}: {relationship_name}. {'(former)' if former else ''}"
 
-    def characters_to_dict(self, lst: list) -> list[dict]:
-        """Converts list with raw characters data into a clean dictionary.
+    def record_to_info(self, record: dict) -> tuple:
+        """Converts an imported record into the tuple that character creation expects.
 
         Args:
-            lst (list): Raw list with data from the database.
+            record (dict): Fields of a character read from CSV or JSON, all optional.
+                Birthday is either "birthday": "dd/mm/yyyy" or "day", "month" and "year".
 
         Returns:
-            list[dict]: Contains characters represented by a dictionary.
+            tuple: (name, gender, (day, month, year), age, height, weight, appearance,
+                personality, history, picture, trivia)
         """
 
-        characters = []
-        for c in lst:
-            character = {
-                "char_id": c[0],
-                "story_id": c[1],
-                "stats": {
-                    "name": c[2],
-                    "gender": c[3],
-                    "birthday": c[4],
-                    "age": c[5],
-                    "height": c[6],
-                    "weight": c[7],
-                    "appearance": c[8],
-                    "personality": c[9],
-                    "history": c[10],
-                    "picture": c[11],
-                    "trivia": c[12]
-                }
-            }
-            characters.append(character)
-        return characters
+        def text(key: str) -> str:
+            value = record.get(key)
+            return "" if value is None else str(value).strip()
+
+        if text("birthday"):
+            parts = (text("birthday").split("/") + ["", "", ""])[:3]
+            birthday = tuple(parts)
+        else:
+            birthday = (text("day"), text("month"), text("year"))
+
+        return (
+            text("name"),
+            text("gender"),
+            birthday,
+            text("age"),
+            text("height"),
+            text("weight"),
+            text("appearance"),
+            text("personality"),
+            text("history"),
+            text("picture") or None,
+            text("trivia")
+        )
+
+    def search_query(self, text: str) -> str:
+        """Converts user's search text into an FTS5 query.
+
+        Every word is quoted, so characters like quotes, dashes or asterisks are searched
+        for instead of being read as query syntax. All words must match and the last one
+        may be unfinished, so results can be shown while typing.
+
+        Args:
+            text (str): Search text.
+
+        Returns:
+            str: FTS5 query, None if there is nothing to search for.
+        """
+
+        words = ['"' + word.replace('"', '""') + '"' for word in text.split()]
+        if not words:
+            return None
+        words[-1] += "*"
+        return " ".join(words)
 
     def parse_number_value(self, value: str) -> int:
         """If user has given non-numeric value, resets it to None.
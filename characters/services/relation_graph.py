@@ -0,0 +1,352 @@
+"""Relationships of a story as an in-memory graph.
+
+Characters are numbered from 0 in the order of their ids and relationships are stored
+in compressed sparse row form: the neighbors of node i are targets[offsets[i]:offsets[i + 1]].
+Every relationship row is stored in both directions, the reversed copy with a negative
+relation id, so traversals follow relationships either way while still knowing how
+they were stored.
+
+    Returns:
+        RelationGraph: Graph of one story.
+        RelationGraphCache: Recently used graphs, kept until relationships change.
+"""
+
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from repositories.db_characters import char_db
+from services.events import (events, StoryDeleted, CharacterCreated, CharacterDeleted,
+                             RelationAdded, RelationRemoved)
+
+# Relations implied by two relationships in a row, by relation name.
+# ("parent", "sibling"): "aunt/uncle" reads: a sibling of my parent is my aunt/uncle.
+KINSHIP = {
+    ("parent", "parent"): "grandparent",
+    ("child", "child"): "grandchild",
+    ("parent", "child"): "sibling",
+    ("sibling", "sibling"): "sibling",
+    ("parent", "sibling"): "aunt/uncle",
+    ("sibling", "child"): "niece/nephew",
+    ("aunt/uncle", "child"): "cousin",
+}
+
+
+def kinship_ids() -> dict[tuple, int]:
+    """KINSHIP with relation names replaced by ids.
+
+    Returns:
+        dict[tuple, int]: {(first relation_id, second relation_id): derived relation_id}
+    """
+
+    to_id = char_db.relations.id_from_name
+    return {(to_id(first), to_id(second)): to_id(derived)
+            for (first, second), derived in KINSHIP.items()}
+
+
+class RelationGraph:
+    def __init__(self, char_ids, edges) -> None:
+        """Builds the graph.
+
+        Args:
+            char_ids (Iterable[int]): Ids of all characters of the story, in ascending order.
+            edges (Iterable[tuple]): (char1_id, char2_id, relation_id) rows,
+                char2 is ___ to char1. Rows with unknown characters are skipped.
+        """
+
+        self._ids = array("q", char_ids)
+        size = len(self._ids)
+
+        sources = array("l")
+        targets = array("l")
+        relations = array("h")
+        for char1_id, char2_id, relation_id in edges:
+            source = self._node(char1_id)
+            target = self._node(char2_id)
+            if source < 0 or target < 0:
+                continue
+            sources.append(source)
+            targets.append(target)
+            relations.append(relation_id)
+
+        # Counting sort of both directions of every row by their source node
+        offsets = array("l", bytes(array("l").itemsize * (size + 1)))
+        for node in sources:
+            offsets[node + 1] += 1
+        for node in targets:
+            offsets[node + 1] += 1
+        for node in range(size):
+            offsets[node + 1] += offsets[node]
+
+        # Stored directions come first, so traversals prefer them
+        position = array("l", offsets)
+        self._targets = array("l", bytes(array("l").itemsize * offsets[size]))
+        self._relations = array("h", bytes(array("h").itemsize * offsets[size]))
+        for source, target, relation_id in zip(sources, targets, relations):
+            self._targets[position[source]] = target
+            self._relations[position[source]] = relation_id
+            position[source] += 1
+        for source, target, relation_id in zip(sources, targets, relations):
+            self._targets[position[target]] = source
+            self._relations[position[target]] = -relation_id
+            position[target] += 1
+        self._offsets = offsets
+        self.edges = len(sources)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _node(self, char_id: int) -> int:
+        """Node number of a character.
+
+        Args:
+            char_id (int): Character id.
+
+        Returns:
+            int: Node number, -1 if the character is not in the graph.
+        """
+
+        node = bisect_left(self._ids, char_id)
+        if node < len(self._ids) and self._ids[node] == char_id:
+            return node
+        return -1
+
+    def _edge(self, node: int, index: int) -> tuple:
+        """Relationship row behind a neighbor entry, in the direction it is stored.
+
+        Returns:
+            tuple: (char1_id, char2_id, relation_id)
+        """
+
+        neighbor = self._ids[self._targets[index]]
+        relation_id = self._relations[index]
+        if relation_id > 0:
+            return (self._ids[node], neighbor, relation_id)
+        return (neighbor, self._ids[node], -relation_id)
+
+    def neighbors(self, char_id: int) -> list[tuple]:
+        """Relationships of a character in either direction.
+
+        Args:
+            char_id (int): Character id.
+
+        Returns:
+            list[tuple]: (char1_id, char2_id, relation_id) rows.
+        """
+
+        node = self._node(char_id)
+        if node < 0:
+            return []
+        return [self._edge(node, index)
+                for index in range(self._offsets[node], self._offsets[node + 1])]
+
+    def neighborhood(self, char_id: int, hops: int = None) -> dict[int, int]:
+        """Characters reachable from a character in at most hops relationships.
+
+        Args:
+            char_id (int): Character id.
+            hops (int, optional): Maximum distance. Defaults to None, no limit.
+
+        Returns:
+            dict[int, int]: Distance by character id, the character itself included with 0.
+        """
+
+        start = self._node(char_id)
+        if start < 0:
+            return {}
+        distance = self._distances(start, hops=hops)[0]
+        return {self._ids[node]: d for node, d in distance.items()}
+
+    def _distances(self, start: int, hops: int = None, goal: int = -1) -> tuple[dict, dict]:
+        """Breadth-first search from a node.
+
+        Only reached nodes are stored, so small neighborhoods are cheap in large stories.
+
+        Args:
+            start (int): Start node.
+            hops (int, optional): Maximum distance. Defaults to None, no limit.
+            goal (int, optional): Stop once this node is reached. Defaults to -1.
+
+        Returns:
+            tuple[dict, dict]: Distance of every reached node and the neighbor entry
+                through which it was reached.
+        """
+
+        distance = {start: 0}
+        via = {}
+        queue = deque([start])
+        offsets = self._offsets
+        targets = self._targets
+        while queue:
+            node = queue.popleft()
+            if node == goal:
+                break
+            next_distance = distance[node] + 1
+            if hops is not None and next_distance > hops:
+                continue
+            for index in range(offsets[node], offsets[node + 1]):
+                target = targets[index]
+                if target not in distance:
+                    distance[target] = next_distance
+                    via[target] = index
+                    queue.append(target)
+        return (distance, via)
+
+    def shortest_path(self, char1_id: int, char2_id: int, hops: int = None) -> list[tuple]:
+        """Shortest chain of relationships between two characters.
+
+        Args:
+            char1_id (int): Id of the first character.
+            char2_id (int): Id of the second character.
+            hops (int, optional): Maximum length of the chain. Defaults to None, no limit.
+
+        Returns:
+            list[tuple]: (char1_id, char2_id, relation_id) rows from the first character
+                to the second one, empty if they are the same character, None if they
+                are not connected.
+        """
+
+        start = self._node(char1_id)
+        goal = self._node(char2_id)
+        if start < 0 or goal < 0:
+            return None
+        distance, via = self._distances(start, hops=hops, goal=goal)
+        if goal not in distance:
+            return None
+
+        # Every entry in via belongs to the previous node on the path, find it by offset
+        path = []
+        node = goal
+        while node != start:
+            index = via[node]
+            previous = bisect_left(self._offsets, index + 1) - 1
+            path.append(self._edge(previous, index))
+            node = previous
+        path.reverse()
+        return path
+
+    def components(self) -> list[list[int]]:
+        """Groups of characters connected by relationships.
+
+        Returns:
+            list[list[int]]: Character ids of every group, largest groups first.
+                Characters without relationships are groups of their own.
+        """
+
+        size = len(self._ids)
+        component = array("l", [-1]) * size
+        groups = []
+        for start in range(size):
+            if component[start] >= 0:
+                continue
+            number = len(groups)
+            component[start] = number
+            members = [start]
+            stack = [start]
+            while stack:
+                node = stack.pop()
+                for index in range(self._offsets[node], self._offsets[node + 1]):
+                    target = self._targets[index]
+                    if component[target] < 0:
+                        component[target] = number
+                        members.append(target)
+                        stack.append(target)
+            groups.append(sorted(self._ids[node] for node in members))
+        groups.sort(key=len, reverse=True)
+        return groups
+
+    def derived_relations(self, char_id: int, kinship: dict[tuple, int]) -> list[tuple]:
+        """Relations implied by two relationships in a row, such as grandparents.
+
+        Only relationships in their stored direction are combined. Relations that the
+        character already has with the same character are left out.
+
+        Args:
+            char_id (int): Character id.
+            kinship (dict[tuple, int]): Derived relation ids, see kinship_ids.
+
+        Returns:
+            list[tuple]: (char_id, char2_id, relation_id) rows that could be added.
+        """
+
+        node = self._node(char_id)
+        if node < 0:
+            return []
+        existing = {(edge[1], edge[2]) for edge in self.neighbors(char_id)
+                    if edge[0] == char_id}
+        derived = []
+        for first in range(self._offsets[node], self._offsets[node + 1]):
+            if self._relations[first] < 0:
+                continue
+            middle = self._targets[first]
+            for second in range(self._offsets[middle], self._offsets[middle + 1]):
+                relation_id = kinship.get(
+                    (self._relations[first], self._relations[second]))
+                target = self._targets[second]
+                if relation_id is None or target == node:
+                    continue
+                key = (self._ids[target], relation_id)
+                if key not in existing:
+                    existing.add(key)
+                    derived.append((char_id,) + key)
+        return derived
+
+
+class RelationGraphCache:
+    def __init__(self, max_graphs: int = 4, max_edges: int = 2000000) -> None:
+        """
+        Args:
+            max_graphs (int, optional): Number of stories whose graphs are kept.
+                Defaults to 4.
+            max_edges (int, optional): Stories with more relationship rows are not
+                loaded into memory. Defaults to 2000000.
+        """
+
+        self._max_graphs = max_graphs
+        self._max_edges = max_edges
+        self._graphs = OrderedDict()
+
+    def get(self, story_id: int) -> RelationGraph:
+        """Graph of a story, built from the database on first use.
+
+        Args:
+            story_id (int): Story id.
+
+        Returns:
+            RelationGraph: The graph, None if the story has too many relationships to
+                be kept in memory.
+        """
+
+        graph = self._graphs.get(story_id)
+        if graph is not None:
+            self._graphs.move_to_end(story_id)
+            return graph
+        if char_db.count_story_edges(story_id) > self._max_edges:
+            return None
+        with char_db.transaction():
+            graph = RelationGraph(
+                (row[0] for row in char_db.get_character_ids(story_id)),
+                char_db.iter_story_edges(story_id))
+        self._graphs[story_id] = graph
+        while len(self._graphs) > self._max_graphs:
+            self._graphs.popitem(last=False)
+        return graph
+
+    def invalidate(self, story_id: int = None) -> None:
+        """Forgets the graph of a story, or of all stories if story_id is not given.
+
+        Args:
+            story_id (int, optional): Story id. Defaults to None.
+        """
+
+        if story_id is None:
+            self._graphs.clear()
+        else:
+            self._graphs.pop(story_id, None)
+
+
+graph_cache = RelationGraphCache()
+
+# A graph is out of date once a relation or a character of its story is gone or added
+for _event_type in (RelationAdded, RelationRemoved, CharacterCreated, CharacterDeleted,
+                    StoryDeleted):
+    events.subscribe(_event_type, lambda event: graph_cache.invalidate(event.story_id))
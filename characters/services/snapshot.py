@@ -0,0 +1,94 @@
+"""Read-only queries for the UI's background worker.
+
+The worker has a connection of its own that is opened read-only, so it only ever sees
+committed data and can't take part in transactions of the main thread. It doesn't
+touch the caches of the services either, those are used from the main thread only.
+
+The connection is opened on first use by the thread that uses it, and only that thread
+may use the Snapshot afterwards.
+
+    Returns:
+        Snapshot: Read-only queries for background loading.
+"""
+
+from config import DB_PATH
+from db_connection import connect
+from repositories.db_stories import StoriesDatabase
+from repositories.db_characters import CharactersDatabase
+from entities.story import Story
+from entities.story_statistics import StoryStatistics
+from entities.character_summary import CharacterSummary
+from services.story_service import story_service
+
+
+class Snapshot:
+    def __init__(self, path: str = DB_PATH) -> None:
+        self._path = path
+        self._story_db = None
+        self._char_db = None
+
+    def _open(self) -> None:
+        if self._story_db is None:
+            con = connect(self._path, read_only=True)
+            self._story_db = StoriesDatabase(con)
+            self._char_db = CharactersDatabase(con)
+
+    def get_stories(self) -> list[Story]:
+        """All stories.
+
+        Returns:
+            list[Story]: Contains all of user's stories.
+        """
+
+        self._open()
+        return [Story(story_id=s["id"], name=s["name"], desc=s["desc"])
+                for s in self._story_db.get_stories()]
+
+    def get_character_summaries_page(self, story_id: int, after_id: int = 0,
+                                     limit: int = 50) -> list[CharacterSummary]:
+        """Next page of characters of a story, see CharacterService.
+
+        Args:
+            story_id (int): Story id.
+            after_id (int, optional): Id of the last character of the previous page. Defaults to 0.
+            limit (int, optional): Page size. Defaults to 50.
+
+        Returns:
+            list[CharacterSummary]: Names and avatars of characters, empty after the last page.
+        """
+
+        self._open()
+        rows = self._char_db.get_characters_page(
+            story_id=story_id, after_id=after_id, limit=limit, columns=["name", "picture"])
+        return [CharacterSummary(char_id=row["char_id"], story_id=row["story_id"],
+                                 name=row["name"], picture=row["picture"]) for row in rows]
+
+    def get_character_relations(self, char_id: int) -> list[tuple]:
+        """All relationships of a character, see CharacterService.
+
+        Args:
+            char_id (int): Character id.
+
+        Returns:
+            list[tuple]: (name, former, relation, char2_id, relation id, two-sided, counterpart)
+        """
+
+        self._open()
+        return self._char_db.get_character_relations(char_id)
+
+    def get_story_statistics(self, story_id: int) -> StoryStatistics:
+        """Statistics of a story calculated from the database, without the cache.
+
+        Args:
+            story_id (int): Story id.
+
+        Returns:
+            StoryStatistics: Mean age, mean physique, gender percentages and completion.
+        """
+
+        self._open()
+        totals = self._story_db.get_story_statistics(story_id)
+        return story_service.statistics_from_totals(totals)
+
+
+snapshot = Snapshot()
@@ -0,0 +1,167 @@
+"""Per-story statistics totals that are kept up to date as characters change.
+
+The totals of a story are queried once, after that CharacterService adds and subtracts
+the contribution of every created, updated or deleted character. Statistics of a story
+are then calculated without touching the database.
+
+    Returns:
+        StatisticsCache: Cache of story totals.
+"""
+
+from repositories.db_stories import story_db
+from services.events import events, StoryDeleted, CharacterCreated, CharacterDeleted
+
+FILLED_STATS = ["birthday", "age", "height", "weight",
+                "appearance", "personality", "history", "picture"]
+GENDERS = {0: "female", 1: "male", 2: "unknown"}
+
+
+class StatisticsCache:
+    def __init__(self) -> None:
+        self._totals = {}
+
+    def _contribution(self, stats: dict) -> dict:
+        """How much a single character adds to the totals of its story.
+
+        Args:
+            stats (dict): Character's stats. May contain only some of the stats,
+                missing ones are treated as unknown.
+
+        Returns:
+            dict: Same keys as in StoriesDatabase.get_story_statistics.
+        """
+
+        age = stats.get("age")
+        height = stats.get("height")
+        weight = stats.get("weight")
+        physique = height is not None and weight is not None
+        gender = GENDERS.get(stats.get("gender"))
+        return {
+            "characters": 1,
+            "ages": int(age is not None),
+            "age_sum": age or 0,
+            "physiques": int(physique),
+            "height_sum": height if physique else 0,
+            "weight_sum": weight if physique else 0,
+            "female": int(gender == "female"),
+            "male": int(gender == "male"),
+            "unknown": int(gender == "unknown"),
+            "filled": sum(stats.get(s) is not None for s in FILLED_STATS)
+        }
+
+    def _apply(self, story_id: int, stats: dict, sign: int) -> None:
+        totals = self._totals.get(story_id)
+        if totals is None:
+            return
+        for key, value in self._contribution(stats).items():
+            totals[key] += sign * value
+
+    def get(self, story_id: int) -> dict:
+        """Totals of a story, queried from the database only on the first call.
+
+        Args:
+            story_id (int): Story id
+
+        Returns:
+            dict: Sums and counts, see StoriesDatabase.get_story_statistics.
+        """
+
+        if story_id not in self._totals:
+            self._totals[story_id] = story_db.get_story_statistics(story_id)
+        return dict(self._totals[story_id])
+
+    def peek(self, story_id: int) -> dict | None:
+        """Totals of a story without querying them.
+
+        Args:
+            story_id (int): Story id
+
+        Returns:
+            dict | None: Sums and counts, None if the story isn't cached.
+        """
+
+        totals = self._totals.get(story_id)
+        return dict(totals) if totals is not None else None
+
+    def add_character(self, story_id: int, stats: dict) -> None:
+        """Adds a new character to the totals of its story.
+
+        Args:
+            story_id (int): Story id
+            stats (dict): Character's stats.
+        """
+
+        self._apply(story_id, stats, 1)
+
+    def remove_character(self, story_id: int, stats: dict) -> None:
+        """Removes a deleted character from the totals of its story.
+
+        Args:
+            story_id (int): Story id
+            stats (dict): Character's stats before deletion.
+        """
+
+        self._apply(story_id, stats, -1)
+
+    def update_character(self, story_id: int, old: dict, new: dict) -> None:
+        """Replaces character's old stats with new ones in the totals of its story.
+
+        Args:
+            story_id (int): Story id
+            old (dict): Stats before the update.
+            new (dict): Stats after the update, with the same keys as old.
+        """
+
+        self._apply(story_id, old, -1)
+        self._apply(story_id, new, 1)
+
+    def invalidate(self, story_id: int = None) -> None:
+        """Forgets totals of a story, or of all stories if story_id is not given.
+
+        Args:
+            story_id (int, optional): Story id. Defaults to None.
+        """
+
+        if story_id is None:
+            self._totals.clear()
+        else:
+            self._totals.pop(story_id, None)
+
+    def check(self, story_id: int = None) -> list[int]:
+        """Compares cached totals with the database and rebuilds the ones that differ.
+
+        Args:
+            story_id (int, optional): Story to check. Defaults to all cached stories.
+
+        Returns:
+            list[int]: Ids of stories whose totals were out of sync.
+        """
+
+        story_ids = [story_id] if story_id is not None else list(self._totals)
+        out_of_sync = []
+        for s_id in story_ids:
+            if s_id not in self._totals:
+                continue
+            totals = story_db.get_story_statistics(s_id)
+            if totals != self._totals[s_id]:
+                self._totals[s_id] = totals
+                out_of_sync.append(s_id)
+        return out_of_sync
+
+
+stats_cache = StatisticsCache()
+
+
+def _forget_totals(event) -> None:
+    """Forgets totals after changes too big to apply one character at a time.
+
+    Single created or deleted characters are added and subtracted by CharacterService,
+    imports, deleted stories and clearing all characters are not.
+    """
+
+    if getattr(event, "char_id", None) is None:
+        stats_cache.invalidate(event.story_id)
+
+
+for _event_type in (StoryDeleted, CharacterCreated, CharacterDeleted):
+    events.subscribe(_event_type, _forget_totals)
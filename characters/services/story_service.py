@@ -6,15 +6,25 @@ This class is also responsible for checking whether user's input is valid or not
         StoryService: Controls everything to do with stories.
 """
 
+import json
 from repositories.db_stories import story_db
-from repositories.db_characters import char_db
+from repositories.db_characters import char_db, CHARACTER_COLUMNS
 from repositories.file_management import rep
+from services.statistics_cache import stats_cache
+from services.avatar_cache import avatar_cache
+from services.events import (events, StoryCreated, StoryRenamed, StoryDescChanged,
+                             StoryDeleted, RelationRemoved)
 from entities.story import Story
+from entities.story_statistics import StoryStatistics
+
+# Version of the story export format, increased on incompatible changes
+EXPORT_VERSION = 1
 
 
 class StoryService:
     def __init__(self) -> None:
-        pass
+        # Story names by story id, loaded once and kept up to date by this class
+        self._names = None
 
     def get_stories(self) -> list[Story]:
         """Obtains a list of dictionaries from database and return a list of Stories
@@ -32,6 +42,7 @@ class StoryService:
                 desc=s['desc']
             )
             stories.append(story)
+        self._names = {story.story_id: story.name for story in stories}
         return stories
 
     def get_story_by_id(self, story_id: int) -> Story:
@@ -74,13 +85,20 @@ class StoryService:
             return None
         story_id = story_db.create_story(name=name, desc=desc)
         story = Story(story_id=story_id, name=name, desc=desc)
+        if self._names is not None:
+            self._names[story_id] = name
+        events.publish(StoryCreated(story_id, name, desc))
         return story
 
     def update_story_name(self, story_id: int, new_name: str) -> None:
         story_db.update_story_name(story_id=story_id, new_name=new_name)
+        if self._names is not None:
+            self._names[story_id] = new_name
+        events.publish(StoryRenamed(story_id, new_name))
 
     def update_story_desc(self, story_id: int, new_desc: str) -> None:
         story_db.update_story_desc(story_id=story_id, new_desc=new_desc)
+        events.publish(StoryDescChanged(story_id, new_desc))
 
     def clear_stories(self, test: bool = None):
         """Deletes all stories and characters.
@@ -89,16 +107,21 @@ class StoryService:
             test (bool, optional): If run during test, doesn't affect avatars. Defaults to None.
         """
 
-        story_db.clear_stories()
-        char_db.clear_characters()
-        char_db.clear_relations()
+        with story_db.transaction():
+            story_db.clear_stories()
+            char_db.clear_characters()
+            char_db.clear_relations()
+        self._names = {}
         if not test:
+            avatar_cache.clear()
             rep.delete_all_avatars()
+        events.publish(StoryDeleted(None))
 
     def clear_relations(self):
         """Deletes all relations.
         """
         char_db.clear_relations()
+        events.publish(RelationRemoved(None, None, None, None))
 
     def delete_story(self, story_id: int):
         """Deletes a story based on its id.
@@ -107,22 +130,188 @@ class StoryService:
             story_id (int): Story id to be deleted.
         """
 
-        avatars = story_db.get_all_avatars_of_a_story(story_id=story_id)
-        story_db.delete_relations_of_a_story(story_id=story_id)
-        story_db.delete_characters_of_a_story(story_id=story_id)
-        story_db.delete_story(story_id=story_id)
+        with story_db.transaction():
+            avatars = story_db.get_all_avatars_of_a_story(story_id=story_id)
+            story_db.delete_relations_of_a_story(story_id=story_id)
+            story_db.delete_characters_of_a_story(story_id=story_id)
+            story_db.delete_story(story_id=story_id)
+        if self._names is not None:
+            self._names.pop(story_id, None)
+        for avatar in avatars:
+            avatar_cache.invalidate(avatar)
         rep.delete_avatars(avatars=avatars)
+        events.publish(StoryDeleted(story_id))
+
+    def export_story(self, story_id: int, fp) -> int:
+        """Writes a story with its characters and relationships as JSON Lines.
+
+        The first line describes the story, then comes one line per character and one
+        per relationship:
+
+            {"type": "story", "version": 1, "name": ..., "desc": ...}
+            {"type": "character", "id": ..., "name": ..., ..., "picture": ...}
+            {"type": "relation", "char1": ..., "char2": ..., "relation": ..., "former": ...}
+
+        Pictures are references to files in the avatar library. Everything is read in a
+        single transaction, so the export is consistent, and written while reading, so
+        the story is never in memory as a whole.
+
+        Args:
+            story_id (int): Story id.
+            fp (TextIO): File open for writing.
+
+        Raises:
+            ValueError: If the story doesn't exist.
+
+        Returns:
+            int: Number of exported characters.
+        """
+
+        encode = json.JSONEncoder(ensure_ascii=False).encode
+
+        def write(record: dict):
+            fp.write(encode(record))
+            fp.write("\n")
+
+        count = 0
+        with story_db.transaction():
+            if not story_db.story_exists(story_id):
+                raise ValueError(f"Unknown story {story_id}")
+            story = story_db.get_story_by_id(story_id)
+            write({"type": "story", "version": EXPORT_VERSION,
+                   "name": story["name"], "desc": story["desc"]})
+            for row in char_db.iter_characters(story_id):
+                record = {"type": "character", "id": row["char_id"]}
+                record.update(zip(CHARACTER_COLUMNS, row[2:]))
+                write(record)
+                count += 1
+            for char1_id, char2_id, relation, former in char_db.iter_story_relations(story_id):
+                write({"type": "relation", "char1": char1_id, "char2": char2_id,
+                       "relation": relation, "former": former})
+        return count
+
+    def export_story_database(self, story_id: int, path: str) -> None:
+        """Saves a story as a standalone SQLite database with the same schema.
+
+        Args:
+            story_id (int): Story id.
+            path (str): Path of the new database file.
+
+        Raises:
+            ValueError: If the story doesn't exist.
+        """
+
+        if not story_db.story_exists(story_id):
+            raise ValueError(f"Unknown story {story_id}")
+        story_db.export_story_database(story_id, path)
+
+    def import_story(self, fp, batch_size: int = 1000) -> Story:
+        """Creates a new story from a file written by export_story.
+
+        Characters get new ids and relationships are matched by relation name. Avatars
+        that exist in the library are copied, so the new story doesn't share files with
+        the original one. The file is read one line at a time and inserted in batches
+        within a single transaction: either the whole story is imported or nothing.
+
+        Args:
+            fp (TextIO): Open file.
+            batch_size (int, optional): Characters or relationships per insert.
+                Defaults to 1000.
+
+        Raises:
+            ValueError: If the file isn't a story export or refers to unknown
+                characters or relations.
+
+        Returns:
+            Story: The new story.
+        """
+
+        records = (json.loads(line) for line in fp if line.strip())
+        header = next(records, None)
+        if not header or header.get("type") != "story":
+            raise ValueError("Not a story export")
+        if header.get("version", 0) > EXPORT_VERSION:
+            raise ValueError(f"Unsupported export version {header['version']}")
+
+        ids = {}
+        copied = []
+        characters = []
+        relations = []
+
+        def character_row(record: dict, char_id: int, story_id: int) -> tuple:
+            stats = [record.get(column) for column in CHARACTER_COLUMNS]
+            stats[0] = stats[0] or "Unknown"
+            picture = CHARACTER_COLUMNS.index("picture")
+            if stats[picture]:
+                stats[picture] = rep.copy_avatar(stats[picture])
+                if stats[picture]:
+                    copied.append(stats[picture])
+            return (char_id, story_id, *stats)
+
+        def relation_row(record: dict) -> tuple:
+            rel_id = char_db.get_relation_id_from_name(record["relation"])
+            if rel_id is None:
+                raise ValueError(f"Unknown relation {record['relation']}")
+            try:
+                return (ids[record["char1"]], ids[record["char2"]],
+                        rel_id, record.get("former", 0))
+            except KeyError as error:
+                raise ValueError(f"Unknown character {error.args[0]}") from error
+
+        try:
+            with char_db.bulk():
+                story_id = story_db.create_story(header["name"], header.get("desc"))
+                next_id = char_db.max_character_id() + 1
+                for record in records:
+                    kind = record.get("type")
+                    if kind == "character":
+                        ids[record["id"]] = next_id
+                        characters.append(character_row(record, next_id, story_id))
+                        next_id += 1
+                    elif kind == "relation":
+                        relations.append(relation_row(record))
+                    else:
+                        raise ValueError(f"Unknown record type {kind}")
+                    if len(characters) >= batch_size:
+                        char_db.insert_characters(characters)
+                        characters.clear()
+                    if len(relations) >= batch_size:
+                        char_db.insert_characters(characters)
+                        characters.clear()
+                        char_db.set_relations_bulk(relations)
+                        relations.clear()
+                char_db.insert_characters(characters)
+                char_db.set_relations_bulk(relations)
+        except BaseException:
+            rep.delete_avatars(copied)
+            raise
+
+        if self._names is not None:
+            self._names[story_id] = header["name"]
+        events.publish(StoryCreated(story_id, header["name"], header.get("desc")))
+        return Story(story_id=story_id, name=header["name"], desc=header.get("desc"))
 
     def get_name_by_id(self, story_id: int) -> str:
         """Obtains story name by its id.
 
+        Names of all stories are loaded with the first call and kept in memory.
+
         Args:
             story_id (int): Story id.
 
         Returns:
-            str: Story name.
+            str: Story name, None if there is no such story.
         """
-        return story_db.get_name_by_id(story_id=story_id)
+
+        if self._names is None:
+            self.get_stories()
+        return self._names.get(story_id)
+
+    def invalidate_names(self) -> None:
+        """Forgets story names, they are loaded again on next use.
+        """
+
+        self._names = None
 
     def get_mean_age(self, story_id: int) -> float:
         """Calculates mean age of characters in a story.
@@ -178,5 +367,63 @@ class StoryService:
 
         return story_db.get_completion_percent(story_id=story_id)
 
+    def get_story_statistics(self, story_id: int) -> StoryStatistics:
+        """Calculates all statistics of a story.
+
+        Totals are queried once per story and then kept up to date by CharacterService.
+
+        Args:
+            story_id (int): Story id
+
+        Returns:
+            StoryStatistics: Mean age, mean physique, gender percentages and completion.
+        """
+
+        totals = stats_cache.get(story_id)
+        return self.statistics_from_totals(totals)
+
+    def get_cached_statistics(self, story_id: int) -> StoryStatistics | None:
+        """Statistics of a story if its totals are already in memory.
+
+        Args:
+            story_id (int): Story id
+
+        Returns:
+            StoryStatistics | None: Statistics, None if they would have to be queried.
+        """
+
+        totals = stats_cache.peek(story_id)
+        if totals is None:
+            return None
+        return self.statistics_from_totals(totals)
+
+    def statistics_from_totals(self, totals: dict) -> StoryStatistics:
+        """Calculates means and percentages from story totals.
+
+        Args:
+            totals (dict): Sums and counts, see StoriesDatabase.get_story_statistics.
+
+        Returns:
+            StoryStatistics: Statistics rounded to one decimal.
+        """
+
+        def ratio(part, whole, scale=1):
+            if not whole:
+                return 0
+            return round(part * scale / whole, 1)
+
+        count = totals["characters"]
+        return StoryStatistics(
+            mean_age=ratio(totals["age_sum"], totals["ages"]),
+            mean_height=ratio(totals["height_sum"], totals["physiques"]),
+            mean_weight=ratio(totals["weight_sum"], totals["physiques"]),
+            genders={
+                "female": ratio(totals["female"], count, 100),
+                "male": ratio(totals["male"], count, 100),
+                "unknown": ratio(totals["unknown"], count, 100)
+            },
+            completion=ratio(totals["filled"], count * 8, 100)
+        )
+
 
 story_service = StoryService()
@@ -0,0 +1,39 @@
+from services.avatar_cache import AvatarCache
+import unittest
+import os
+import sys
+
+dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(dir)
+sys.path.append(root_dir)
+
+
+class TestAvatarCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = AvatarCache(max_bytes=300)
+
+    def test_get_cached_image(self):
+        self.cache.put("abc", "image", 100)
+
+        self.assertEqual(self.cache.get("abc"), "image")
+        self.assertEqual(self.cache.get("xyz"), None)
+
+    def test_least_recently_used_is_dropped(self):
+        self.cache.put("a", "A", 100)
+        self.cache.put("b", "B", 100)
+        self.cache.put("c", "C", 100)
+        self.cache.get("a")
+        self.cache.put("d", "D", 100)
+
+        self.assertEqual(self.cache.get("b"), None)
+        self.assertEqual(self.cache.get("a"), "A")
+        self.assertEqual(self.cache.size(), 300)
+
+    def test_invalidate_frees_space(self):
+        self.cache.put("a", "A", 100)
+        self.cache.put("a", "A2", 150)
+        self.cache.invalidate("a")
+
+        self.assertEqual(self.cache.get("a"), None)
+        self.assertEqual(self.cache.size(), 0)
+        self.assertEqual(len(self.cache), 0)
@@ -1,6 +1,9 @@
 from initialize_db import initialize_database
-from services.character_service import char_service, Character
+from services.statistics_cache import stats_cache
+from services.character_service import char_service, Character, CharacterSummary
 from services.story_service import story_service, Story
+from repositories.db_characters import char_db
+import io
 import unittest
 import os
 import sys
@@ -13,6 +16,8 @@ sys.path.append(root_dir)
 class TestCharacterService(unittest.TestCase):
     def setUp(self):
         initialize_database()
+        stats_cache.invalidate()
+        story_service.invalidate_names()
 
         self.dummy_story = story_service.create_story(name="Dummy Story")
 
@@ -76,6 +81,17 @@ class TestCharacterService(unittest.TestCase):
 
         self.assertEqual(relations, [("Dummy", 0, "sibling", 2, 5, 1, 5)])
 
+    def test_set_same_relation_twice(self):
+        char1 = char_service.create_character(self.dummy_character_stats, 1)
+        char2 = char_service.create_character(self.dummy_character_stats, 1)
+        char_service.set_relations(
+            char1=char1, char2=char2, relation="sibling", former=0)
+        char_service.set_relations(
+            char1=char1, char2=char2, relation="sibling", former=0)
+        relations = char_service.get_character_relations(character=char1)
+
+        self.assertEqual(relations, [("Dummy", 0, "sibling", 2, 5, 1, 5)])
+
     def test_clear_stories_clears_relations(self):
         char1 = char_service.create_character(self.dummy_character_stats, 1)
         char2 = char_service.create_character(self.dummy_character_stats, 1)
@@ -153,3 +169,248 @@ class TestCharacterService(unittest.TestCase):
         self.assertEqual(bday, "24/12")
         self.assertEqual(height, "170 cm")
         self.assertEqual(weight, "60 kg")
+
+    def test_statistics_follow_character_changes(self):
+        story_service.get_story_statistics(1)
+        char1 = char_service.create_character(self.dummy_character_stats, 1)
+        char2 = char_service.create_character(self.dummy_character_stats, 1)
+        char_service.update_character(
+            ("f", "22/12/2023", "", "180", "70", "", "", "", "", "Dummella", char1))
+        char_service.delete_character(char2)
+        cached = story_service.get_story_statistics(1)
+
+        self.assertEqual(stats_cache.check(1), [])
+        self.assertEqual(cached.mean_height, 180)
+        self.assertEqual(cached.genders["female"], 100)
+
+    def test_statistics_check_rebuilds_stale_totals(self):
+        char_service.create_character(self.dummy_character_stats, 1)
+        story_service.get_story_statistics(1)
+        char_db.update_character(
+            (0, None, 50, None, None, None, None, None, None, "Dummy", 1))
+
+        self.assertEqual(stats_cache.check(), [1])
+        self.assertEqual(story_service.get_story_statistics(1).mean_age, 50)
+
+    def test_characters_page(self):
+        for _ in range(5):
+            char_service.create_character(self.dummy_character_stats, 1)
+        first = char_service.get_characters_page(1, limit=2)
+        second = char_service.get_characters_page(
+            1, after_id=first[-1].char_id, limit=2)
+        last = char_service.get_characters_page(1, after_id=4, limit=2)
+
+        self.assertEqual([c.char_id for c in first], [1, 2])
+        self.assertEqual([c.char_id for c in second], [3, 4])
+        self.assertEqual([c.char_id for c in last], [5])
+
+    def test_iter_characters_in_batches(self):
+        for _ in range(5):
+            char_service.create_character(self.dummy_character_stats, 1)
+        characters = list(char_service.iter_characters(1, batch_size=2))
+
+        self.assertEqual([c.char_id for c in characters], [1, 2, 3, 4, 5])
+        self.assertEqual(characters[0], self.dummy_character)
+
+    def test_iter_characters_selected_columns(self):
+        char_service.create_character(self.dummy_character_stats, 1)
+        character = next(char_service.iter_characters(
+            1, columns=["name", "picture"]))
+
+        self.assertEqual(character.name(), "Dummy")
+        self.assertEqual(character.stat("appearance"), None)
+        with self.assertRaises(ValueError):
+            list(char_service.iter_characters(1, columns=["password"]))
+
+    def test_character_summaries(self):
+        char_service.create_character(self.dummy_character_stats, 1)
+        char_service.create_character(self.dummy_character_stats, 1)
+        summaries = char_service.get_character_summaries(1)
+        page = char_service.get_character_summaries_page(
+            1, after_id=1, limit=10)
+
+        self.assertEqual(summaries, [CharacterSummary(1, 1, "Dummy"),
+                                     CharacterSummary(2, 1, "Dummy")])
+        self.assertEqual(page, [CharacterSummary(2, 1, "Dummy")])
+        self.assertEqual(summaries[0].image(),
+                         "../library/avatars/default.png")
+
+    def test_get_character_loads_all_stats(self):
+        char_service.create_character(self.dummy_character_stats, 1)
+
+        self.assertEqual(char_service.get_character(1), self.dummy_character)
+        self.assertEqual(char_service.get_character(2), None)
+
+    def test_relation_catalog(self):
+        catalog = char_db.relations
+
+        self.assertEqual(len(char_service.get_relations()), 22)
+        self.assertEqual(catalog.id_from_name("parent"), 1)
+        self.assertEqual(catalog.two_sided(1), (1, 2))
+        self.assertEqual(catalog.two_sided(21), (0, None))
+        self.assertEqual(catalog.gendered_name(1, 0), "mother")
+        self.assertEqual(catalog.gendered_name(1, 2), "parent")
+
+    def test_delete_relation_looks_up_counterpart(self):
+        char1 = char_service.create_character(self.dummy_character_stats, 1)
+        char2 = char_service.create_character(self.dummy_character_stats, 1)
+        char_service.set_relations(
+            char1=char1, char2=char2, relation="parent", former=0)
+        char_service.delete_relation(char1.char_id, char2.char_id, 1)
+
+        self.assertEqual(char_service.get_character_relations(char1), None)
+        self.assertEqual(char_service.get_character_relations(char2), None)
+
+    def test_set_relations_bulk(self):
+        for _ in range(3):
+            char_service.create_character(self.dummy_character_stats, 1)
+        count = char_service.set_relations_bulk([
+            (1, 2, "child", 0),
+            (2, 1, "parent", 0),
+            (1, 3, "child", 0),
+            (3, 2, "sibling", 0),
+            (2, 3, "enemy", 0)
+        ])
+        relations = char_service.get_character_relations(
+            char_service.get_character(2))
+
+        self.assertEqual(count, 7)
+        self.assertEqual(sorted(r[2] for r in relations),
+                         ["enemy", "parent", "sibling"])
+
+    def test_set_relations_bulk_unknown_relation(self):
+        char_service.create_character(self.dummy_character_stats, 1)
+
+        with self.assertRaises(ValueError):
+            char_service.set_relations_bulk([(1, 1, "nemesis", 0)])
+
+    def test_import_characters_from_csv(self):
+        fp = io.StringIO(
+            "name,gender,birthday,age,height,weight,appearance\n"
+            "Dummy,Unknown,24/12,23,170 cm,60,\n"
+            "Dummella,f,,,,,bald head blue eyes\n"
+            "Dumbo,m,1/2/2000,5,,,\n")
+        progress = []
+        total = char_service.import_characters(
+            fp, 1, batch_size=2, progress=progress.append)
+        characters = char_service.get_characters_by_story_id(1)
+
+        self.assertEqual(total, 3)
+        self.assertEqual(progress, [2, 3])
+        self.assertEqual(characters[0], self.dummy_character)
+        self.assertEqual(characters[1].gender(), "Female")
+        self.assertEqual(characters[2].birthday(), "1/2/2000")
+
+    def test_import_characters_from_json_lines(self):
+        fp = io.StringIO(
+            '{"name": "Dummy", "gender": 2, "day": 24, "month": 12, "age": 23, '
+            '"height": 170, "weight": 60, "picture": "missing"}\n'
+            '\n'
+            '{"name": "Dummella"}\n')
+        total = char_service.import_characters(fp, 1, file_format="jsonl")
+        characters = char_service.get_characters_by_story_id(1)
+
+        self.assertEqual(total, 2)
+        self.assertEqual(characters[0], self.dummy_character)
+        self.assertEqual(story_service.get_story_statistics(1).mean_age, 23)
+
+    def test_failed_import_keeps_statistics_in_sync(self):
+        story_service.get_story_statistics(1)
+        fp = io.StringIO('{"name": "Dummy", "age": 20}\n{"name": "Dummella", "age": 30}\n'
+                         '{"name": broken}\n')
+
+        with self.assertRaises(ValueError):
+            char_service.import_characters(fp, 1, file_format="jsonl", batch_size=2)
+        characters = char_service.get_characters_by_story_id(1)
+
+        self.assertEqual(len(characters), 2)
+        self.assertEqual(story_service.get_story_statistics(1).mean_age, 25)
+
+    def test_import_into_missing_story(self):
+        fp = io.StringIO('{"name": "Dummy"}\n')
+
+        with self.assertRaises(ValueError):
+            char_service.import_characters(fp, 2, file_format="jsonl")
+        self.assertFalse(char_service.get_characters_by_story_id(2))
+
+    def _searchable_characters(self):
+        story_service.create_story(name="Second Story")
+        char_service.create_character(
+            ("Gloom", "", ("", "", ""), "", "", "", "tall and gloomy", "", "", None, ""), 1)
+        char_service.create_character(
+            ("Sunny", "", ("", "", ""), "", "", "", "", "cheerful", "", None, "hates gloom"), 1)
+        char_service.create_character(
+            ("Gloria", "", ("", "", ""), "", "", "", "", "", "gloomy past", None, ""), 2)
+
+    def test_search_ranks_and_filters(self):
+        self._searchable_characters()
+        results = char_service.search("glo")
+        story_results = char_service.search("glo", story_id=1)
+        names = [r.character.name() for r in results]
+
+        self.assertEqual(len(results), 3)
+        self.assertIn(names[0], ["Gloom", "Gloria"])
+        self.assertEqual(sorted(r.character.name() for r in story_results), ["Gloom", "Sunny"])
+        self.assertEqual(char_service.search("gloomy past")[0].snippet, "[gloomy] [past]")
+
+    def test_search_follows_changes(self):
+        self._searchable_characters()
+        sunny = char_service.get_character(2)
+        char_service.update_character(
+            ("", "", "", "", "", "", "sunny", "", "", "Bright", sunny))
+        char_service.delete_character(char_service.get_character(1))
+
+        self.assertEqual(char_service.search("hates"), [])
+        self.assertEqual(char_service.search("tall"), [])
+        self.assertEqual(char_service.search("bright")[0].character.char_id, 2)
+
+    def test_search_quotes_user_input(self):
+        self._searchable_characters()
+
+        self.assertEqual(char_service.search('"gloomy" OR -'), [])
+        self.assertEqual(char_service.search("   "), [])
+
+    def test_find_characters_by_name_prefix(self):
+        story_service.create_story(name="Second Story")
+        for name in ["bob", "Bella", "Anna", "Benjamin", "béatrice"]:
+            char_service.create_character(
+                (name, "", ("", "", ""), "", "", "", "", "", "", None, ""), 1)
+        char_service.create_character(
+            ("Bert", "", ("", "", ""), "", "", "", "", "", "", None, ""), 2)
+        found = char_service.find_characters(1, "B")
+
+        self.assertEqual([c.name() for c in found], ["Bella", "Benjamin", "bob", "béatrice"])
+        self.assertEqual([c.name() for c in char_service.find_characters(1, "be", limit=1)],
+                         ["Bella"])
+        self.assertEqual(len(char_service.find_characters(1)), 5)
+        self.assertEqual(char_service.find_characters(1, "x"), [])
+
+    def test_find_characters_folds_non_ascii_case(self):
+        for name in ["Élise", "Øystein", "Straße"]:
+            char_service.create_character(
+                (name, "", ("", "", ""), "", "", "", "", "", "", None, ""), 1)
+        char_service.update_character(
+            ("", "", "", "", "", "", "", "", "", "Ömer", char_service.get_character(2)))
+
+        self.assertEqual([c.name() for c in char_service.find_characters(1, "é")], ["Élise"])
+        self.assertEqual([c.name() for c in char_service.find_characters(1, "ö")], ["Ömer"])
+        self.assertEqual([c.name() for c in char_service.find_characters(1, "STRASS")],
+                         ["Straße"])
+
+    def test_story_relations_match_character_relations(self):
+        story_service.create_story(name="Second Story")
+        for name, gender, story in [("Mom", "f", 1), ("Kid", "m", 1), ("Alone", "", 1),
+                                    ("Other", "", 2), ("Another", "", 2)]:
+            char_service.create_character(
+                (name, gender, ("", "", ""), "", "", "", "", "", "", None, ""), story)
+        char_service.set_relations_bulk([
+            (1, 2, "child", 0), (1, 3, "friend", 1), (4, 5, "enemy", 0)])
+        relations = char_service.get_story_relations(1)
+
+        self.assertEqual(sorted(relations), [1, 2, 3])
+        for char_id, rows in relations.items():
+            character = char_service.get_character(char_id)
+            self.assertEqual(sorted(rows),
+                             sorted(char_service.get_character_relations(character)))
+        self.assertEqual(relations[2][0][2], "mother")
+        self.assertEqual(list(char_service.get_story_relations(2)), [4])
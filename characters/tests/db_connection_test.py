@@ -0,0 +1,55 @@
+from db_connection import connect, get_db_connection
+from config import DB_PROFILES
+import sqlite3
+import tempfile
+import unittest
+import os
+import sys
+
+dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(dir)
+sys.path.append(root_dir)
+
+
+class TestDbConnection(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "profile.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _pragma(self, con, name: str):
+        return con.execute(f"PRAGMA {name}").fetchone()[0]
+
+    def test_default_connection_uses_wal(self):
+        con = get_db_connection()
+
+        self.assertEqual(self._pragma(con, "journal_mode"), "wal")
+
+    def test_fast_profile_is_applied(self):
+        con = connect(self.path, DB_PROFILES["fast"])
+
+        self.assertEqual(self._pragma(con, "journal_mode"), "wal")
+        self.assertEqual(self._pragma(con, "synchronous"), 1)
+        self.assertEqual(self._pragma(con, "cache_size"), -64000)
+        self.assertEqual(self._pragma(con, "temp_store"), 2)
+        self.assertEqual(self._pragma(con, "busy_timeout"), 5000)
+        con.close()
+
+    def test_invalid_setting_raises(self):
+        profile = dict(DB_PROFILES["safe"], synchronous="sometimes")
+
+        with self.assertRaises(ValueError):
+            connect(self.path, profile)
+
+    def test_read_only_connection_cannot_write(self):
+        con = connect(self.path)
+        con.execute("CREATE TABLE Dummy (value INTEGER)")
+        con.commit()
+        reader = connect(self.path, read_only=True)
+
+        with self.assertRaises(sqlite3.OperationalError):
+            reader.execute("INSERT INTO Dummy VALUES (1)")
+        reader.close()
+        con.close()
@@ -0,0 +1,100 @@
+from initialize_db import initialize_database
+from services.events import (EventBus, events, StoryCreated, StoryRenamed,
+                             StoryDescChanged, StoryDeleted, CharacterCreated,
+                             CharacterDeleted, RelationAdded, RelationRemoved)
+from services.statistics_cache import stats_cache
+from services.relation_graph import graph_cache
+from services.character_service import char_service
+from services.story_service import story_service
+from repositories.db_characters import char_db
+from unittest import mock
+import unittest
+import os
+import sys
+
+dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(dir)
+sys.path.append(root_dir)
+
+EVENT_TYPES = [StoryCreated, StoryRenamed, StoryDescChanged, StoryDeleted,
+               CharacterCreated, CharacterDeleted, RelationAdded, RelationRemoved]
+
+
+class TestEventBus(unittest.TestCase):
+    def setUp(self):
+        self.bus = EventBus()
+        self.received = []
+
+    def test_handlers_get_only_their_event_type(self):
+        self.bus.subscribe(StoryCreated, self.received.append)
+        self.bus.publish(StoryCreated(1, "Story", None))
+        self.bus.publish(StoryDeleted(1))
+
+        self.assertEqual(self.received, [StoryCreated(1, "Story", None)])
+
+    def test_unsubscribed_handler_is_not_called(self):
+        self.bus.subscribe(StoryDeleted, self.received.append)
+        self.bus.unsubscribe(StoryDeleted, self.received.append)
+        self.bus.publish(StoryDeleted(1))
+
+        self.assertEqual(self.received, [])
+
+
+class TestServiceEvents(unittest.TestCase):
+    def setUp(self):
+        initialize_database()
+        stats_cache.invalidate()
+        graph_cache.invalidate()
+        story_service.invalidate_names()
+        self.received = []
+        for event_type in EVENT_TYPES:
+            events.subscribe(event_type, self.received.append)
+
+    def tearDown(self):
+        for event_type in EVENT_TYPES:
+            events.unsubscribe(event_type, self.received.append)
+
+    def _create_character(self, name: str, story_id: int):
+        return char_service.create_character(
+            (name, "", ("", "", ""), "", "", "", "", "", "", None, ""), story_id)
+
+    def test_services_publish_changes(self):
+        story = story_service.create_story(name="Story")
+        story_service.update_story_name(story.story_id, "Renamed")
+        story_service.update_story_desc(story.story_id, "About")
+        char1 = self._create_character("First", story.story_id)
+        char2 = self._create_character("Second", story.story_id)
+        char_service.set_relations(char1, char2, "friend", 0)
+        rel_id = char_db.get_relation_id_from_name("friend")
+        char_service.delete_relation(char1.char_id, char2.char_id, rel_id)
+        char_service.delete_character(char2)
+        story_service.delete_story(story.story_id)
+
+        self.assertEqual(self.received, [
+            StoryCreated(story.story_id, "Story", None),
+            StoryRenamed(story.story_id, "Renamed"),
+            StoryDescChanged(story.story_id, "About"),
+            CharacterCreated(char1.char_id, story.story_id),
+            CharacterCreated(char2.char_id, story.story_id),
+            RelationAdded(char1.char_id, char2.char_id, rel_id, story.story_id),
+            RelationRemoved(char1.char_id, char2.char_id, rel_id, None),
+            CharacterDeleted(char2.char_id, story.story_id),
+            StoryDeleted(story.story_id)
+        ])
+
+    def test_new_relation_invalidates_graph(self):
+        story = story_service.create_story(name="Story")
+        char1 = self._create_character("First", story.story_id)
+        char2 = self._create_character("Second", story.story_id)
+        before = char_service.get_neighborhood(char1)
+        char_service.set_relations(char1, char2, "friend", 0)
+
+        self.assertEqual(before, {char1.char_id: 0})
+        self.assertIn(char2.char_id, char_service.get_neighborhood(char1))
+
+    def test_new_character_drops_graph(self):
+        story = story_service.create_story(name="Story")
+        with mock.patch.object(graph_cache, "invalidate") as invalidate:
+            self._create_character("First", story.story_id)
+
+        invalidate.assert_called_once_with(story.story_id)
@@ -0,0 +1,55 @@
+from repositories import executor as e
+import sqlite3
+import unittest
+import os
+import sys
+
+dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(dir)
+sys.path.append(root_dir)
+
+
+class TestExecutor(unittest.TestCase):
+    def setUp(self):
+        self.con = sqlite3.connect(":memory:")
+        e.execute_sql(self.con, "CREATE TABLE Dummy (value INTEGER)")
+
+    def tearDown(self):
+        self.con.close()
+
+    def _count(self) -> int:
+        return self.con.execute("SELECT COUNT(*) FROM Dummy").fetchone()[0]
+
+    def test_execute_sql_commits_without_transaction(self):
+        e.execute_sql(self.con, "INSERT INTO Dummy VALUES (?)", (1,))
+
+        self.assertFalse(self.con.in_transaction)
+        self.assertEqual(self._count(), 1)
+
+    def test_transaction_commits_once_at_the_end(self):
+        with e.transaction(self.con):
+            e.execute_sql(self.con, "INSERT INTO Dummy VALUES (?)", (1,))
+            e.execute_sql(self.con, "INSERT INTO Dummy VALUES (?)", (2,))
+            self.assertTrue(self.con.in_transaction)
+
+        self.assertFalse(self.con.in_transaction)
+        self.assertEqual(self._count(), 2)
+
+    def test_transaction_rolls_back_on_error(self):
+        with self.assertRaises(ValueError):
+            with e.transaction(self.con):
+                e.execute_sql(self.con, "INSERT INTO Dummy VALUES (?)", (1,))
+                with e.transaction(self.con):
+                    e.execute_sql(
+                        self.con, "INSERT INTO Dummy VALUES (?)", (2,))
+                raise ValueError
+
+        self.assertFalse(e.in_transaction(self.con))
+        self.assertEqual(self._count(), 0)
+
+    def test_bulk_inserts_all_rows(self):
+        with e.bulk(self.con):
+            e.execute_many(self.con, "INSERT INTO Dummy VALUES (?)",
+                           ((i,) for i in range(1000)))
+
+        self.assertEqual(self._count(), 1000)
@@ -0,0 +1,97 @@
+from migrations import migrate, get_version, MIGRATIONS
+import sqlite3
+import unittest
+import os
+import sys
+
+dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(dir)
+sys.path.append(root_dir)
+
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        self.con = sqlite3.connect(":memory:")
+
+    def tearDown(self):
+        self.con.close()
+
+    def _indexes(self) -> list[str]:
+        sql = "SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_%'"
+        return sorted(r[0] for r in self.con.execute(sql).fetchall())
+
+    def test_migrate_empty_database(self):
+        version = migrate(self.con)
+        relations = self.con.execute(
+            "SELECT COUNT(*) FROM Relations").fetchone()[0]
+
+        self.assertEqual(version, len(MIGRATIONS))
+        self.assertEqual(get_version(self.con), len(MIGRATIONS))
+        self.assertEqual(relations, 22)
+        self.assertIn("idx_characters_story_id", self._indexes())
+
+    def test_migrate_is_idempotent(self):
+        migrate(self.con)
+        version = migrate(self.con)
+
+        self.assertEqual(version, len(MIGRATIONS))
+
+    def test_unversioned_database_keeps_data(self):
+        migrate(self.con, version=1)
+        self.con.execute("PRAGMA user_version=0")
+        self.con.execute("INSERT INTO Stories(name) VALUES ('Old Story')")
+        self.con.execute(
+            "INSERT INTO Characters(story_id, name) VALUES (1, 'Old'), (1, 'Older')")
+        self.con.executemany(
+            "INSERT INTO CharacterRelations(char1_id, char2_id, relation_id) VALUES (?, ?, ?)",
+            [(1, 2, 5), (1, 2, 5), (2, 1, 5)])
+        self.con.commit()
+
+        migrate(self.con)
+        characters = self.con.execute(
+            "SELECT COUNT(*) FROM Characters").fetchone()[0]
+        relations = self.con.execute(
+            "SELECT COUNT(*) FROM CharacterRelations").fetchone()[0]
+
+        self.assertEqual(characters, 2)
+        self.assertEqual(relations, 2)
+
+    def test_failed_migration_is_rolled_back(self):
+        def broken(con):
+            con.execute("CREATE TABLE Broken (value INTEGER)")
+            raise sqlite3.OperationalError("broken migration")
+
+        migrate(self.con, version=1)
+        with self.assertRaises(sqlite3.OperationalError):
+            migrate(self.con, migrations=[MIGRATIONS[0], broken])
+        tables = self.con.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE name='Broken'").fetchone()[0]
+
+        self.assertEqual(get_version(self.con), 1)
+        self.assertEqual(tables, 0)
+
+    def test_existing_characters_are_searchable(self):
+        migrate(self.con, version=2)
+        self.con.execute("INSERT INTO Stories(name) VALUES ('Old Story')")
+        self.con.execute(
+            "INSERT INTO Characters(story_id, name, history) VALUES (1, 'Old', 'Long ago')")
+        self.con.commit()
+
+        migrate(self.con)
+        found = self.con.execute(
+            "SELECT rowid FROM CharacterSearch WHERE CharacterSearch MATCH 'ago'").fetchall()
+
+        self.assertEqual(found, [(1,)])
+
+    def test_existing_names_get_keys(self):
+        migrate(self.con, version=4)
+        self.con.execute("INSERT INTO Stories(name) VALUES ('Old Story')")
+        self.con.execute("INSERT INTO Characters(story_id, name) VALUES (1, 'Élise')")
+        self.con.commit()
+
+        migrate(self.con)
+        keys = self.con.execute("SELECT name_key FROM Characters").fetchall()
+
+        self.assertEqual(keys, [("élise",)])
+        self.assertIn("idx_characters_story_name_key", self._indexes())
+        self.assertNotIn("idx_characters_story_name", self._indexes())
@@ -0,0 +1,160 @@
+from initialize_db import initialize_database
+from services.statistics_cache import stats_cache
+from services.relation_graph import RelationGraph, graph_cache, kinship_ids
+from services.character_service import char_service
+from services.story_service import story_service
+from repositories.db_characters import char_db
+from unittest import mock
+import io
+import unittest
+import os
+import sys
+
+dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(dir)
+sys.path.append(root_dir)
+
+PARENT, CHILD, GRANDPARENT, SIBLING, AUNT_UNCLE, FRIEND, ENEMY = 1, 2, 3, 5, 7, 14, 21
+
+
+class TestRelationGraph(unittest.TestCase):
+    def setUp(self):
+        # 1 and 2 are parents of 3, 4 is sibling of 3, 5 is parent of 1,
+        # 6 is sibling of 1, 7 is enemy of 3, 8 and 9 are friends, 10 is alone
+        self.edges = [
+            (3, 1, PARENT), (1, 3, CHILD), (3, 2, PARENT), (2, 3, CHILD),
+            (3, 4, SIBLING), (4, 3, SIBLING), (1, 5, PARENT), (5, 1, CHILD),
+            (1, 6, SIBLING), (6, 1, SIBLING), (3, 7, ENEMY),
+            (8, 9, FRIEND), (9, 8, FRIEND), (10, 99, FRIEND)
+        ]
+        self.graph = RelationGraph(range(1, 11), self.edges)
+
+    def test_edges_outside_story_are_skipped(self):
+        self.assertEqual(len(self.graph), 10)
+        self.assertEqual(self.graph.edges, 13)
+
+    def test_neighborhood(self):
+        self.assertEqual(self.graph.neighborhood(3, 1),
+                         {3: 0, 1: 1, 2: 1, 4: 1, 7: 1})
+        self.assertEqual(self.graph.neighborhood(7),
+                         {7: 0, 3: 1, 1: 2, 2: 2, 4: 2, 5: 3, 6: 3})
+        self.assertEqual(self.graph.neighborhood(42), {})
+
+    def test_shortest_path(self):
+        path = self.graph.shortest_path(7, 5)
+
+        self.assertEqual(len(path), 3)
+        self.assertEqual(path[0], (3, 7, ENEMY))
+        self.assertEqual(path[-1][1] if path[-1][0] == 1 else path[-1][0], 5)
+        self.assertEqual(self.graph.shortest_path(7, 5, hops=2), None)
+        self.assertEqual(self.graph.shortest_path(8, 3), None)
+        self.assertEqual(self.graph.shortest_path(8, 8), [])
+
+    def test_components(self):
+        self.assertEqual(self.graph.components(),
+                         [[1, 2, 3, 4, 5, 6, 7], [8, 9], [10]])
+
+    def test_derived_relations(self):
+        kinship = {(PARENT, PARENT): GRANDPARENT, (PARENT, SIBLING): AUNT_UNCLE,
+                   (PARENT, CHILD): SIBLING}
+
+        self.assertEqual(sorted(self.graph.derived_relations(3, kinship)),
+                         [(3, 5, GRANDPARENT), (3, 6, AUNT_UNCLE)])
+
+
+class TestRelationGraphService(unittest.TestCase):
+    def setUp(self):
+        initialize_database()
+        stats_cache.invalidate()
+        graph_cache.invalidate()
+        story_service.invalidate_names()
+
+        story_service.create_story(name="Family")
+        for name in ["Grandma", "Mom", "Me", "Aunt", "Stranger"]:
+            char_service.create_character(
+                (name, "", ("", "", ""), "", "", "", "", "", "", None, ""), 1)
+        char_service.set_relations_bulk([
+            (2, 1, "parent", 0), (3, 2, "parent", 0), (2, 4, "sibling", 0)])
+        self.me = char_service.get_character(3)
+        self.grandma = char_service.get_character(1)
+
+    def _both(self, query):
+        """Runs query with the in-memory graph and with the SQL fallback."""
+
+        in_memory = query()
+        with mock.patch.object(graph_cache, "_max_edges", -1):
+            graph_cache.invalidate()
+            fallback = query()
+        return in_memory, fallback
+
+    def test_kinship_ids(self):
+        self.assertEqual(kinship_ids()[(PARENT, PARENT)], GRANDPARENT)
+
+    def test_neighborhood_matches_sql(self):
+        in_memory, fallback = self._both(
+            lambda: char_service.get_neighborhood(self.me, hops=2))
+
+        self.assertEqual(in_memory, {3: 0, 2: 1, 1: 2, 4: 2})
+        self.assertEqual(fallback, in_memory)
+
+    def test_relation_path_matches_sql(self):
+        in_memory, fallback = self._both(
+            lambda: char_service.get_relation_path(self.me, self.grandma))
+
+        self.assertEqual([edge[2] for edge in in_memory], [PARENT, PARENT])
+        self.assertEqual(fallback, in_memory)
+
+    def test_unbounded_neighborhood_matches_sql(self):
+        in_memory, fallback = self._both(
+            lambda: char_service.get_neighborhood(self.me, hops=None))
+
+        self.assertEqual(in_memory, {3: 0, 2: 1, 1: 2, 4: 2})
+        self.assertEqual(fallback, in_memory)
+
+    def test_unbounded_relation_path_matches_sql(self):
+        in_memory, fallback = self._both(
+            lambda: char_service.get_relation_path(self.me, self.grandma, hops=None))
+
+        self.assertEqual([edge[2] for edge in in_memory], [PARENT, PARENT])
+        self.assertEqual(fallback, in_memory)
+
+    def test_relation_path_without_edges_back(self):
+        with mock.patch.object(graph_cache, "_max_edges", -1), \
+                mock.patch.object(char_db, "get_character_edges", return_value=[]):
+            graph_cache.invalidate()
+            path = char_service.get_relation_path(self.me, self.grandma)
+
+        self.assertIsNone(path)
+
+    def test_components_match_sql(self):
+        in_memory, fallback = self._both(
+            lambda: char_service.get_story_components(1))
+
+        self.assertEqual(in_memory, [[1, 2, 3, 4], [5]])
+        self.assertEqual(fallback, in_memory)
+
+    def test_derived_relations_match_sql(self):
+        in_memory, fallback = self._both(
+            lambda: char_service.get_derived_relations(self.me))
+
+        self.assertEqual(sorted(in_memory), [(3, 1, GRANDPARENT), (3, 4, AUNT_UNCLE)])
+        self.assertEqual(sorted(fallback), sorted(in_memory))
+
+    def test_graph_includes_new_characters(self):
+        char_service.get_story_components(1)
+        newcomer = char_service.create_character(
+            ("Newcomer", "", ("", "", ""), "", "", "", "", "", "", None, ""), 1)
+        after_create = char_service.get_story_components(1)
+        char_service.import_characters(io.StringIO('{"name": "Imported"}\n'), 1,
+                                       file_format="jsonl")
+
+        self.assertEqual(char_service.get_neighborhood(newcomer), {6: 0})
+        self.assertEqual(after_create, [[1, 2, 3, 4], [5], [6]])
+        self.assertEqual(char_service.get_story_components(1),
+                         [[1, 2, 3, 4], [5], [6], [7]])
+
+    def test_graph_follows_changes(self):
+        char_service.get_neighborhood(self.me)
+        char_service.delete_relation(3, 2, PARENT)
+
+        self.assertEqual(char_service.get_neighborhood(self.me), {3: 0})
@@ -0,0 +1,43 @@
+from initialize_db import initialize_database
+from services.snapshot import Snapshot
+from services.statistics_cache import stats_cache
+from services.character_service import char_service
+from services.story_service import story_service
+from repositories.db_stories import story_db
+import unittest
+import os
+import sys
+
+dir = os.path.dirname(os.path.abspath(__file__))
+root_dir = os.path.dirname(dir)
+sys.path.append(root_dir)
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        initialize_database()
+        stats_cache.invalidate()
+        story_service.invalidate_names()
+
+        story_service.create_story(name="Story")
+        char_service.create_character(
+            ("Dummy", "", ("", "", ""), "23", "", "", "", "", "", None, ""), 1)
+        self.snapshot = Snapshot()
+
+    def test_reads_committed_data(self):
+        stories = self.snapshot.get_stories()
+        page = self.snapshot.get_character_summaries_page(1)
+
+        self.assertEqual([s.name for s in stories], ["Story"])
+        self.assertEqual([c.name() for c in page], ["Dummy"])
+        self.assertEqual(self.snapshot.get_story_statistics(1),
+                         story_service.get_story_statistics(1))
+
+    def test_doesnt_see_uncommitted_changes(self):
+        self.snapshot.get_stories()
+        with story_db.transaction():
+            story_db.create_story(name="Uncommitted")
+            stories = self.snapshot.get_stories()
+
+        self.assertEqual(len(stories), 1)
+        self.assertEqual(len(self.snapshot.get_stories()), 2)
@@ -1,5 +1,13 @@
 from initialize_db import initialize_database
+from services.statistics_cache import stats_cache
 from services.story_service import story_service, Story
+from services.character_service import char_service
+from unittest import mock
+from repositories.db_stories import story_db
+from repositories.db_characters import char_db
+import io
+import sqlite3
+import tempfile
 import unittest
 import os
 import sys
@@ -12,6 +20,8 @@ sys.path.append(root_dir)
 class TestStoryService(unittest.TestCase):
     def setUp(self):
         initialize_database()
+        stats_cache.invalidate()
+        story_service.invalidate_names()
 
         self.storyname = "Dummy Story"
         self.storydesc = "Dummy Description"
@@ -64,3 +74,113 @@ class TestStoryService(unittest.TestCase):
         ]
 
         self.assertEqual(stories, model)
+
+    def test_story_statistics_match_separate_queries(self):
+        story = story_service.create_story(name=self.storyname)
+        char_service.create_character(
+            ("A", "f", ("1", "2", None), "20", "170", "60", "tall", "", "", None, ""), 1)
+        char_service.create_character(
+            ("B", "m", ("", "", ""), "33", "", "80", "", "kind", "", None, ""), 1)
+        char_service.create_character(
+            ("C", "", ("", "", ""), "", "155", "45", "", "", "", None, ""), 1)
+        stats = story_service.get_story_statistics(story.story_id)
+
+        self.assertEqual(stats.mean_age, story_service.get_mean_age(1))
+        self.assertEqual(stats.physique(), story_service.get_mean_physique(1))
+        self.assertEqual(stats.genders, story_service.get_gender_percentage(1))
+        self.assertEqual(stats.completion,
+                         story_service.get_completion_percent(1))
+
+    def test_statistics_of_empty_story(self):
+        story = story_service.create_story(name=self.storyname)
+        stats = story_service.get_story_statistics(story.story_id)
+
+        self.assertEqual(stats.mean_age, 0)
+        self.assertEqual(stats.physique(), "0 cm, 0 kg")
+        self.assertEqual(
+            stats.genders, {"female": 0, "male": 0, "unknown": 0})
+        self.assertEqual(stats.completion, 0)
+
+    def test_story_names_are_kept_in_memory(self):
+        story_service.create_story(name=self.storyname)
+        story_service.get_name_by_id(1)
+        story_service.update_story_name(1, "Renamed")
+        story_service.create_story(name="Second")
+
+        with mock.patch.object(story_db, "get_stories", side_effect=AssertionError), \
+                mock.patch.object(story_db, "get_name_by_id", side_effect=AssertionError):
+            self.assertEqual(story_service.get_name_by_id(1), "Renamed")
+            self.assertEqual(story_service.get_name_by_id(2), "Second")
+
+        story_service.delete_story(2)
+        self.assertEqual(story_service.get_name_by_id(2), None)
+
+    def _dummy_family(self):
+        story = story_service.create_story(name=self.storyname, desc=self.storydesc)
+        char_service.create_character(
+            ("Mother", "f", ("1", "2", "1970"), "50", "", "", "", "", "", None, ""), 1)
+        char_service.create_character(
+            ("Son", "m", ("", "", ""), "20", "", "", "", "", "", None, "tall"), 1)
+        char_service.set_relations_bulk([(1, 2, "child", 0), (1, 2, "friend", 1)])
+        return story
+
+    def test_export_and_import_story(self):
+        self._dummy_family()
+        fp = io.StringIO()
+        exported = story_service.export_story(1, fp)
+        fp.seek(0)
+        story = story_service.import_story(fp)
+        characters = char_service.get_characters_by_story_id(story.story_id)
+        relations = char_service.get_character_relations(characters[0])
+
+        self.assertEqual(exported, 2)
+        self.assertEqual(story, Story(story_id=2, name=self.storyname, desc=self.storydesc))
+        self.assertEqual([c.name() for c in characters], ["Mother", "Son"])
+        self.assertEqual(characters[1].stat("trivia"), "tall")
+        self.assertEqual(sorted(r[2] for r in relations), ["friend", "son"])
+        self.assertEqual(story_service.get_story_statistics(2),
+                         story_service.get_story_statistics(1))
+
+    def test_failed_import_is_rolled_back(self):
+        lines = [
+            '{"type": "story", "version": 1, "name": "Broken", "desc": null}',
+            '{"type": "character", "id": 7, "name": "Lonely"}',
+            '{"type": "relation", "char1": 7, "char2": 8, "relation": "friend", "former": 0}'
+        ]
+
+        with self.assertRaises(ValueError):
+            story_service.import_story(io.StringIO("\n".join(lines)))
+        self.assertEqual(story_service.count_stories(), 0)
+        self.assertEqual(char_db.max_character_id(), 0)
+
+    def test_export_story_database(self):
+        self._dummy_family()
+        story_service.create_story(name="Other")
+        char_service.create_character(
+            ("Stranger", "", ("", "", ""), "", "", "", "", "", "xylophonetreason", None,
+             ""), 2)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "story.sqlite")
+            story_service.export_story_database(1, path)
+            with open(path, "rb") as file:
+                content = file.read()
+            con = sqlite3.connect(path)
+            stories = con.execute("SELECT name FROM Stories").fetchall()
+            characters = con.execute("SELECT COUNT(*) FROM Characters").fetchone()[0]
+            relations = con.execute(
+                "SELECT COUNT(*) FROM CharacterRelations").fetchone()[0]
+            con.close()
+
+        self.assertEqual(stories, [(self.storyname,)])
+        self.assertEqual(characters, 2)
+        self.assertEqual(relations, 4)
+        self.assertNotIn(b"xylophonetreason", content)
+        self.assertNotIn(b"Stranger", content)
+
+    def test_export_unknown_story(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(ValueError):
+                story_service.export_story_database(1, os.path.join(tmp, "story.sqlite"))
+        with self.assertRaises(ValueError):
+            story_service.export_story(1, io.StringIO())
@@ -0,0 +1,78 @@
+import tkinter as tk
+from PIL import Image, ImageTk
+from services.avatar_cache import avatar_cache
+from services.character_service import char_service, Character, CharacterSummary
+from .background import TaskRunner
+
+
+def load_avatar(character: Character | CharacterSummary) -> tk.PhotoImage:
+    """Decoded avatar of a character, read from disk only if it isn't cached.
+
+    Args:
+        character (Character | CharacterSummary): Character whose avatar is shown.
+
+    Returns:
+        tk.PhotoImage: Avatar image.
+    """
+
+    img = avatar_cache.get(character.picture())
+    if img is None:
+        img = to_photo(character, decode_avatar(character))
+    return img
+
+
+def decode_avatar(character: Character | CharacterSummary) -> Image.Image:
+    """Reads and decodes avatar file. Doesn't use Tk, so it can run on a worker thread.
+
+    Args:
+        character (Character | CharacterSummary): Character whose avatar is decoded.
+
+    Returns:
+        Image.Image: Decoded image.
+    """
+
+    with Image.open(char_service.get_image_path(character)) as img:
+        img.load()
+        return img.copy()
+
+
+def to_photo(character: Character | CharacterSummary, img: Image.Image) -> tk.PhotoImage:
+    """Turns a decoded avatar into a Tk image and caches it. Main thread only.
+
+    Args:
+        character (Character | CharacterSummary): Character whose avatar it is.
+        img (Image.Image): Decoded image.
+
+    Returns:
+        tk.PhotoImage: Avatar image.
+    """
+
+    photo = ImageTk.PhotoImage(img)
+    avatar_cache.put(character.picture(), photo, photo.width() * photo.height() * 4)
+    return photo
+
+
+def show_avatar(tasks: TaskRunner, owner, character: Character | CharacterSummary,
+                label: tk.Label) -> None:
+    """Shows avatar in a label, decoding it in the background if it isn't cached.
+
+    Until the avatar is decoded, the label shows the default avatar.
+
+    Args:
+        tasks (TaskRunner): Background executor.
+        owner (Any): View that owns the label.
+        character (Character | CharacterSummary): Character whose avatar is shown.
+        label (tk.Label): Label for the image.
+    """
+
+    def show(img: tk.PhotoImage):
+        label.image = img
+        label.configure(image=img)
+
+    img = avatar_cache.get(character.picture())
+    if img is not None:
+        show(img)
+        return
+    show(load_avatar(CharacterSummary(None, character.story_id, "")))
+    tasks.submit(owner, decode_avatar,
+                 lambda decoded: show(to_photo(character, decoded)), character)
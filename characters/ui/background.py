@@ -0,0 +1,135 @@
+"""Runs slow work, such as database queries and image decoding, off the Tk main loop.
+
+Tk widgets may only be touched from the main thread, so work functions run on a worker
+thread and their results are handed back to the main thread through a queue. The queue
+is drained with root.after only while tasks are pending, so an idle window does no
+polling at all.
+
+There is a single worker thread and it runs tasks one at a time. Work functions must not
+use the services or repositories of the main thread, their connection and caches belong
+to it. Database reads go through services.snapshot, which has a read-only connection of
+its own and sees only committed data.
+
+    Returns:
+        TaskRunner: Background executor bound to a Tk root.
+"""
+
+import queue
+import sys
+import threading
+from itertools import count
+
+
+class TaskRunner:
+    def __init__(self, root, poll_ms: int = 20) -> None:
+        """
+        Args:
+            root (Tk): Root window, results are delivered through its event loop.
+            poll_ms (int, optional): How often finished tasks are checked for while
+                tasks are pending. Defaults to 20.
+        """
+
+        self._root = root
+        self._poll_ms = poll_ms
+        self._ids = count(1)
+        self._tasks = queue.Queue()
+        self._results = queue.Queue()
+
+        # Touched only on the main thread: task id -> (owner, callback, on_error)
+        self._pending = {}
+        # Tasks whose owners were destroyed, skipped by the worker if not started yet
+        self._cancelled = set()
+        self._poll_job = None
+        self._worker = None
+
+    def submit(self, owner, work, callback=None, *args, on_error=None) -> int:
+        """Runs work(*args) on the worker thread and callback(result) on the main thread.
+
+        Args:
+            owner (Any): View that needs the result, used for cancelling.
+            work (function): Function without side effects on Tk widgets.
+            callback (function, optional): Receives the result of work. Defaults to None.
+            *args: Arguments of work.
+            on_error (function, optional): Called on the main thread with the exception
+                if work raises, after the error has been reported. Defaults to None.
+
+        Returns:
+            int: Task id.
+        """
+
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._work, name="background-tasks", daemon=True)
+            self._worker.start()
+        task_id = next(self._ids)
+        self._pending[task_id] = (owner, callback, on_error)
+        self._tasks.put((task_id, work, args))
+        if self._poll_job is None:
+            self._poll_job = self._root.after(self._poll_ms, self._poll)
+        return task_id
+
+    def cancel(self, owner) -> None:
+        """Forgets all tasks of an owner, their callbacks are never called.
+
+        Args:
+            owner (Any): View that is being destroyed.
+        """
+
+        for task_id, (task_owner, _, _) in list(self._pending.items()):
+            if task_owner is owner:
+                del self._pending[task_id]
+                self._cancelled.add(task_id)
+
+    def pending(self, owner=None) -> int:
+        """Number of unfinished tasks.
+
+        Args:
+            owner (Any, optional): Count only tasks of this owner. Defaults to all tasks.
+
+        Returns:
+            int: Number of tasks.
+        """
+
+        if owner is None:
+            return len(self._pending)
+        return sum(1 for task_owner, _, _ in self._pending.values() if task_owner is owner)
+
+    def _work(self) -> None:
+        """Worker thread: runs tasks in the order they were submitted.
+        """
+
+        while True:
+            task_id, work, args = self._tasks.get()
+            if task_id in self._cancelled:
+                self._cancelled.discard(task_id)
+                continue
+            try:
+                self._results.put((task_id, work(*args), None))
+            except Exception:  # pylint: disable=broad-except
+                self._results.put((task_id, None, sys.exc_info()))
+
+    def _poll(self) -> None:
+        """Main thread: calls callbacks of finished tasks.
+        """
+
+        self._poll_job = None
+        while True:
+            try:
+                task_id, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._cancelled.discard(task_id)
+            entry = self._pending.pop(task_id, None)
+            if entry is None:
+                continue
+            _, callback, on_error = entry
+            if error:
+                self._root.report_callback_exception(*error)
+                callback, result = on_error, error[1]
+            if callback:
+                try:
+                    callback(result)
+                except Exception:  # pylint: disable=broad-except
+                    self._root.report_callback_exception(*sys.exc_info())
+        if self._pending:
+            self._poll_job = self._root.after(self._poll_ms, self._poll)
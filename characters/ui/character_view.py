@@ -2,14 +2,20 @@ import tkinter as tk
 from tkinter import ttk
 from PIL import Image, ImageTk
 from typing import Callable
-from services.character_service import char_service, Character
+from services.character_service import char_service, Character, CharacterSummary
 from services.story_service import story_service
 from services.formatter import formatter
+from services.avatar_cache import avatar_cache
+from services.snapshot import snapshot
+from services.events import events, RelationAdded, RelationRemoved
 from . import delete_dialog as dd
 from . import image_selector as im
+from .avatars import show_avatar
+from .background import TaskRunner
+from .dialog import Dialog
 
 
-class RelationDialog:
+class RelationDialog(Dialog):
     def __init__(self, parent, character: Character) -> None:
         """Class for dialog window for setting characters' relationships.
 
@@ -18,8 +24,7 @@ class RelationDialog:
             character (Character): Character whose relationship is being added.
         """
 
-        self.dialog = tk.Toplevel(parent)
-        self.dialog.title = "Add Relation"
+        super().__init__(parent, "Add Relation")
 
         self._character = character
         self._characters = None
@@ -31,21 +36,22 @@ class RelationDialog:
 
         self._former = tk.IntVar()
 
+        # Number of matching characters offered while typing
+        self._picker_size = 15
+
         self._initialize()
 
     def _initialize(self):
         """Initializes elements in the dialog window.
         """
 
-        self._characters = char_service.get_characters_by_story_id(
-            self._character.story_id)
         self._relations = char_service.get_relations()
 
-        self._charbox = ttk.Combobox(
-            master=self.dialog, values=[char.name() for char in self._characters], state="readonly"
-        )
+        self._charbox = ttk.Combobox(master=self.dialog)
         self._charbox.bind("<<ComboboxSelected>>", self._on_character_choice)
+        self._charbox.bind("<KeyRelease>", self._on_character_typed)
         self._charbox.pack(padx=5, side=tk.LEFT)
+        self._find_characters()
 
         ttk.Label(master=self.dialog, text="is").pack(side=tk.LEFT)
 
@@ -65,6 +71,27 @@ class RelationDialog:
         ttk.Button(master=self.dialog, text="OK",
                    command=self._enter).pack(pady=10)
 
+    def _find_characters(self) -> None:
+        """Fills character selection box with characters whose name starts with typed text.
+        """
+
+        self._characters = char_service.find_characters(
+            self._character.story_id, self._charbox.get(), limit=self._picker_size)
+        self._charbox["values"] = [char.name() for char in self._characters]
+
+    def _on_character_typed(self, event):
+        """Is called when user types into character selection box.
+
+        A character is chosen once the typed text matches their whole name.
+        """
+
+        if event.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
+            return
+        self._find_characters()
+        typed = self._charbox.get().strip().lower()
+        self._target_char = next(
+            (char for char in self._characters if char.name().lower() == typed), None)
+
     def _on_character_choice(self, event):
         """Is called when user selects a character from character selection box.
         """
@@ -88,28 +115,32 @@ class RelationDialog:
             return
         char_service.set_relations(char1=self._character, char2=self._target_char,
                                    relation=self._target_rel, former=self._former.get())
-        self._close()
-
-    def _close(self):
-        """Closes the dialog.
-        """
-        self.dialog.destroy()
+        self.close()
 
 
 class CharacterView:
-    def __init__(self, root, character: Character, handle_story: Callable) -> None:
+    def __init__(self, root, character: Character | CharacterSummary, handle_story: Callable,
+                 tasks: TaskRunner) -> None:
         """View that contains information about certain character.
 
+        All stats of the character are loaded when the view is opened, relations and the
+        image are loaded in the background.
+
         Args:
             root (Tk): Parent root.
-            character (Character): Character whose information is being displayed.
+            character (Character | CharacterSummary): Character whose information is being displayed.
             handle_story (Callable): Function to return back to story view.
+            tasks (TaskRunner): Runner for background loading.
         """
 
         self._root = root
+        self._tasks = tasks
         self._handle_story = handle_story
         self._frame = None
         self._relations_frame = None
+        self._relations_placeholder = None
+        # (char2_id, relation id) -> (frame, label) of a shown relation, in display order
+        self._relation_rows = {}
         self._img_label = None
         self._data_entries = {
             "gender": None,
@@ -126,7 +157,11 @@ class CharacterView:
 
         self._frozen = False
 
-        self._character = character
+        self._character = char_service.get_character(character.char_id)
+
+        # Relations are reloaded whenever relations of this character change
+        for event_type in (RelationAdded, RelationRemoved):
+            events.subscribe(event_type, self._on_relations_changed)
 
         self._heading_font = ('Helvetica', '20')
         self._bg_color = "#f0f0f0"
@@ -145,6 +180,9 @@ class CharacterView:
         """Destroys the main frame of the view.
         """
 
+        self._tasks.cancel(self)
+        for event_type in (RelationAdded, RelationRemoved):
+            events.unsubscribe(event_type, self._on_relations_changed)
         self._frame.destroy()
 
     def _initialiaze(self):
@@ -166,7 +204,7 @@ class CharacterView:
                   "History", "Trivia"]
 
         for l in labels:
-            txt = self._character.stats[l.lower()] or ""
+            txt = self._character.stat(l.lower()) or ""
             stat_frame = ttk.Frame(left_frame)
             stat_frame.pack(pady=15, padx=30)
             ttk.Label(stat_frame, text=l,
@@ -197,6 +235,9 @@ class CharacterView:
         self._relations_frame = ttk.Frame(
             master=info_frame, width=self._info_width)
         self._relations_frame.pack()
+        self._relations_placeholder = ttk.Label(
+            master=self._relations_frame, text="Loading...", width=self._info_width)
+        self._relations_placeholder.pack()
         self._initialize_relations()
 
     def _initialize_image(self, frame: ttk.Frame):
@@ -204,11 +245,8 @@ class CharacterView:
                               relief=tk.SOLID, width=125, height=125)
         img_frame.pack()
 
-        img_path = char_service.get_image_path(self._character)
-
-        img = tk.PhotoImage(file=img_path)
-        self._img_label = tk.Label(master=img_frame, image=img)
-        self._img_label.image = img
+        self._img_label = tk.Label(master=img_frame)
+        show_avatar(self._tasks, self, self._character, self._img_label)
         self._img_label.pack()
         self._img_label.bind(
             "<Button-1>", lambda event: self._change_image(event))
@@ -220,6 +258,8 @@ class CharacterView:
         img = img_tuple[0]
         char_service.update_image(self._character, img)
         tk_image = ImageTk.PhotoImage(img)
+        avatar_cache.put(self._character.picture(), tk_image,
+                         tk_image.width() * tk_image.height() * 4)
         self._img_label.image = tk_image
         self._img_label.configure(image=tk_image)
 
@@ -320,54 +360,118 @@ class CharacterView:
         if not self._frozen:
             dialog = RelationDialog(self._root, self._character)
             self._frozen = True
-            self._wait_for_input(dialog, self._initialize_relations)
+            dialog.on_close(self._unfreeze)
+
+    def _on_relations_changed(self, event: RelationAdded | RelationRemoved) -> None:
+        """Reloads relations if the change may concern this character.
+        """
 
-    def _wait_for_input(self, dialog: "RelationDialog", callback) -> None:
-        """Doesn't execute the rest of the code in a function when called if an open dialog exists.
+        char_id = self._character.char_id
+        if event.char1_id is None or char_id in (event.char1_id, event.char2_id):
+            self._initialize_relations()
+
+    def _initialize_relations(self) -> None:
+        """Loads relations in the background, shown ones stay visible meanwhile.
+        """
+
+        self._tasks.submit(self, snapshot.get_character_relations, self._show_relations,
+                           self._character.char_id)
+
+    def _show_relations(self, relations: list) -> None:
+        """Updates shown relations to match loaded ones, in the same order.
+
+        Only relations that were added, removed, changed or moved touch the widgets.
 
         Args:
-            dialog (RelationDialog): Function checks if this dialog exists.
-            callback (function): Calls this function when the dialog cease from existence.
+            relations (list): Relations of the character.
         """
 
-        def wait():
-            if dialog.dialog.winfo_exists():
-                self._root.after(100, wait)
+        keys = {(relation[3], relation[4]) for relation in relations}
+        for key in [key for key in self._relation_rows if key not in keys]:
+            self._relation_rows.pop(key)[0].destroy()
+
+        # Rows before the first unplaced one are in their final order, and a row that
+        # comes next in the shown order is already in place
+        shown = iter(list(self._relation_rows))
+        placed = set()
+        expected = next(shown, None)
+        rows = {}
+        previous = None
+        for relation in relations:
+            key = (relation[3], relation[4])
+            text = formatter.relation_str(relation)
+            row = self._relation_rows.get(key)
+            if row is None:
+                row = self._initialize_relation(relation, text, previous)
             else:
-                callback()
-        wait()
+                if key == expected:
+                    expected = next(shown, None)
+                    while expected in placed:
+                        expected = next(shown, None)
+                else:
+                    self._place_relation(row[0], previous)
+                    placed.add(key)
+                if row[1].cget("text") != text:
+                    row[1].configure(text=text)
+            rows[key] = row
+            previous = row[0]
+        self._relation_rows = rows
+
+        self._relations_placeholder.configure(text="")
+        if relations:
+            self._relations_placeholder.pack_forget()
+        else:
+            self._relations_placeholder.pack()
+
+    def _place_relation(self, frame: tk.Frame, previous: tk.Frame | None) -> None:
+        """Packs a relation right after the previous one, or first if there is none.
 
-    def _initialize_relations(self) -> None:
-        """Destroys and initializes all relations from scratch.
+        Args:
+            frame (tk.Frame): Frame of the relation.
+            previous (tk.Frame | None): Frame of the relation shown before this one,
+                None if this one is the first.
         """
 
-        for widget in self._relations_frame.winfo_children():
-            widget.destroy()
-        relations = char_service.get_character_relations(self._character)
-        if not relations:
-            ttk.Label(master=self._relations_frame, text="",
-                      width=self._info_width).pack()
+        if previous is not None:
+            frame.pack(after=previous)
             return
+        others = [other for other in self._relations_frame.pack_slaves()
+                  if other is not frame and other is not self._relations_placeholder]
+        if others:
+            frame.pack(before=others[0])
+        else:
+            frame.pack()
 
-        for relation in relations:
-            r_frame = tk.Frame(
-                master=self._relations_frame,
-                width=400,
-                height=25)
-            r_frame.pack_propagate(0)
-            r_frame.pack()
-            r = ttk.Label(
-                master=r_frame,
-                text=formatter.relation_str(relation),
-                font=('Helvetica', '12')
-            )
-            r.pack(expand=True)
-            r.bind("<Button-1>", lambda event, char1_id=self._character.char_id,
-                   char2_id=relation[3], rel_id=relation[4], two_sided=relation[5], cpart=relation[6]: self._delete_relation(event, char1_id, char2_id, rel_id, two_sided, cpart))
-            r.bind("<Enter>", lambda event, label=r: self._hover(event, label))
-            r.bind("<Leave>", lambda event, label=r: self._leave(event, label))
+    def _initialize_relation(self, relation: tuple, text: str, previous: tk.Frame | None) -> tuple:
+        """Initializes widgets of a single relation.
 
-        self._frozen = False
+        Args:
+            relation (tuple): Relation as returned by get_character_relations.
+            text (str): Text of the relation.
+            previous (tk.Frame | None): Frame of the relation shown before this one,
+                None if this one is the first.
+
+        Returns:
+            tuple: (frame, label) of the relation.
+        """
+
+        r_frame = tk.Frame(
+            master=self._relations_frame,
+            width=400,
+            height=25)
+        r_frame.pack_propagate(0)
+        self._place_relation(r_frame, previous)
+        r = ttk.Label(
+            master=r_frame,
+            text=text,
+            font=('Helvetica', '12')
+        )
+        r.pack(expand=True)
+        r.bind("<Button-1>", lambda event, char1_id=self._character.char_id,
+               char2_id=relation[3], rel_id=relation[4], two_sided=relation[5], cpart=relation[6]: self._delete_relation(event, char1_id, char2_id, rel_id, two_sided, cpart))
+        r.bind("<Enter>", lambda event, label=r: self._hover(event, label))
+        r.bind("<Leave>", lambda event, label=r: self._leave(event, label))
+        return r_frame, r
 
     def _hover(self, event, label: ttk.Label) -> None:
         bold_font = ('Helvetica', '12', 'bold')
@@ -380,7 +484,6 @@ class CharacterView:
     def _delete_relation(self, event, char1_id: int, char2_id: int, rel_id: int, two_sided: int, counterpart: int):
         char_service.delete_relation(
             char1_id, char2_id, rel_id, two_sided, counterpart)
-        self._initialize_relations()
 
     def _delete_character(self):
         """Deletes current character from the database.
@@ -394,7 +497,7 @@ class CharacterView:
                 lambda: self._handle_story(story=_story),
                 self._character,
                 'character')
-            self._wait_for_input(dialog, self._unfreeze)
+            dialog.on_close(self._unfreeze)
 
     def _unfreeze(self):
         self._frozen = False
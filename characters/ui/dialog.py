@@ -0,0 +1,48 @@
+import tkinter as tk
+
+
+class Dialog:
+    def __init__(self, parent, title: str) -> None:
+        """Base for dialog windows that tells its view when it has been closed.
+
+        The view registers a callback with on_close. It is called once, right after the
+        dialog window is destroyed, whether by the dialog itself or by the window manager.
+
+        Args:
+            parent (Tk): Parent root.
+            title (str): Title of the dialog window.
+        """
+
+        self._parent = parent
+        self._on_close = None
+        self._closed = False
+
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title(title)
+        self.dialog.bind("<Destroy>", self._on_destroy, add="+")
+
+    def on_close(self, callback) -> None:
+        """Sets function that is called when the dialog is closed.
+
+        Args:
+            callback (function): Function without arguments.
+        """
+
+        self._on_close = callback
+
+    def close(self) -> None:
+        """Closes dialog window.
+        """
+
+        self.dialog.destroy()
+
+    def _on_destroy(self, event) -> None:
+        """Is called for the dialog window and each of its children when they are destroyed.
+        """
+
+        if event.widget is not self.dialog or self._closed:
+            return
+        self._closed = True
+        if self._on_close:
+            # Let the current event handler, such as OK button, finish first
+            self._parent.after_idle(self._on_close)
@@ -1,7 +1,13 @@
 import tkinter as tk
-from tkinter import ttk, constants, Toplevel, Entry
+from tkinter import ttk, constants, Entry
 from services.story_service import story_service, Story
+from services.snapshot import snapshot
+from services.events import (events, StoryCreated, StoryRenamed, StoryDescChanged,
+                             StoryDeleted)
 from . import delete_dialog as dd
+from .search_box import SearchBox
+from .background import TaskRunner
+from .dialog import Dialog
 import getpass
 import sys
 import os
@@ -11,16 +17,13 @@ root_dir = os.path.dirname(dir)
 sys.path.append(root_dir)
 
 
-class StoryDialog:
+class StoryDialog(Dialog):
     """A class to manage user input of story name and description.
     """
 
     def __init__(self, parent: tk.Tk, view: "MainView") -> None:
+        super().__init__(parent, "New story")
         self.view = view
-        self._parent = parent
-
-        self.dialog = Toplevel(parent)
-        self.dialog.title("New story")
 
         self.askname = ttk.Label(self.dialog, text="Name:")
         self.askname.pack()
@@ -57,22 +60,39 @@ class StoryDialog:
 
         self.close()
 
-    def close(self):
-        """Closes dialog window.
-        """
-
-        self.dialog.destroy()
-
 
 class MainView:
-    def __init__(self, root, stories: list[Story], handle_story) -> None:
+    def __init__(self, root, handle_story, handle_character, tasks: TaskRunner) -> None:
         self._root = root
+        self._tasks = tasks
 
         self._frame = None
         self._stories_frame = None
+        self._count_label = None
+        self._no_stories_label = None
+        self._create_story_button = None
+        self._search_box = None
+
+        # Story id -> (frame, button) of the story in the list
+        self._story_frames = {}
 
         self._handle_story = handle_story
-        self.stories = stories
+        self._handle_character = handle_character
+        self.stories = []
+
+        # Story events that arrive before the list is loaded may be missing from it
+        self._loaded = False
+        self._missed_changes = False
+
+        # Stories created, changed or deleted anywhere are patched into the list
+        self._subscriptions = [
+            (StoryCreated, self._on_story_created),
+            (StoryRenamed, self._on_story_renamed),
+            (StoryDescChanged, self._on_story_desc_changed),
+            (StoryDeleted, self._on_story_deleted)
+        ]
+        for event_type, handler in self._subscriptions:
+            events.subscribe(event_type, handler)
 
         # Can't click anything while dialog window is open
         self._frozen = False
@@ -88,10 +108,22 @@ class MainView:
 
         self._frame.pack(fill=constants.X)
 
+    def hide(self):
+        """Hides the view without destroying it.
+        """
+
+        self._frame.pack_forget()
+
     def destroy(self):
         """Destroys all widgets in current view.
         """
 
+        self._tasks.cancel(self)
+        for event_type, handler in self._subscriptions:
+            events.unsubscribe(event_type, handler)
+        if self._search_box:
+            self._search_box.destroy()
+            self._search_box = None
         self._frame.destroy()
 
     def _initialize_welcome_frame(self):
@@ -106,17 +138,20 @@ class MainView:
                                  text=f"Welcome, {name}!")
         welcome_text.pack()
 
-        if len(self.stories) == 0:
-            no_stories = ttk.Label(
-                master=welcome_frame, text="You don't have any stories yet. Why not create one?")
-            no_stories.pack()
+        # Shown by _update_count once stories are loaded
+        self._no_stories_label = ttk.Label(
+            master=welcome_frame, text="You don't have any stories yet. Why not create one?")
 
-        create_story_button = ttk.Button(
+        self._create_story_button = ttk.Button(
             master=welcome_frame,
             text="New Story",
             command=self._story_creation_dialog
         )
-        create_story_button.pack(pady=10)
+        self._create_story_button.pack(pady=10)
+
+        self._search_box = SearchBox(
+            self._root, welcome_frame, self._handle_character)
+        self._search_box.pack(pady=5)
 
     def _initialize_endpage(self):
         """Initializes story count and button for deleting all stories.
@@ -125,11 +160,8 @@ class MainView:
         endpage_frame = ttk.Frame(master=self._frame)
         endpage_frame.pack(pady=10)
 
-        count = ttk.Label(
-            master=endpage_frame,
-            text=f"You have {story_service.count_stories()} stories."
-        )
-        count.pack()
+        self._count_label = ttk.Label(master=endpage_frame, text="")
+        self._count_label.pack()
 
         clear_stories_button = ttk.Button(
             master=endpage_frame,
@@ -164,18 +196,50 @@ class MainView:
         )
         story_button.pack()
         story_frame.pack(fill=constants.X)
+        self._story_frames[story.story_id] = (story_frame, story_button)
 
     def _initialize_stories_list(self):
-        """Initializes frame containing all stories.
+        """Initializes frame containing all stories, they are loaded in the background.
         """
 
         if not self._stories_frame:
             self._stories_frame = ttk.Frame(master=self._frame)
         self._stories_frame.pack()
-        stories = story_service.get_stories()
+        ttk.Label(master=self._stories_frame, text="Loading stories...").pack()
+        self._tasks.submit(self, snapshot.get_stories, self._show_stories)
+        self.pack()
+
+    def _show_stories(self, stories: list[Story]) -> None:
+        """Replaces the placeholder with loaded stories and updates story count.
+
+        If stories changed while they were being loaded, they are loaded again.
+
+        Args:
+            stories (list[Story]): All stories.
+        """
+
+        if self._missed_changes:
+            self._missed_changes = False
+            self._tasks.submit(self, snapshot.get_stories, self._show_stories)
+            return
+        self._loaded = True
+        for widget in self._stories_frame.winfo_children():
+            widget.destroy()
+        self._story_frames.clear()
+        self.stories = stories
         for story in stories:
             self._initialize_story(story=story)
-        self.pack()
+        self._update_count()
+
+    def _update_count(self) -> None:
+        """Updates story count and the hint shown when there are no stories.
+        """
+
+        self._count_label.configure(text=f"You have {len(self.stories)} stories.")
+        if self.stories:
+            self._no_stories_label.pack_forget()
+        else:
+            self._no_stories_label.pack(before=self._create_story_button)
 
     def _story_creation_dialog(self):
         """Checks if the window is frozen, if not, initializes story creation dialog.
@@ -192,15 +256,79 @@ class MainView:
         self._frozen = False
         if not self._temp or not self._temp[0]:
             return
-        new_story = story_service.create_story(
-            name=self._temp[0], desc=self._temp[1])
+        story_service.create_story(name=self._temp[0], desc=self._temp[1])
         self._temp = None
-        if new_story:
-            self._initialize_story(story=new_story)
-            self._reload()
+
+    def _can_patch(self) -> bool:
+        """Checks whether the story list is loaded and can be patched with an event.
+
+        Returns:
+            bool: False if the list is still loading, it's then loaded again.
+        """
+
+        if not self._loaded:
+            self._missed_changes = True
+        return self._loaded
+
+    def _on_story_created(self, event: StoryCreated) -> None:
+        """Adds a created story to the list.
+        """
+
+        if not self._can_patch():
+            return
+
+        story = Story(story_id=event.story_id, name=event.name, desc=event.desc)
+        self.stories.append(story)
+        self._initialize_story(story=story)
+        self._update_count()
+
+    def _on_story_renamed(self, event: StoryRenamed) -> None:
+        """Updates name of a renamed story.
+        """
+
+        if not self._can_patch():
+            return
+
+        for i, story in enumerate(self.stories):
+            if story.story_id == event.story_id:
+                story = Story(story_id=story.story_id, name=event.name, desc=story.desc)
+                self.stories[i] = story
+                _, button = self._story_frames[story.story_id]
+                button.configure(text=story.name,
+                                 command=lambda story=story: self._handle_story(story=story))
+                return
+
+    def _on_story_desc_changed(self, event: StoryDescChanged) -> None:
+        """Updates description of a story, story views are built from it.
+        """
+
+        if not self._can_patch():
+            return
+
+        for i, story in enumerate(self.stories):
+            if story.story_id == event.story_id:
+                story = Story(story_id=story.story_id, name=story.name, desc=event.desc)
+                self.stories[i] = story
+                _, button = self._story_frames[story.story_id]
+                button.configure(command=lambda story=story: self._handle_story(story=story))
+                return
+
+    def _on_story_deleted(self, event: StoryDeleted) -> None:
+        """Removes a deleted story, or all of them, from the list.
+        """
+
+        if not self._can_patch():
+            return
+
+        deleted = [s.story_id for s in self.stories
+                   if event.story_id is None or s.story_id == event.story_id]
+        for story_id in deleted:
+            self._story_frames.pop(story_id)[0].destroy()
+        self.stories = [s for s in self.stories if s.story_id not in deleted]
+        self._update_count()
 
     def _clear_stories(self):
-        """Deletes all stories and reloads the view.
+        """Asks if all stories should be deleted.
         """
 
         if len(self.stories) == 0:
@@ -209,35 +337,14 @@ class MainView:
         if not self._frozen:
             self._frozen = True
             dialog = dd.DeleteDialog(self._root, None, None, 'all_stories')
-            self._wait_for_input(dialog=dialog, callback=self._reload)
-
-    def _reload(self):
-        """Completely reloads the view.
-        """
+            dialog.on_close(self._unfreeze)
 
+    def _unfreeze(self):
         self._frozen = False
-        self._stories_frame = None
-        self.destroy()
-        self._initialize()
 
     def _input_story_details(self):
-        """Calls dialog window and waits for input.
+        """Calls dialog window, story is created when it is closed.
         """
 
         dialog = StoryDialog(self._root, self)
-        self._wait_for_input(dialog, self._create_story)
-
-    def _wait_for_input(self, dialog: "StoryDialog", callback):
-        """Waits for user input before executing the rest of story creation function.
-
-        Args:
-            dialog (StoryDialog): Story dialog that the function is waiting to be closed.
-            callback (function): Calls this function when the dialog is closed.
-        """
-
-        def wait():
-            if dialog.dialog.winfo_exists():
-                self._root.after(100, wait)
-            else:
-                callback()
-        wait()
+        dialog.on_close(self._create_story)
@@ -0,0 +1,110 @@
+import tkinter as tk
+from tkinter import ttk
+from services.character_service import char_service
+from services.story_service import story_service
+
+
+class SearchBox:
+    """Search field with a list of matching characters under it.
+
+    Characters are searched by their name and descriptions while the user types.
+    """
+
+    def __init__(self, root, master, handle_character, story_id: int = None,
+                 limit: int = 10) -> None:
+        """
+        Args:
+            root (Tk): Root window, used for scheduling searches.
+            master (Widget): Parent widget.
+            handle_character (Callable): Opens the view of a found character.
+            story_id (int, optional): Search only this story. Defaults to all stories.
+            limit (int, optional): Maximum number of shown results. Defaults to 10.
+        """
+
+        self._root = root
+        self._handle_character = handle_character
+        self._story_id = story_id
+        self._limit = limit
+
+        # Search runs once the user stops typing for this many milliseconds
+        self._delay = 200
+        self._search_job = None
+
+        self._frame = ttk.Frame(master=master)
+        self._entry = None
+        self._results_frame = None
+
+        self._initialize()
+
+    def pack(self, **kwargs):
+        self._frame.pack(**kwargs)
+
+    def destroy(self):
+        if self._search_job:
+            self._root.after_cancel(self._search_job)
+            self._search_job = None
+        self._frame.destroy()
+
+    def _initialize(self):
+        """Initializes search field and an empty result list.
+        """
+
+        search_frame = ttk.Frame(master=self._frame)
+        search_frame.pack()
+
+        ttk.Label(master=search_frame, text="Search characters:").pack(
+            side=tk.LEFT, padx=5)
+        self._entry = ttk.Entry(master=search_frame, width=40)
+        self._entry.pack(side=tk.LEFT)
+        self._entry.bind("<KeyRelease>", self._schedule_search)
+        self._entry.bind("<Return>", lambda event: self._search())
+
+        self._results_frame = ttk.Frame(master=self._frame)
+        self._results_frame.pack(fill=tk.X)
+
+    def _schedule_search(self, event=None) -> None:
+        if self._search_job:
+            self._root.after_cancel(self._search_job)
+        self._search_job = self._root.after(self._delay, self._search)
+
+    def _search(self) -> None:
+        """Replaces shown results with characters matching the search field.
+        """
+
+        self._search_job = None
+        for widget in self._results_frame.winfo_children():
+            widget.destroy()
+
+        query = self._entry.get()
+        if not query.strip():
+            return
+        results = char_service.search(
+            query, story_id=self._story_id, limit=self._limit)
+        if not results:
+            ttk.Label(master=self._results_frame,
+                      text="No characters found.").pack()
+            return
+        for result in results:
+            self._initialize_result(result)
+
+    def _initialize_result(self, result) -> None:
+        """Initializes a single found character.
+
+        Args:
+            result (SearchResult): Found character and matching text.
+        """
+
+        character = result.character
+        text = character.name()
+        if self._story_id is None:
+            text += f" ({story_service.get_name_by_id(character.story_id)})"
+
+        result_frame = ttk.Frame(master=self._results_frame)
+        result_frame.pack(fill=tk.X, padx=5)
+        ttk.Button(
+            master=result_frame,
+            text=text,
+            command=lambda: self._handle_character(character=character)
+        ).pack(side=tk.LEFT)
+        ttk.Label(master=result_frame, text=result.snippet).pack(
+            side=tk.LEFT, padx=5)
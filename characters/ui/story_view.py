@@ -1,21 +1,24 @@
 import tkinter as tk
 from . import delete_dialog as dd
 from . import image_selector as im
+from .avatars import show_avatar
+from .background import TaskRunner
+from .dialog import Dialog
+from .search_box import SearchBox
 from tkinter import ttk, font, constants
 from PIL import Image, ImageTk
 from entities.story import Story
-from services.character_service import char_service, Character
+from services.character_service import char_service, Character, CharacterSummary
 from services.story_service import story_service
+from services.snapshot import snapshot
 from repositories.file_management import rep
 
 
-class CharacterCreationDialog:
+class CharacterCreationDialog(Dialog):
     def __init__(self, parent, view: "StoryView") -> None:
+        super().__init__(parent, "New Character")
         self.view = view
 
-        self.dialog = tk.Toplevel(parent)
-        self.dialog.title = "New Character"
-
         self._pic_frame = tk.Frame(self.dialog)
         self._pic_name = ttk.Label(master=self._pic_frame, text="")
 
@@ -250,28 +253,39 @@ class CharacterCreationDialog:
     def on_sex_change(self, event) -> None:
         self.gender = self.genderbox.get()
 
-    def close(self) -> None:
-        self.dialog.destroy()
-
 
 class StoryView:
-    def __init__(self, root: tk.Tk, story: Story, handle_main, handle_character, stories: list[Story]) -> None:
+    def __init__(self, root: tk.Tk, story: Story, handle_main, handle_character,
+                 tasks: TaskRunner) -> None:
         self._root = root
+        self._tasks = tasks
         self._handle_main = handle_main
         self._handle_character = handle_character
         self._frame = None
         self._characters_frame = None
         self._endpage_frame = None
         self.story = story
-        self.stories = stories
 
         self._head = None
         self._desc = None
+        self._search_box = None
 
         self._bg_color = "#f0f0f0"
         self._row = 0
         self._column = 0
 
+        # Characters grid is filled page by page while it is scrolled
+        self._columns = 7
+        self._page_size = 28
+        self._grid_height = 480
+        self._canvas = None
+        self._grid = None
+        self._last_char_id = 0
+        self._all_loaded = False
+        self._loading = False
+        self._page_job = None
+        self._stats_labels = None
+
         self._frozen = False
         self._temp = None
 
@@ -280,7 +294,18 @@ class StoryView:
     def pack(self):
         self._frame.pack(expand=True, fill="x")
 
+    def hide(self):
+        self._frame.pack_forget()
+
     def destroy(self):
+        self._tasks.cancel(self)
+        if self._page_job:
+            self._root.after_cancel(self._page_job)
+            self._page_job = None
+        self._unbind_mousewheel()
+        if self._search_box:
+            self._search_box.destroy()
+            self._search_box = None
         self._frame.destroy()
 
     def _change_story_name(self, event) -> None:
@@ -347,31 +372,124 @@ class StoryView:
         )
         character_button.pack(pady=5)
 
+        self._search_box = SearchBox(
+            self._root, heading_frame, self._handle_character,
+            story_id=self.story.story_id)
+        self._search_box.pack(pady=5)
+
     def _initialize_characters(self) -> None:
-        """Initializes characters frame for all characters of the story.
+        """Initializes scrollable characters grid.
+
+        Only the first pages are loaded, the rest are loaded when the grid is scrolled
+        near its bottom.
         """
 
         self._characters_frame = ttk.Frame(master=self._frame)
         self._characters_frame.pack(fill=tk.BOTH, expand=True)
-        characters = char_service.get_characters_by_story_id(
-            story_id=self.story.story_id)
-        if not characters:
+
+        self._canvas = tk.Canvas(
+            master=self._characters_frame,
+            height=self._grid_height,
+            bg=self._bg_color,
+            highlightthickness=0,
+            yscrollincrement=20
+        )
+        scrollbar = ttk.Scrollbar(
+            master=self._characters_frame,
+            orient=tk.VERTICAL,
+            command=self._canvas.yview
+        )
+        self._grid = ttk.Frame(master=self._canvas)
+        self._canvas.create_window((0, 0), window=self._grid, anchor="nw")
+        self._canvas.configure(
+            yscrollcommand=lambda first, last: self._on_scroll(scrollbar, first, last))
+        self._grid.bind("<Configure>", self._on_grid_resize)
+        self._canvas.bind("<Enter>", self._bind_mousewheel)
+        self._canvas.bind("<Leave>", self._unbind_mousewheel)
+
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self._canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self._load_next_page()
+
+    def _on_grid_resize(self, event) -> None:
+        """Updates scrollable area when characters are added to the grid.
+        """
+
+        self._canvas.configure(
+            scrollregion=self._canvas.bbox("all"), width=event.width)
+
+    def _on_scroll(self, scrollbar: ttk.Scrollbar, first: str, last: str) -> None:
+        """Moves scrollbar and schedules loading of the next page when the grid's bottom is visible.
+        """
+
+        scrollbar.set(first, last)
+        if float(last) >= 0.9 and not self._all_loaded and not self._page_job:
+            self._page_job = self._root.after_idle(self._load_visible_page)
+
+    def _load_visible_page(self) -> None:
+        self._page_job = None
+        if self._canvas.yview()[1] >= 0.9:
+            self._load_next_page()
+
+    def _load_next_page(self) -> None:
+        """Loads next page of characters in the background.
+        """
+
+        if self._all_loaded or self._loading:
             return
+        self._loading = True
+        self._tasks.submit(self, snapshot.get_character_summaries_page, self._show_page,
+                           self.story.story_id, self._last_char_id, self._page_size,
+                           on_error=self._page_failed)
+
+    def _page_failed(self, error: Exception) -> None:
+        """Lets the next scroll try loading the page again.
+        """
+
+        self._loading = False
+
+    def _show_page(self, characters: list[CharacterSummary]) -> None:
+        """Adds a loaded page of characters to the grid.
+
+        Args:
+            characters (list[CharacterSummary]): Characters of the page.
+        """
+
+        self._loading = False
         for character in characters:
             self._initialize_character(character=character)
+        self._all_loaded = len(characters) < self._page_size
+
+    def _bind_mousewheel(self, event=None) -> None:
+        self._canvas.bind_all("<MouseWheel>", self._on_mousewheel)
+        self._canvas.bind_all(
+            "<Button-4>", lambda event: self._canvas.yview_scroll(-1, "units"))
+        self._canvas.bind_all(
+            "<Button-5>", lambda event: self._canvas.yview_scroll(1, "units"))
+
+    def _unbind_mousewheel(self, event=None) -> None:
+        if not self._canvas:
+            return
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self._canvas.unbind_all(sequence)
+
+    def _on_mousewheel(self, event) -> None:
+        self._canvas.yview_scroll(-1 if event.delta > 0 else 1, "units")
 
-    def _initialize_character(self, character: Character) -> None:
+    def _initialize_character(self, character: Character | CharacterSummary) -> None:
         """Initializes single character frame for selecter Character object.
 
         Args:
-            character (Character): Character to be viewed.
+            character (Character | CharacterSummary): Character to be viewed.
         """
 
-        char_frame = ttk.Frame(master=self._characters_frame)
+        char_frame = ttk.Frame(master=self._grid)
         char_frame.grid(row=self._row, column=self._column)
+        self._last_char_id = max(self._last_char_id, character.char_id)
 
         self._column += 1
-        if self._column == 7:
+        if self._column == self._columns:
             self._column = 0
             self._row += 1
 
@@ -379,11 +497,8 @@ class StoryView:
                               relief=tk.SOLID, width=125, height=125)
         img_frame.pack(padx=5, pady=5)
 
-        img_path = char_service.get_image_path(character=character)
-
-        img = tk.PhotoImage(file=img_path)
-        label = tk.Label(master=img_frame, image=img)
-        label.image = img
+        label = tk.Label(master=img_frame)
+        show_avatar(self._tasks, self, character, label)
         label.pack()
         label.bind(
             "<Button-1>", lambda event: self._handle_character(character=character))
@@ -392,38 +507,47 @@ class StoryView:
         char_name_label.pack()
 
     def _initialize_statistics(self) -> None:
-        """Initializes statistics within the endpage.
+        """Initializes statistics within the endpage, they are calculated in the background.
         """
         tk.Label(master=self._endpage_frame,
                  text="Average character is:").pack()
 
-        mean_age = story_service.get_mean_age(story_id=self.story.story_id)
-        mean_age_lbl = tk.Label(
-            master=self._endpage_frame,
-            text=f"{mean_age} years old"
-        )
-        mean_age_lbl.pack()
+        self._stats_labels = []
+        for _ in range(4):
+            label = tk.Label(master=self._endpage_frame, text="...")
+            label.pack()
+            self._stats_labels.append(label)
 
-        physique = story_service.get_mean_physique(self.story.story_id)
-        physique_lbl = tk.Label(
-            master=self._endpage_frame,
-            text=physique
-        )
-        physique_lbl.pack()
+        self._load_statistics()
 
-        p = story_service.get_gender_percentage(self.story.story_id)
-        percents_lbl = tk.Label(
-            master=self._endpage_frame,
-            text=f"{p['female']}% Female, {p['male']}% Male, {p['unknown']}% Undefined/Other"
-        )
-        percents_lbl.pack()
+    def _load_statistics(self) -> None:
+        """Updates statistics labels, calculating statistics in the background if they
+        aren't in memory already.
+        """
 
-        complete = story_service.get_completion_percent(self.story.story_id)
-        complete_lbl = tk.Label(
-            master=self._endpage_frame,
-            text=f"Characters' Completion: {complete}%"
-        )
-        complete_lbl.pack()
+        stats = story_service.get_cached_statistics(self.story.story_id)
+        if stats is not None:
+            self._show_statistics(stats)
+            return
+        self._tasks.submit(self, snapshot.get_story_statistics, self._show_statistics,
+                           self.story.story_id)
+
+    def _show_statistics(self, stats) -> None:
+        """Fills statistics labels.
+
+        Args:
+            stats (StoryStatistics): Statistics of the story.
+        """
+
+        p = stats.genders
+        texts = [
+            f"{stats.mean_age} years old",
+            stats.physique(),
+            f"{p['female']}% Female, {p['male']}% Male, {p['unknown']}% Undefined/Other",
+            f"Characters' Completion: {stats.completion}%"
+        ]
+        for label, text in zip(self._stats_labels, texts):
+            label.configure(text=text)
 
     def _initialize_endpage(self) -> None:
         """Initializes endpage which contain story statistics and a button for going back to the story list.
@@ -454,7 +578,7 @@ class StoryView:
         self._frozen = True
         dialog = dd.DeleteDialog(
             self._root, self._handle_main, self.story, 'story')
-        self._wait_for_input(dialog, self.unfreeze)
+        dialog.on_close(self.unfreeze)
 
     def unfreeze(self):
         self._frozen = False
@@ -479,26 +603,11 @@ class StoryView:
             self._input_character_details()
 
     def _input_character_details(self) -> None:
-        """Calls character creation dialog and waits for user's input.
+        """Calls character creation dialog, character is created when it is closed.
         """
 
         dialog = CharacterCreationDialog(self._root, self)
-        self._wait_for_input(dialog, self._create_character)
-
-    def _wait_for_input(self, dialog: "CharacterCreationDialog", callback) -> None:
-        """Waits for user input before executing the rest of character creation function.
-
-        Args:
-            dialog (CharacterCreationDialog): Dialog that is awaited to be closed.
-            callback (function): Function that is called when dialog is closed.
-        """
-
-        def wait():
-            if dialog.dialog.winfo_exists():
-                self._root.after(100, wait)
-            else:
-                callback()
-        wait()
+        dialog.on_close(self._create_character)
 
     def _create_character(self) -> None:
         """Clears temporary data, creates new character from input and initializes it; Unfreezes story view.
@@ -509,7 +618,8 @@ class StoryView:
         valid_character = char_service.create_character(
             new_character, self.story.story_id)
         if valid_character:
-            self._initialize_character(character=valid_character)
-            self._endpage_frame.destroy()
-            self._initialize_endpage()
+            # Otherwise it will be loaded with the last page
+            if self._all_loaded:
+                self._initialize_character(character=valid_character)
+            self._load_statistics()
         self._frozen = False
@@ -1,8 +1,12 @@
-from services.story_service import story_service, Story
-from services.character_service import Character
+from services.story_service import Story
+from services.character_service import Character, CharacterSummary
+from services.events import (events, StoryRenamed, StoryDescChanged, StoryDeleted,
+                             CharacterCreated, CharacterUpdated, CharacterDeleted)
 from . import story_view as sv
 from . import main_view as mv
 from . import character_view as cv
+from .background import TaskRunner
+from .view_cache import ViewCache
 import os
 import sys
 
@@ -14,22 +18,61 @@ sys.path.append(root_dir)
 class UI:
     def __init__(self, root) -> None:
         self._root = root
+        self._tasks = TaskRunner(root)
+        self._views = ViewCache()
         self._current_view = None
-        self.stories = story_service.get_stories()
+        self._current_key = None
+        # Current view shows a deleted story and mustn't be kept
+        self._current_deleted = False
+
+        for event_type in (StoryRenamed, StoryDescChanged, StoryDeleted, CharacterCreated,
+                           CharacterUpdated, CharacterDeleted):
+            events.subscribe(event_type, self._forget_story_views)
 
     def start(self) -> None:
         self.show_main_view()
 
     def _hide_current_view(self) -> None:
+        """Hides current view. Main and story views are kept for returning to them.
+        """
+
         if self._current_view:
-            self._current_view.destroy()
+            # Character views would keep unsaved edits around
+            if self._current_key[0] == "character" or self._current_deleted:
+                self._current_view.destroy()
+            else:
+                self._current_view.hide()
+                self._views.put(self._current_key, self._current_view)
         self._current_view = None
+        self._current_key = None
+        self._current_deleted = False
+
+    def _cached_view(self, key: tuple):
+        """Hidden view that can be shown again, None if it has to be built.
+        """
+
+        self._current_key = key
+        return self._views.get(key)
+
+    def _forget_story_views(self, event) -> None:
+        """Destroys hidden story views that a change made out of date.
+
+        The main view and the view the change was made in update themselves.
+
+        Args:
+            event (Any): Story or character event.
+        """
+
+        prefix = ("story",) if event.story_id is None else ("story", event.story_id)
+        self._views.invalidate(prefix)
+        current = self._current_key or ()
+        if isinstance(event, StoryDeleted) and current[:len(prefix)] == prefix:
+            self._current_deleted = True
 
     def _handle_main(self) -> None:
-        """Updates stories and shows the main view.
+        """Shows the main view.
         """
 
-        self.stories = story_service.get_stories()
         self.show_main_view()
 
     def _handle_story(self, story: Story) -> None:
@@ -39,14 +82,13 @@ class UI:
             story (Story): Story to be viewed.
         """
 
-        self.stories = story_service.get_stories()
         self.show_story_view(story=story)
 
-    def _handle_character(self, character: Character) -> None:
+    def _handle_character(self, character: Character | CharacterSummary) -> None:
         """Opens character view for a certain character.
 
         Args:
-            character (Character): Character to be viewed.
+            character (Character | CharacterSummary): Character to be viewed.
         """
 
         self.show_character_view(character=character)
@@ -54,31 +96,38 @@ class UI:
     def show_main_view(self):
         self._hide_current_view()
 
-        self._current_view = mv.MainView(
-            root=self._root,
-            stories=self.stories,
-            handle_story=self._handle_story
-        )
+        self._current_view = self._cached_view(("main",))
+        if self._current_view is None:
+            self._current_view = mv.MainView(
+                root=self._root,
+                handle_story=self._handle_story,
+                handle_character=self._handle_character,
+                tasks=self._tasks
+            )
         self._current_view.pack()
 
     def show_story_view(self, story: Story):
         self._hide_current_view()
 
-        self._current_view = sv.StoryView(
-            root=self._root,
-            story=story,
-            handle_main=self._handle_main,
-            handle_character=self._handle_character,
-            stories=self.stories
-        )
+        self._current_view = self._cached_view(("story", story.story_id))
+        if self._current_view is None:
+            self._current_view = sv.StoryView(
+                root=self._root,
+                story=story,
+                handle_main=self._handle_main,
+                handle_character=self._handle_character,
+                tasks=self._tasks
+            )
         self._current_view.pack()
 
-    def show_character_view(self, character: Character) -> None:
+    def show_character_view(self, character: Character | CharacterSummary) -> None:
         self._hide_current_view()
 
+        self._current_key = ("character", character.char_id)
         self._current_view = cv.CharacterView(
             root=self._root,
             character=character,
-            handle_story=self._handle_story
+            handle_story=self._handle_story,
+            tasks=self._tasks
         )
         self._current_view.pack()
@@ -0,0 +1,53 @@
+"""Keeps recently left views alive so that returning to them doesn't rebuild them.
+
+Views are stored hidden under a key such as ("story", story_id). When a change makes a
+cached view out of date, UI invalidates it and the view is built again the next time it
+is needed. When there are too many views, the least recently used ones are destroyed.
+
+    Returns:
+        ViewCache: Cache of hidden views.
+"""
+
+from collections import OrderedDict
+
+
+class ViewCache:
+    def __init__(self, max_views: int = 4) -> None:
+        self._max_views = max_views
+        self._views = OrderedDict()
+
+    def get(self, key: tuple):
+        """Takes a view out of the cache.
+
+        Args:
+            key (tuple): Identifies the view, for example ("story", story_id).
+
+        Returns:
+            Any: Hidden view, None if it isn't cached.
+        """
+
+        return self._views.pop(key, None)
+
+    def put(self, key: tuple, view) -> None:
+        """Stores a hidden view and destroys least recently used ones if needed.
+
+        Args:
+            key (tuple): Identifies the view.
+            view (Any): View that has been hidden.
+        """
+
+        self.invalidate(key)
+        self._views[key] = view
+        while len(self._views) > self._max_views:
+            self._views.popitem(last=False)[1].destroy()
+
+    def invalidate(self, prefix: tuple = ()) -> None:
+        """Destroys cached views whose key starts with prefix.
+
+        Args:
+            prefix (tuple, optional): For example ("story", 3) for a single story view or
+                ("story",) for all of them. Defaults to all views.
+        """
+
+        for key in [key for key in self._views if key[:len(prefix)] == prefix]:
+            self._views.pop(key).destroy()
@@ -16,6 +16,29 @@ def build(ctx):
     else:
         ctx.run("python characters/build.py", pty=True)
 
+@task
+def import_characters(ctx, file, story, file_format=None):
+    options = f" --format {file_format}" if file_format else ""
+    if platform == "win32":
+        ctx.run(f"python ./characters/import_characters.py {file} {story}{options}")
+    else:
+        ctx.run(f"python characters/import_characters.py {file} {story}{options}", pty=True)
+
+@task
+def export_story(ctx, story, file, sqlite=False):
+    options = " --sqlite" if sqlite else ""
+    if platform == "win32":
+        ctx.run(f"python ./characters/export_story.py {file} {story}{options}")
+    else:
+        ctx.run(f"python characters/export_story.py {file} {story}{options}", pty=True)
+
+@task
+def import_story(ctx, file):
+    if platform == "win32":
+        ctx.run(f"python ./characters/export_story.py {file}")
+    else:
+        ctx.run(f"python characters/export_story.py {file}", pty=True)
+
 @task
 def test(ctx):
     if platform == "win32":
@@ -38,6 +61,13 @@ def coverage_report(ctx):
     else:
         ctx.run("coverage html")
 
+@task
+def benchmark(ctx, name):
+    if platform == "win32":
+        ctx.run(f"python ./characters/benchmarks/{name}.py")
+    else:
+        ctx.run(f"python characters/benchmarks/{name}.py", pty=True)
+
 @task
 def lint(ctx):
     ctx.run("pylint --recursive=true characters")